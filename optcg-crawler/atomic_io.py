@@ -0,0 +1,37 @@
+"""
+Atomic file replacement: output is written to a temp file next to the target
+and renamed over it only once it is complete, so readers never see a partial
+file and a failed write leaves the previous version in place.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Mode given to replaced files (mkstemp creates its files as 0600)
+FILE_MODE = 0o644
+
+@contextmanager
+def atomic_write(path, mode='w', encoding='utf-8', newline=None):
+    """
+    Open a temp file for writing path ('w' for text, 'wb' for bytes). It replaces
+    path when the block completes and is removed if the block raises.
+    """
+    if mode not in ('w', 'wb'):
+        raise ValueError(f"Unsupported mode '{mode}' (expected 'w' or 'wb')")
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        if mode == 'wb':
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding=encoding, newline=newline)
+        with f:
+            yield f
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
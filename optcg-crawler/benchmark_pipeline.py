@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark the card ingestion pipeline against the checked-in HTML and CSV files.
+Each stage runs in a fresh process so its peak RSS is measured on its own.
+"""
+
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import json
+import os
+import platform
+import re
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import convert_to_components
+import list_unique_traits
+import parse_cardlist_to_csv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CARDS_DIR = os.path.join(BASE_DIR, 'cards')
+CARDS_CSV = os.path.join(BASE_DIR, 'all_cards.csv')
+COMPONENTS_CSV = os.path.join(BASE_DIR, 'all_cards_components.csv')
+
+# Relative slowdown (time) and growth (peak RSS) tolerated by --compare
+DEFAULT_TIME_THRESHOLD = 0.15
+DEFAULT_RSS_THRESHOLD = 0.25
+
+def scaled_card_id(card_id, copy_index):
+    """Give the Nth synthetic copy of a card a unique ID that keeps its set prefix and _pN suffix"""
+    if copy_index == 0:
+        return card_id
+    match = re.match(r'^(.*?)(_p\d+)?$', card_id)
+    return f"{match.group(1)}-{copy_index}{match.group(2) or ''}"
+
+def write_scaled_csv(source_csv, output_csv, scale):
+    """Replicate every row of source_csv scale times with unique card IDs"""
+    with open(source_csv, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+    with open(output_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for copy_index in range(scale):
+            for row in rows:
+                writer.writerow(dict(row, cardId=scaled_card_id(row['cardId'], copy_index)))
+    return output_csv
+
+def prepare_fixtures(work_dir, scale):
+    """Collect the benchmark inputs, replicating the catalog scale times when asked"""
+    html_files = sorted(glob.glob(os.path.join(CARDS_DIR, '**', '*.html'), recursive=True))
+    fixtures = {
+        'work_dir': work_dir,
+        'html_files': html_files * scale,
+        'cards_csv': CARDS_CSV,
+        'components_csv': COMPONENTS_CSV,
+    }
+    if scale > 1:
+        fixtures['cards_csv'] = write_scaled_csv(CARDS_CSV, os.path.join(work_dir, 'all_cards.csv'), scale)
+        fixtures['components_csv'] = write_scaled_csv(COMPONENTS_CSV, os.path.join(work_dir, 'all_cards_components.csv'), scale)
+    return fixtures
+
+def count_csv_rows(csv_file):
+    with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+        return sum(1 for _ in csv.DictReader(f))
+
+# Each stage is (setup, run). setup(fixtures, options) returns the state passed to run,
+# run(state) returns (records processed, bytes read or written). Only run is timed.
+
+def setup_parse(fixtures, options):
+    return {'files': fixtures['html_files'], 'parse_file': parse_cardlist_to_csv.CARD_EXTRACTORS[options['extractor']]}
+
+def run_parse(state):
+    cards = 0
+    for html_file in state['files']:
+        cards += len(state['parse_file'](html_file))
+    return cards, sum(os.path.getsize(html_file) for html_file in state['files'])
+
+def setup_write(fixtures, options):
+    with open(fixtures['cards_csv'], 'r', newline='', encoding='utf-8') as f:
+        cards = list(csv.DictReader(f))
+    return {'cards': cards, 'output': os.path.join(fixtures['work_dir'], 'write_cards.csv')}
+
+def run_write(state):
+    count = parse_cardlist_to_csv.write_cards_to_csv(state['cards'], state['output'])
+    return count, os.path.getsize(state['output'])
+
+def setup_csv_stage(input_key):
+    def setup(fixtures, options):
+        return {
+            'input': fixtures[input_key],
+            'output': os.path.join(fixtures['work_dir'], f"stage_output_{input_key}.csv"),
+            'records': count_csv_rows(fixtures[input_key]),
+        }
+    return setup
+
+def run_parser_components(state):
+    parse_cardlist_to_csv.convert_to_component_arrays(state['input'], state['output'])
+    return state['records'], os.path.getsize(state['input'])
+
+def run_grouped_components(state):
+    convert_to_components.convert_to_component_arrays(state['input'], state['output'])
+    return state['records'], os.path.getsize(state['input'])
+
+def run_unique_traits(state):
+    list_unique_traits.collect_unique_traits(state['input'])
+    return state['records'], os.path.getsize(state['input'])
+
+STAGES = {
+    'parse': (setup_parse, run_parse),
+    'write_csv': (setup_write, run_write),
+    'components': (setup_csv_stage('cards_csv'), run_parser_components),
+    'grouped_components': (setup_csv_stage('components_csv'), run_grouped_components),
+    'unique_traits': (setup_csv_stage('components_csv'), run_unique_traits),
+}
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_stage(stage_name, fixtures, options):
+    """Run one stage repeatedly inside a worker process and return its measurements"""
+    setup, run = STAGES[stage_name]
+    state = setup(fixtures, options)
+    timings = []
+    records = input_bytes = 0
+    for _ in range(options['repeat']):
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            start = time.perf_counter()
+            records, input_bytes = run(state)
+            timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        'records': records,
+        'input_mb': input_bytes / (1024 * 1024),
+        'timings': timings,
+        'best_s': best,
+        'median_s': statistics.median(timings),
+        'cards_per_s': records / best if best else 0.0,
+        'mb_per_s': input_bytes / (1024 * 1024) / best if best else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def run_benchmarks(stage_names, scale=1, repeat=3, extractor='stream'):
+    options = {'repeat': repeat, 'extractor': extractor}
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        fixtures = prepare_fixtures(work_dir, scale)
+        for stage_name in stage_names:
+            # A fresh interpreter per stage keeps peak RSS from leaking between stages
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                results[stage_name] = executor.submit(run_stage, stage_name, fixtures, options).result()
+    return {
+        'scale': scale,
+        'repeat': repeat,
+        'extractor': extractor,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'stages': results,
+    }
+
+def print_report(report):
+    print(f"Scale {report['scale']}x, {report['repeat']} run(s) per stage, extractor '{report['extractor']}'")
+    print(f"{'stage':<20} {'records':>9} {'best s':>9} {'median s':>9} {'cards/s':>11} {'MB/s':>8} {'peak MB':>8}")
+    for stage_name, stage in report['stages'].items():
+        print(f"{stage_name:<20} {stage['records']:>9} {stage['best_s']:>9.3f} {stage['median_s']:>9.3f} "
+              f"{stage['cards_per_s']:>11.0f} {stage['mb_per_s']:>8.2f} {stage['peak_rss_mb']:>8.1f}")
+
+def compare_reports(report, baseline, time_threshold=DEFAULT_TIME_THRESHOLD, rss_threshold=DEFAULT_RSS_THRESHOLD):
+    """Return a list of regression messages for stages slower or larger than the baseline allows"""
+    regressions = []
+    if baseline.get('scale') != report['scale']:
+        regressions.append(f"baseline was recorded at scale {baseline.get('scale')}x, not {report['scale']}x")
+        return regressions
+    for stage_name, stage in report['stages'].items():
+        base = baseline.get('stages', {}).get(stage_name)
+        if not base:
+            continue
+        if stage['median_s'] > base['median_s'] * (1 + time_threshold):
+            regressions.append(f"{stage_name}: median {stage['median_s']:.3f}s vs baseline {base['median_s']:.3f}s "
+                               f"(+{stage['median_s'] / base['median_s'] - 1:.0%}, limit +{time_threshold:.0%})")
+        if stage['peak_rss_mb'] > base['peak_rss_mb'] * (1 + rss_threshold):
+            regressions.append(f"{stage_name}: peak RSS {stage['peak_rss_mb']:.1f} MB vs baseline {base['peak_rss_mb']:.1f} MB "
+                               f"(+{stage['peak_rss_mb'] / base['peak_rss_mb'] - 1:.0%}, limit +{rss_threshold:.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the card ingestion pipeline')
+    parser.add_argument('-s', '--stage', action='append', choices=sorted(STAGES), help='Stage to run (repeatable, default: all)')
+    parser.add_argument('-x', '--scale', type=int, default=1, help='Replicate the catalog this many times, e.g. 10 or 100 (default: 1)')
+    parser.add_argument('-n', '--repeat', type=int, default=3, help='Timed runs per stage (default: 3)')
+    parser.add_argument('-e', '--extractor', choices=sorted(parse_cardlist_to_csv.CARD_EXTRACTORS), default='stream', help='Card extractor used by the parse stage (default: stream)')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    parser.add_argument('--compare', help='Baseline JSON report; exit with status 1 on regressions')
+    parser.add_argument('--time-threshold', type=float, default=DEFAULT_TIME_THRESHOLD, help=f'Allowed relative slowdown per stage (default: {DEFAULT_TIME_THRESHOLD})')
+    parser.add_argument('--rss-threshold', type=float, default=DEFAULT_RSS_THRESHOLD, help=f'Allowed relative peak RSS growth per stage (default: {DEFAULT_RSS_THRESHOLD})')
+
+    args = parser.parse_args()
+
+    stage_names = args.stage or list(STAGES)
+    report = run_benchmarks(stage_names, scale=args.scale, repeat=args.repeat, extractor=args.extractor)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote benchmark report to '{args.output}'")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.time_threshold, args.rss_threshold)
+        if regressions:
+            print('Performance regressions:')
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"No regressions against '{args.compare}'")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+One-shot catalog build: card list HTML pages straight to db.json and the per-set
+data/cards/<set>.json files, without writing intermediate CSVs.
+
+The pipeline is a chain of generator stages:
+
+    extract (HTML -> card rows) -> normalize -> group variants by base cardId -> emit
+
+Extracted rows are upserted into a temporary SQLite card store (last occurrence
+of a cardId wins, as in the CSV parser) and read back sorted by set file and
+base cardId, so only one variant group is held in memory at a time. Variants
+that appear on another set's page (e.g. OP01-006_p3 on the PRB01 page) still
+land in the group of their base card. Each card also carries effectAst and
+triggerAst, its effect text compiled by effect_ast.py.
+
+Before anything is written, the parsed rows are checked against the catalog
+rules of validate_catalog.py; a failing catalog leaves db.json untouched.
+
+The output goes to build/ by default, not to the checked-in db.json and
+data/cards: its schema differs from the one those files were exported with,
+so pass --db-json/--cards-dir explicitly to replace them. The differences:
+
+- set lists only the set of the card's own base cardId, not every set a
+  reprint or variant appears in
+- life, cost, power and counter are ints or null (the export has most costs
+  as strings such as "5")
+- trigger_description is the parser's triggerText, without the "[Trigger]"
+  prefix
+- image labels are the variant labels ('default', 'p1', 'r1', ...) rather
+  than the page's set label such as "-Memorial Collection- [EB-01]"
+- variantCount is set on every card with more than one variant
+- effectAst/triggerAst and metadata.effectAstVersion are added (unless
+  --no-effect-ast)
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from atomic_io import atomic_write
+from card_catalog import build_binary_catalog, load_cards
+from card_ids import SET_CODE_MAPPING, decode_card_id
+from card_store import CardStore
+from card_table import CardTable
+from effect_ast import EFFECT_AST_VERSION, compile_effect
+from parse_cardlist_to_csv import (CARD_EXTRACTORS, CSV_FIELDNAMES, iter_cards_from_html_stream,
+                                   normalize_card_type, normalize_rarity)
+from text_index import update_text_index
+from validate_catalog import CatalogValidationError, gate
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build')
+DB_JSON = os.path.join(BUILD_DIR, 'db.json')
+CARDS_DIR = os.path.join(BUILD_DIR, 'cards')
+
+# Columns added to the parser's rows so the store can hand back whole variant groups in output order
+GROUP_FIELDNAMES = CSV_FIELDNAMES + ['baseId', 'setFile']
+
+# Order of metadata.cardTypes
+CARD_TYPE_ORDER = ['LEADER', 'CHARACTER', 'EVENT', 'STAGE']
+
+def slugify(text):
+    """'OP01 - Romance Dawn' -> 'op01-romance-dawn'"""
+    return '-'.join(''.join(c if c.isalnum() else ' ' for c in text.lower()).split())
+
+def set_file_names(cards_dir):
+    """{set code: file name} for the per-set files already in cards_dir, so rebuilds overwrite them in place"""
+    names = {}
+    for path in glob.glob(os.path.join(cards_dir, '*.json')):
+        file_name = os.path.basename(path)
+        code = file_name.split('-', 1)[0].upper()
+        if code in SET_CODE_MAPPING:
+            names[code] = file_name
+    names.setdefault('P', f"{slugify(SET_CODE_MAPPING['P'])}.json")
+    return names
+
+def non_negative_int(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, got {value}")
+    return value
+
+def to_int(text):
+    """Card stat text as an int; None when blank, '-' or not a number"""
+    text = text.strip()
+    return int(text) if text.isascii() and text.isdigit() else None
+
+# --- Stage 1: extract ---
+
+def extract_cards(html_files, extractor='stream', jobs=1):
+    """Yield card rows from every page; with jobs > 1 pages are parsed in worker processes"""
+    if jobs == 1:
+        for html_file in html_files:
+            if extractor == 'stream':
+                yield from iter_cards_from_html_stream(html_file)
+            else:
+                yield from CARD_EXTRACTORS[extractor](html_file)
+        return
+    with ProcessPoolExecutor(max_workers=jobs or None) as executor:
+        for cards in executor.map(CARD_EXTRACTORS[extractor], html_files):
+            yield from cards
+
+# --- Stage 2: normalize ---
+
+def normalize_cards(cards, file_names):
+    """Tag each row with its base cardId and the per-set file its group is written to"""
+    for card in cards:
+        id_info = decode_card_id(card['cardId'])
+        base_info = decode_card_id(id_info.base_id)
+        file_name = file_names.get(base_info.set_code)
+        if file_name is None:
+            file_name = file_names[base_info.set_code] = f"{slugify(base_info.set_name or base_info.set_code or 'unknown')}.json"
+        card['baseId'] = id_info.base_id
+        card['setFile'] = file_name
+        yield card
+
+# --- Stage 3: group ---
+
+def group_variants(rows, fieldnames=GROUP_FIELDNAMES):
+    """Yield lists of card dicts sharing a base cardId from rows sorted by base cardId"""
+    group = []
+    base_id = None
+    for values in rows:
+        card = dict(zip(fieldnames, values))
+        if group and card['baseId'] != base_id:
+            yield group
+            group = []
+        base_id = card['baseId']
+        group.append(card)
+    if group:
+        yield group
+
+def build_db_card(group, effect_ast=True):
+    """One db.json card object from all variants of a card, with the compiled effect ASTs unless effect_ast is False"""
+    main = next((card for card in group if decode_card_id(card['cardId']).variant is None), group[0])
+    main_info = decode_card_id(main['cardId'])
+
+    images = []
+    for card in group:
+        label = decode_card_id(card['cardId']).variant_label
+        if card['imageUrl']:
+            images.append({
+                'image_url': card['imageUrl'],
+                'label': label,
+                'artist': '',
+                'is_default': label == 'default',
+            })
+    images.sort(key=lambda image: not image['is_default'])
+
+    db_card = {
+        'cardId': main['baseId'],
+        'name': main['name'],
+        'cardType': normalize_card_type(main['cardType']),
+        'life': to_int(main['life']),
+        'cost': to_int(main['cost']),
+        'power': to_int(main['power']),
+        'counter': to_int(main['counter']),
+        'attributes': [{'attribute': value.strip()} for value in main['attribute'].split('/') if value.strip()],
+        'traits': [{'trait': value.strip()} for value in main['types'].split(', ') if value.strip()],
+        'colors': [{'color': value.strip()} for value in main['color'].split('/') if value.strip()],
+        'images': images,
+        'effect_description': main['effectText'],
+        'trigger_description': main['triggerText'],
+        'rarity': normalize_rarity(main['rarity']) or main_info.id_rarity,
+        'set': [{'set': main_info.set_name, 'is_default': True}] if main_info.set_name else [],
+    }
+    if effect_ast:
+        db_card['effectAst'] = compile_effect(main['effectText'])
+        db_card['triggerAst'] = compile_effect(main['triggerText'])
+    if len(group) > 1:
+        db_card['variantCount'] = len(group)
+    return db_card
+
+# --- Stage 4: emit ---
+
+def indented_json(obj, depth):
+    """obj as JSON.stringify(obj, null, 2) would print it nested depth levels deep"""
+    return ('\n' + '  ' * depth).join(json.dumps(obj, ensure_ascii=False, indent=2).split('\n'))
+
+class SetFileWriter:
+    """
+    Streams the cards of one set to data/cards/<set>.json. The cards go to a temporary
+    body file first because totalCards precedes them in the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.body = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self.count = 0
+
+    def write(self, card_json):
+        self.body.write(',\n    ' if self.count else '\n    ')
+        self.body.write(card_json)
+        self.count += 1
+
+    def close(self):
+        try:
+            with atomic_write(self.path) as f:
+                f.write(f'{{\n  "totalCards": {self.count},\n  "cards": [')
+                self.body.seek(0)
+                shutil.copyfileobj(self.body, f)
+                f.write('\n  ]\n}' if self.count else ']\n}')
+        finally:
+            self.body.close()
+
+def emit_catalog(groups, db_json, cards_dir, effect_ast=True):
+    """Write grouped cards to db.json and the per-set files; returns the number of cards written"""
+    os.makedirs(cards_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(db_json)), exist_ok=True)
+    sets = []
+    card_types = []
+    rarities = []
+    total = 0
+    set_writer = None
+    try:
+        with atomic_write(db_json) as db_file:
+            db_file.write('{\n  "cards": [')
+            for group in groups:
+                set_file = group[0]['setFile']
+                if set_writer is None or os.path.basename(set_writer.path) != set_file:
+                    if set_writer is not None:
+                        set_writer.close()
+                    set_writer = SetFileWriter(os.path.join(cards_dir, set_file))
+                    set_info = decode_card_id(group[0]['baseId'])
+                    sets.append({'name': set_info.set_name, 'code': set_info.set_code, 'totalCards': 0})
+
+                card = build_db_card(group, effect_ast)
+                card_json = indented_json(card, 2)
+                set_writer.write(card_json)
+                db_file.write(',\n    ' if total else '\n    ')
+                db_file.write(card_json)
+                total += 1
+                sets[-1]['totalCards'] += 1
+                if card['cardType'] and card['cardType'] not in card_types:
+                    card_types.append(card['cardType'])
+                if card['rarity'] and card['rarity'] not in rarities:
+                    rarities.append(card['rarity'])
+            if set_writer is not None:
+                set_writer.close()
+                set_writer = None
+
+            metadata = {
+                'totalCards': total,
+                'totalSets': len(sets),
+                'cardTypes': [card_type for card_type in CARD_TYPE_ORDER if card_type in card_types],
+                'rarities': rarities,
+                'exportedAt': datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+            }
+            if effect_ast:
+                metadata['effectAstVersion'] = EFFECT_AST_VERSION
+            db_file.write('\n  ],' if total else '],')
+            db_file.write(f'\n  "sets": {indented_json(sets, 1)},')
+            db_file.write(f'\n  "metadata": {indented_json(metadata, 1)}\n}}')
+    except BaseException:
+        if set_writer is not None:
+            set_writer.body.close()
+        raise
+    return total, len(sets)
+
+def build_catalog(html_files, db_json=DB_JSON, cards_dir=CARDS_DIR, csv_file=None, extractor='stream', jobs=1,
+                  effect_ast=True, validate=True, strict=False, max_examples=10):
+    """
+    Run the whole pipeline; returns (cards parsed, grouped cards written, sets written).
+    Raises CatalogValidationError before emitting when validate is on and the rules fail.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        with CardStore(os.path.join(work_dir, 'cards.db'), GROUP_FIELDNAMES) as store:
+            cards = normalize_cards(extract_cards(html_files, extractor, jobs), set_file_names(cards_dir))
+            store.upsert(cards)
+            if csv_file:
+                store.export_csv(csv_file, CSV_FIELDNAMES)
+            if validate:
+                gate(CardTable.from_rows(store.iter_rows(), GROUP_FIELDNAMES), strict, max_examples=max_examples)
+            groups = group_variants(store.iter_rows(order_by=['setFile', 'baseId']))
+            total, set_count = emit_catalog(groups, db_json, cards_dir, effect_ast)
+            return store.count(), total, set_count
+
+def main():
+    parser = argparse.ArgumentParser(description='Build db.json and data/cards/<set>.json directly from card list HTML pages')
+    parser.add_argument('input_html', nargs='*', help='Input HTML file paths')
+    parser.add_argument('-d', '--directory', help='Directory containing HTML files to process')
+    parser.add_argument('--db-json', default=DB_JSON, help=f'Output db.json path (default: {DB_JSON}; its schema differs from the checked-in db.json, see the notes at the top of this script)')
+    parser.add_argument('--cards-dir', default=CARDS_DIR, help=f'Output directory for the per-set card files (default: {CARDS_DIR})')
+    parser.add_argument('--csv', help='Also write the parsed cards as a CSV in the parser layout')
+    parser.add_argument('--binary', help='Also write the memory-mappable binary card catalog (see card_catalog.py)')
+    parser.add_argument('--text-index', help='Also build or update the full-text index at this path (see text_index.py)')
+    parser.add_argument('--no-effect-ast', action='store_true', help='Do not add the compiled effectAst/triggerAst to each card (see effect_ast.py)')
+    parser.add_argument('--no-validate', action='store_true', help='Skip the data-quality gate (see validate_catalog.py)')
+    parser.add_argument('--strict', action='store_true', help='Fail the data-quality gate on warnings as well as errors')
+    parser.add_argument('--max-examples', type=non_negative_int, default=10, help='Example cards listed per violated rule in the gate report (default: 10)')
+    parser.add_argument('-e', '--extractor', choices=sorted(CARD_EXTRACTORS), default='stream', help='Card extractor backend (default: stream)')
+    parser.add_argument('-j', '--jobs', type=non_negative_int, default=1, help='Number of worker processes used to parse HTML files (default: 1, 0 = one per CPU)')
+
+    args = parser.parse_args()
+
+    html_files = []
+    if args.directory:
+        html_files.extend(sorted(glob.glob(os.path.join(args.directory, '**', '*.html'), recursive=True)))
+    html_files.extend(args.input_html)
+
+    existing_files = []
+    for html_file in html_files:
+        if not os.path.exists(html_file):
+            print(f"Warning: Input file '{html_file}' not found. Skipping.")
+            continue
+        existing_files.append(html_file)
+
+    if not existing_files:
+        print('Error: No HTML files specified.')
+        return
+
+    try:
+        parsed, total, set_count = build_catalog(existing_files, args.db_json, args.cards_dir, args.csv, args.extractor, args.jobs,
+                                                 not args.no_effect_ast, not args.no_validate, args.strict, args.max_examples)
+    except CatalogValidationError as e:
+        print(f"Error: {e}; '{args.db_json}' was not updated.")
+        sys.exit(1)
+    print(f"Parsed {parsed} cards from {len(existing_files)} file(s) and wrote {total} cards in {set_count} set file(s) to '{args.db_json}' and '{args.cards_dir}'")
+    if args.csv:
+        print(f"Wrote parsed cards to '{args.csv}'")
+    if args.binary:
+        count = build_binary_catalog(load_cards(args.db_json), args.binary)
+        print(f"Wrote {count} cards to the binary catalog '{args.binary}'")
+    if args.text_index:
+        reused, rebuilt, removed = update_text_index([args.db_json], args.text_index)
+        print(f"Updated the text index '{args.text_index}': {rebuilt} set(s) rebuilt, {reused} unchanged, {removed} removed")
+
+if __name__ == '__main__':
+    main()
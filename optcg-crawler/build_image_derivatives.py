@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Build resized thumbnails and web-format copies of the card images listed in the
+images component arrays ({image_url, label, is_default}) of a grouped component
+CSV, db.json or a data/cards/<set>.json file.
+
+Derivatives live in a content-addressed store keyed by the SHA-256 of the source
+image, so art shared by several variants is processed once and unchanged images
+are never rebuilt. Sources are only re-hashed when their size or mtime changed.
+The derivative paths are written back into each image entry as "derivatives".
+Requires Pillow (pip install Pillow).
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from atomic_io import atomic_write
+from fetch_images import IMAGES_DIR, MANIFEST_NAME
+from http_pool import load_manifest
+
+STORE_DIR = os.path.join(IMAGES_DIR, 'derivatives')
+SOURCE_INDEX_NAME = 'sources.json'
+
+# Derivative name -> (width in pixels or None for the source size, Pillow format, quality)
+DERIVATIVE_SPECS = {
+    'thumb': (240, 'JPEG', 80),
+    'thumb_webp': (240, 'WEBP', 80),
+    'web': (None, 'WEBP', 85),
+}
+FORMAT_EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp', 'PNG': 'png'}
+
+def derivative_name(name):
+    """File name of a derivative; the spec is part of it so changing a spec builds new files"""
+    width, image_format, quality = DERIVATIVE_SPECS[name]
+    return f"{name}-{width or 'full'}-q{quality}.{FORMAT_EXTENSIONS[image_format]}"
+
+def derivative_dir(store_dir, digest):
+    return os.path.join(store_dir, digest[:2], digest)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def build_derivatives(source_path, target_dir, names):
+    """Write the named derivatives of one source image; runs in a worker process"""
+    os.makedirs(target_dir, exist_ok=True)
+    with Image.open(source_path) as source:
+        source.load()
+        for name in names:
+            width, image_format, quality = DERIVATIVE_SPECS[name]
+            image = source
+            if width and source.width > width:
+                image = source.resize((width, round(source.height * width / source.width)), Image.LANCZOS)
+            if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            elif image.mode == 'P':
+                image = image.convert('RGBA')
+            path = os.path.join(target_dir, derivative_name(name))
+            with atomic_write(path, 'wb') as f:
+                image.save(f, image_format, quality=quality, optimize=True)
+    return len(names)
+
+# --- Reading and writing the image component arrays ---
+
+def parse_images_cell(text):
+    """Image entries of an images cell; raises ValueError when the cell is not JSON (see card_index.parse_component_array)"""
+    if not text:
+        return []
+    try:
+        images = json.loads(text)
+    except ValueError as e:
+        raise ValueError(f"unparseable images cell: {e}") from None
+    return images if isinstance(images, list) else [images]
+
+def read_image_lists(input_file):
+    """(document, per-card image lists) from a component CSV or a JSON card file"""
+    if input_file.endswith('.json'):
+        with open(input_file, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        return document, [card.get('images') or [] for card in document.get('cards', [])]
+    with open(input_file, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        rows = list(reader)
+        fieldnames = reader.fieldnames
+    image_lists = []
+    for row_number, row in enumerate(rows, 1):
+        try:
+            image_lists.append(parse_images_cell(row.get('images', '')))
+        except ValueError as e:
+            # The row is written back unchanged, without derivatives
+            print(f"Warning: row {row_number} ({row.get('cardId') or 'no cardId'}): {e}", file=sys.stderr)
+            image_lists.append([])
+    return (fieldnames, rows), image_lists
+
+def write_image_lists(input_file, output_file, document, image_lists):
+    if input_file.endswith('.json'):
+        for card, images in zip(document.get('cards', []), image_lists):
+            if images:
+                card['images'] = images
+        with atomic_write(output_file) as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+    else:
+        fieldnames, rows = document
+        with atomic_write(output_file, newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            for row, images in zip(rows, image_lists):
+                if images:
+                    row['images'] = json.dumps(images, ensure_ascii=False)
+                writer.writerow(row)
+
+# --- Source images ---
+
+class SourceResolver:
+    """Maps an image_url to the downloaded file in the images directory"""
+
+    def __init__(self, images_dir):
+        self.images_dir = images_dir
+        self.by_path = {}
+        for local_image, entry in load_manifest(os.path.join(images_dir, MANIFEST_NAME)).items():
+            if entry.get('complete'):
+                self.by_path[urlsplit(entry['url']).path] = local_image
+
+    def resolve(self, image_url):
+        path = urlsplit(image_url).path
+        local_image = self.by_path.get(path)
+        if local_image is None:
+            # fetch_images.py names files after the card ID: .../EB01-006_p1.png -> EB01-006_p1.jpg
+            local_image = os.path.splitext(os.path.basename(path))[0] + '.jpg'
+        source_path = os.path.join(self.images_dir, local_image)
+        return source_path if os.path.exists(source_path) else None
+
+def source_digests(source_paths, store_dir):
+    """SHA-256 of each source, re-hashing only files whose size or mtime changed since the last run"""
+    index_path = os.path.join(store_dir, SOURCE_INDEX_NAME)
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    digests = {}
+    hashed = 0
+    for source_path in source_paths:
+        stat = os.stat(source_path)
+        key = os.path.abspath(source_path)
+        entry = index.get(key)
+        if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            entry = index[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(source_path)}
+            hashed += 1
+        digests[source_path] = entry['sha256']
+
+    os.makedirs(store_dir, exist_ok=True)
+    with atomic_write(index_path) as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    return digests, hashed
+
+def build_image_derivatives(input_file, output_file=None, images_dir=IMAGES_DIR, store_dir=STORE_DIR,
+                            url_prefix='', jobs=0):
+    """Build missing derivatives for every image in input_file and write the paths back"""
+    output_file = output_file or input_file
+    document, image_lists = read_image_lists(input_file)
+    resolver = SourceResolver(images_dir)
+
+    sources = {}
+    missing = 0
+    for images in image_lists:
+        for image in images:
+            if not isinstance(image, dict):
+                continue
+            url = image.get('image_url') or image.get('url') or ''
+            source_path = resolver.resolve(url) if url else None
+            if source_path is None:
+                missing += 1
+            else:
+                sources[url] = source_path
+
+    digests, hashed = source_digests(sorted(set(sources.values())), store_dir)
+
+    # One build per distinct image content, for whichever derivatives it is still missing
+    builds = {}
+    for source_path, digest in digests.items():
+        target_dir = derivative_dir(store_dir, digest)
+        names = [name for name in DERIVATIVE_SPECS if not os.path.exists(os.path.join(target_dir, derivative_name(name)))]
+        if names and digest not in builds:
+            builds[digest] = (source_path, target_dir, names)
+
+    built = 0
+    if builds:
+        with ProcessPoolExecutor(max_workers=jobs or None) as executor:
+            futures = [executor.submit(build_derivatives, *build) for build in builds.values()]
+            for future in futures:
+                built += future.result()
+
+    for images in image_lists:
+        for image in images:
+            if not isinstance(image, dict):
+                continue
+            source_path = sources.get(image.get('image_url') or image.get('url') or '')
+            if source_path is None:
+                continue
+            digest = digests[source_path]
+            image['derivatives'] = {
+                name: f"{url_prefix}{digest[:2]}/{digest}/{derivative_name(name)}" for name in DERIVATIVE_SPECS
+            }
+    write_image_lists(input_file, output_file, document, image_lists)
+
+    print(f"{len(sources)} image(s) from {len(digests)} source file(s) ({len(set(digests.values()))} distinct), "
+          f"{hashed} hashed, {len(builds)} rebuilt ({built} derivative(s)), {missing} without a local source")
+    return output_file
+
+def main():
+    parser = argparse.ArgumentParser(description='Build thumbnails and web-format card images into a content-addressed store')
+    parser.add_argument('input_file', help='Grouped component CSV, db.json or a data/cards/<set>.json file')
+    parser.add_argument('-o', '--output', help='Output file path (default: update input_file in place)')
+    parser.add_argument('--images-dir', default=IMAGES_DIR, help=f'Downloaded source images (default: {IMAGES_DIR})')
+    parser.add_argument('--store', default=STORE_DIR, help=f'Derivative store directory (default: {STORE_DIR})')
+    parser.add_argument('--url-prefix', default='', help="Prefix for the derivative paths written back, e.g. '/images/derivatives/'")
+    parser.add_argument('-j', '--jobs', type=int, default=0, help='Number of worker processes (default: 0 = one per CPU)')
+
+    args = parser.parse_args()
+
+    if Image is None:
+        print('Error: Pillow is required to build image derivatives (pip install Pillow).')
+        sys.exit(1)
+    if not os.path.exists(args.input_file):
+        print(f"Error: Input file '{args.input_file}' not found.")
+        return
+
+    build_image_derivatives(args.input_file, args.output, args.images_dir, args.store, args.url_prefix, args.jobs)
+
+if __name__ == '__main__':
+    main()
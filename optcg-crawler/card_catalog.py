@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Compact binary card catalog built from db.json (or a data/cards/<set>.json file).
+
+Layout, all little-endian:
+
+    header      magic, version, counts and section offsets
+    strings     uint32 offsets + one UTF-8 blob; every distinct text (names, traits,
+                effects, URLs...) is stored once
+    records     one fixed-width record per card: string indexes, int32 stats,
+                (start, count) references into the list sections and the card's
+                other keys (effectAst, triggerAst, ...) as one JSON string; a
+                stat the int32 column cannot give back as written (the string
+                "5", the placeholder "-") is kept verbatim in that JSON too
+    lists       uint32 string indexes for attributes/traits/colors/keywords,
+                (string, is_default) pairs for sets, fixed-width image entries
+                (with any extra image keys, e.g. derivatives, as a JSON string)
+    index       open-addressing hash table cardId -> record number (CRC-32)
+
+CardCatalog mmaps the file and decodes a record only when it is accessed, so a
+lookup needs no parsing up front and touches just a few pages.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+
+from atomic_io import atomic_write
+
+MAGIC = b'OPCGCAT\0'
+CATALOG_VERSION = 2
+NULL_INT = -2 ** 31
+
+HEADER = struct.Struct('<8sIIIIIIQQQQQQQ')
+# cardId, name, cardType, rarity, effect_description, trigger_description,
+# life, cost, power, counter, (start, count) x 6 lists, variantCount, extra keys JSON
+RECORD = struct.Struct('<6I4i12III')
+PAIR = struct.Struct('<II')
+# image_url, label, artist, is_default, extra keys JSON
+IMAGE = struct.Struct('<IIIII')
+
+STRING_FIELDS = ('cardId', 'name', 'cardType', 'rarity', 'effect_description', 'trigger_description')
+INT_FIELDS = ('life', 'cost', 'power', 'counter')
+# List field -> key of the value inside each list entry
+STRING_LIST_FIELDS = (('attributes', 'attribute'), ('traits', 'trait'), ('colors', 'color'), ('keywords', None))
+IMAGE_KEYS = ('image_url', 'label', 'artist', 'is_default')
+SET_KEYS = ('set', 'is_default')
+# Card keys with a column of their own; any other key goes into the extra JSON
+CARD_KEYS = frozenset(STRING_FIELDS + INT_FIELDS + tuple(field for field, _ in STRING_LIST_FIELDS) + ('set', 'images', 'variantCount'))
+
+def stat_int(value):
+    if isinstance(value, bool) or value is None:
+        return NULL_INT
+    if isinstance(value, int):
+        return value if NULL_INT < value < 2 ** 31 else NULL_INT
+    text = str(value).strip()
+    return int(text) if text.isascii() and text.isdigit() and len(text) < 10 else NULL_INT
+
+def stat_is_exact(value, number):
+    """Whether the int32 column value number decodes back to value itself"""
+    return value is None if number == NULL_INT else type(value) is int
+
+def index_slot(card_id, mask):
+    return zlib.crc32(card_id.encode('utf-8')) & mask
+
+class StringTable:
+    def __init__(self):
+        self.lookup = {}
+        self.values = []
+
+    def add(self, text):
+        text = '' if text is None else str(text)
+        index = self.lookup.get(text)
+        if index is None:
+            index = self.lookup[text] = len(self.values)
+            self.values.append(text)
+        return index
+
+def extra_json(entry, known_keys):
+    """Compact JSON object of the keys of entry outside known_keys, or '' when there are none"""
+    extra = {key: value for key, value in entry.items() if key not in known_keys}
+    return json.dumps(extra, ensure_ascii=False, separators=(',', ':')) if extra else ''
+
+def check_entry_keys(card, field, entry, known_keys):
+    """List entries other than images have no extra column; refuse to drop their keys"""
+    if isinstance(entry, dict) and not entry.keys() <= set(known_keys):
+        unknown = ', '.join(sorted(set(entry) - set(known_keys)))
+        raise ValueError(f"{card.get('cardId')}: '{field}' entries have keys the catalog cannot store: {unknown}")
+
+def load_cards(input_file):
+    with open(input_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data['cards'] if isinstance(data, dict) else data
+
+def build_binary_catalog(cards, output_file):
+    """Write cards (db.json card dicts) to output_file; returns the number of records"""
+    strings = StringTable()
+    string_list = []
+    pairs = []
+    images = []
+    records = []
+
+    for card in cards:
+        values = [strings.add(card.get(field)) for field in STRING_FIELDS]
+        stats = [stat_int(card.get(field)) for field in INT_FIELDS]
+        values.extend(stats)
+        verbatim = {field for field, number in zip(INT_FIELDS, stats) if not stat_is_exact(card.get(field), number)}
+        for field, key in STRING_LIST_FIELDS:
+            entries = card.get(field) or []
+            values.extend((len(string_list), len(entries)))
+            for entry in entries:
+                if key:
+                    check_entry_keys(card, field, entry, (key,))
+                string_list.append(strings.add(entry.get(key) if key else entry))
+        set_entries = card.get('set') or []
+        values.extend((len(pairs), len(set_entries)))
+        for entry in set_entries:
+            check_entry_keys(card, 'set', entry, SET_KEYS)
+            pairs.append((strings.add(entry.get('set')), int(bool(entry.get('is_default')))))
+        image_entries = card.get('images') or []
+        values.extend((len(images), len(image_entries)))
+        images.extend(
+            (strings.add(image.get('image_url')), strings.add(image.get('label')), strings.add(image.get('artist')),
+             int(bool(image.get('is_default'))), strings.add(extra_json(image, IMAGE_KEYS)))
+            for image in image_entries
+        )
+        values.append(card.get('variantCount') or 0)
+        values.append(strings.add(extra_json(card, CARD_KEYS - verbatim)))
+        records.append(values)
+
+    slots = 1
+    while slots < 2 * len(records):
+        slots *= 2
+    table = [0] * slots
+    for number, card in enumerate(cards):
+        slot = index_slot(card.get('cardId') or '', slots - 1)
+        while table[slot]:
+            slot = (slot + 1) & (slots - 1)
+        table[slot] = number + 1
+
+    encoded = [text.encode('utf-8') for text in strings.values]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    sections = [
+        struct.pack(f'<{len(offsets)}I', *offsets),
+        b''.join(encoded),
+        b''.join(RECORD.pack(*values) for values in records),
+        struct.pack(f'<{len(string_list)}I', *string_list),
+        b''.join(PAIR.pack(*pair) for pair in pairs),
+        b''.join(IMAGE.pack(*image) for image in images),
+        struct.pack(f'<{slots}I', *table),
+    ]
+    section_offsets = []
+    position = HEADER.size
+    for section in sections:
+        position = (position + 7) & ~7
+        section_offsets.append(position)
+        position += len(section)
+
+    with atomic_write(output_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, CATALOG_VERSION, len(records), len(strings.values), len(string_list),
+                            len(pairs), slots, *section_offsets))
+        for offset, section in zip(section_offsets, sections):
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(section)
+    return len(records)
+
+class CardCatalog:
+    """Read-only, lazily decoded view of a binary catalog"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.count, self.string_count, _, _, self.slots, self.string_offsets, self.string_data,
+         self.records, self.string_lists, self.pairs, self.images, self.index) = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != CATALOG_VERSION:
+            self.mm.close()
+            raise ValueError(f"'{path}' is not a version {CATALOG_VERSION} card catalog")
+        self.string_cache = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.mm.close()
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for number in range(self.count):
+            yield self.card(number)
+
+    def string(self, index):
+        text = self.string_cache.get(index)
+        if text is None:
+            start, end = struct.unpack_from('<II', self.mm, self.string_offsets + 4 * index)
+            text = self.string_cache[index] = self.mm[self.string_data + start:self.string_data + end].decode('utf-8')
+        return text
+
+    def card_id(self, number):
+        return self.string(struct.unpack_from('<I', self.mm, self.records + RECORD.size * number)[0])
+
+    def find(self, card_id):
+        """Record number of a cardId, or None"""
+        mask = self.slots - 1
+        slot = index_slot(card_id, mask)
+        while True:
+            entry = struct.unpack_from('<I', self.mm, self.index + 4 * slot)[0]
+            if entry == 0:
+                return None
+            if self.card_id(entry - 1) == card_id:
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def get(self, card_id):
+        """The card as a db.json-shaped dict, or None"""
+        number = self.find(card_id)
+        return self.card(number) if number is not None else None
+
+    def card(self, number):
+        values = RECORD.unpack_from(self.mm, self.records + RECORD.size * number)
+        string = self.string
+        texts = {field: string(index) for field, index in zip(STRING_FIELDS, values[:6])}
+        stats = {field: None if value == NULL_INT else value for field, value in zip(INT_FIELDS, values[6:10])}
+
+        references = values[10:22]
+        lists = {}
+        for (field, key), start, count in zip(STRING_LIST_FIELDS, references[0:8:2], references[1:8:2]):
+            indexes = struct.unpack_from(f'<{count}I', self.mm, self.string_lists + 4 * start)
+            lists[field] = [string(index) if key is None else {key: string(index)} for index in indexes]
+        set_start, set_count, image_start, image_count = references[8:12]
+
+        card = {
+            'cardId': texts['cardId'],
+            'name': texts['name'],
+            'cardType': texts['cardType'],
+            **stats,
+            'attributes': lists['attributes'],
+            'traits': lists['traits'],
+            'colors': lists['colors'],
+            'images': [
+                self.image(IMAGE.unpack_from(self.mm, self.images + IMAGE.size * (image_start + i)))
+                for i in range(image_count)
+            ],
+            'effect_description': texts['effect_description'],
+            'trigger_description': texts['trigger_description'],
+            'rarity': texts['rarity'],
+            'set': [
+                {'set': string(name), 'is_default': bool(flags)}
+                for name, flags in (PAIR.unpack_from(self.mm, self.pairs + PAIR.size * (set_start + i)) for i in range(set_count))
+            ],
+        }
+        if values[22]:
+            card['variantCount'] = values[22]
+        if lists['keywords']:
+            card['keywords'] = lists['keywords']
+        extra = string(values[23])
+        if extra:
+            card.update(json.loads(extra))
+        return card
+
+    def image(self, values):
+        url, label, artist, flags, extra = values
+        image = {'image_url': self.string(url), 'label': self.string(label), 'artist': self.string(artist), 'is_default': bool(flags)}
+        extra = self.string(extra)
+        if extra:
+            image.update(json.loads(extra))
+        return image
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or query the binary card catalog')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build a catalog from db.json or a data/cards/<set>.json file')
+    build_parser.add_argument('input_json', help='Input JSON file with a "cards" list')
+    build_parser.add_argument('-o', '--output', help='Catalog file path (default: input.bin)')
+
+    get_parser = subparsers.add_parser('get', help='Print cards by cardId as JSON')
+    get_parser.add_argument('catalog', help='Catalog file path')
+    get_parser.add_argument('card_ids', nargs='+', help='Card IDs, e.g. OP01-001')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if not os.path.exists(args.input_json):
+            print(f"Error: Input file '{args.input_json}' not found.")
+            return
+        output = args.output or f"{os.path.splitext(args.input_json)[0]}.bin"
+        count = build_binary_catalog(load_cards(args.input_json), output)
+        print(f"Wrote {count} cards to '{output}' ({os.path.getsize(output) / 1024:.0f} KB)")
+        return
+
+    start = time.perf_counter()
+    with CardCatalog(args.catalog) as catalog:
+        cards = [catalog.get(card_id) for card_id in args.card_ids]
+        elapsed = time.perf_counter() - start
+        for card_id, card in zip(args.card_ids, cards):
+            if card is None:
+                print(f"Warning: {card_id} not found", file=sys.stderr)
+            else:
+                print(json.dumps(card, ensure_ascii=False, indent=2))
+    print(f"{sum(card is not None for card in cards)} card(s) found in {elapsed * 1000:.2f} ms", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
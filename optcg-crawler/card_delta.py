@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Card-level delta between two crawls.
+
+Each grouped component card (the convert_to_components.py output, one row per
+base cardId) is fingerprinted and compared with the previous snapshot. Only
+added, changed and removed cards are emitted, changed ones with the old and new
+value of every field that differs, as NDJSON:
+
+    {"op": "added", "cardId": "OP12-001", "card": {...}}
+    {"op": "changed", "cardId": "OP01-006", "fields": {"effect_description": {"old": ..., "new": ...}}}
+    {"op": "removed", "cardId": "P-999"}
+
+The snapshot is an NDJSON file of {cardId, fingerprint, card} lines.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+from atomic_io import atomic_write
+from card_table import CardTable
+from ndjson_io import NdjsonWriter, encode_json, iter_ndjson
+
+def decode_cell(text):
+    """Component array cells are compared as data, so re-encoding them does not count as a change"""
+    if text[:1] in ('[', '{'):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    return text
+
+def card_fingerprint(card):
+    return hashlib.blake2b(json.dumps(card, sort_keys=True, ensure_ascii=False).encode('utf-8'), digest_size=16).hexdigest()
+
+def read_component_cards(csv_file):
+    """{cardId: card} for a grouped component CSV, with component array cells decoded"""
+    table = CardTable.from_csv(csv_file)
+    decoded = {name: table.map_column(name, decode_cell) for name in table.fieldnames}
+    cards = {}
+    for row in range(len(table)):
+        card = {name: values[row] for name, values in decoded.items()}
+        cards[card['cardId']] = card
+    return cards
+
+def read_snapshot(snapshot_file):
+    """{cardId: (fingerprint, card)} from a snapshot file"""
+    return {entry['cardId']: (entry['fingerprint'], entry['card']) for entry in iter_ndjson(snapshot_file)}
+
+def write_snapshot(cards, snapshot_file):
+    with atomic_write(snapshot_file, 'wb') as f:
+        for card_id, card in cards.items():
+            f.write(encode_json({'cardId': card_id, 'fingerprint': card_fingerprint(card), 'card': card}) + b'\n')
+
+def field_changes(old_card, new_card):
+    return {
+        name: {'old': old_card.get(name), 'new': new_card.get(name)}
+        for name in list(new_card) + [name for name in old_card if name not in new_card]
+        if old_card.get(name) != new_card.get(name)
+    }
+
+def iter_card_delta(previous, cards):
+    """
+    Delta operations turning previous ({cardId: (fingerprint, card)}) into cards
+    ({cardId: card}); unchanged cards are skipped by fingerprint alone
+    """
+    for card_id, card in cards.items():
+        old = previous.get(card_id)
+        if old is None:
+            yield {'op': 'added', 'cardId': card_id, 'card': card}
+        elif old[0] != card_fingerprint(card):
+            yield {'op': 'changed', 'cardId': card_id, 'fields': field_changes(old[1], card)}
+    for card_id in previous:
+        if card_id not in cards:
+            yield {'op': 'removed', 'cardId': card_id}
+
+def export_card_delta(input_csv, snapshot_file, output_file, previous_csv=None, update_snapshot=False):
+    """Write the delta of input_csv against the snapshot (or previous_csv); returns {op: count}"""
+    cards = read_component_cards(input_csv)
+    if previous_csv:
+        previous = {card_id: (card_fingerprint(card), card) for card_id, card in read_component_cards(previous_csv).items()}
+    elif os.path.exists(snapshot_file):
+        previous = read_snapshot(snapshot_file)
+    else:
+        previous = {}
+
+    counts = {'added': 0, 'changed': 0, 'removed': 0}
+    with NdjsonWriter(output_file) as writer:
+        for operation in iter_card_delta(previous, cards):
+            writer.write(operation)
+            counts[operation['op']] += 1
+    counts['unchanged'] = len(cards) - counts['added'] - counts['changed']
+
+    if update_snapshot:
+        write_snapshot(cards, snapshot_file)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Export only the cards that changed since the previous snapshot')
+    parser.add_argument('input_csv', help='Grouped component CSV (convert_to_components.py output)')
+    parser.add_argument('-o', '--output', help='Delta NDJSON path (default: input_delta.ndjson)')
+    parser.add_argument('-s', '--snapshot', help='Snapshot file path (default: input_snapshot.ndjson)')
+    parser.add_argument('-p', '--previous', help='Compare against this earlier component CSV instead of the snapshot')
+    parser.add_argument('-u', '--update-snapshot', action='store_true', help='Replace the snapshot with the current cards afterwards')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_csv):
+        print(f"Error: Input file '{args.input_csv}' not found.")
+        return
+    if args.previous and not os.path.exists(args.previous):
+        print(f"Error: Previous file '{args.previous}' not found.")
+        return
+
+    base_name = os.path.splitext(args.input_csv)[0]
+    output_file = args.output or f"{base_name}_delta.ndjson"
+    snapshot_file = args.snapshot or f"{base_name}_snapshot.ndjson"
+
+    counts = export_card_delta(args.input_csv, snapshot_file, output_file, args.previous, args.update_snapshot)
+    print(f"Delta written to '{output_file}': {counts['added']} added, {counts['changed']} changed, "
+          f"{counts['removed']} removed, {counts['unchanged']} unchanged")
+    if args.update_snapshot:
+        print(f"Snapshot updated: {snapshot_file}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""
+Declarative spec of the card fields read from a card list page, compiled into an
+extraction plan shared by both extractor backends of parse_cardlist_to_csv.py.
+
+CARD_SOURCES says where each raw value lives inside a dl.modalCol card:
+
+    key: (selector, mode)
+
+A selector is "", "tag.class", ".class" or "tag", optionally scoped by one
+ancestor ("scope child", e.g. ".infoCol span"). A scope is the first element
+matching it, resolved once per card and shared by every source under it. Modes:
+
+    full    text of the first match, including descendants
+    direct  first non-blank text node directly inside the first match
+    each    list with the full text of every match
+    @name   attribute of the first match ("" selects the card element itself)
+
+A value is None (or [] for each) when nothing matched. CARD_FIELD_SPEC then
+turns the raw values into the output fields, in CSV order, through named
+post-processing steps from FIELD_STEPS. compile_plan() parses the selectors and
+resolves the steps once; the resulting ExtractionPlan is what the extractors run
+per card, so adding a field or a layout is a spec edit rather than another pass.
+While --profile is active, build() also times every output field.
+"""
+
+import re
+import time
+from typing import NamedTuple, Optional
+
+import profiling
+from card_ids import decode_card_id
+
+# The element holding one card
+CARD_SELECTOR = 'dl.modalCol'
+
+CARD_SOURCES = {
+    'id': ('', '@id'),
+    'name': ('.cardName', 'full'),
+    'infoSpans': ('.infoCol span', 'each'),
+    'cost': ('.cost', 'direct'),
+    'costLabel': ('.cost h3', 'full'),
+    'attribute': ('.attribute i', 'full'),
+    'power': ('.power', 'direct'),
+    'counter': ('.counter', 'direct'),
+    'color': ('.color', 'direct'),
+    'feature': ('.feature', 'direct'),
+    'img': ('img.lazy', '@data-src'),
+    'effect': ('.text', 'full'),
+    'trigger': ('.trigger', 'full'),
+}
+
+# (output field, raw key, post-processing steps); steps run left to right and may
+# read the raw values and the fields built before them
+CARD_FIELD_SPEC = [
+    ('cardId', 'id', ('strip',)),
+    ('name', 'name', ('strip',)),
+    ('cardType', 'infoSpans', ('item:2', 'strip', 'upper')),
+    ('life', 'cost', ('leader_life',)),
+    ('cost', 'cost', ('unless_leader',)),
+    ('power', 'power', ('power_from_effect',)),
+    ('attribute', 'attribute', ('strip',)),
+    ('types', 'feature', ('split_slash',)),
+    ('counter', 'counter', ('text',)),
+    ('color', 'color', ('text',)),
+    ('imageUrl', 'img', ('image_url',)),
+    ('localImage', 'id', ('local_image',)),
+    ('effectText', 'effect', ('drop_effect_label',)),
+    ('triggerText', 'trigger', ('clean_trigger',)),
+    ('rarity', 'infoSpans', ('item:1', 'strip', 'id_rarity_fallback')),
+    ('set', 'id', ('set_name',)),
+]
+
+SOURCE_MODES = ('full', 'direct', 'each')
+POWER_IN_TEXT = re.compile(r'(\d+)\s*power', re.IGNORECASE)
+
+# Helper to build full image URL if needed
+def build_image_url(data_src):
+    if data_src.startswith('..'):
+        return 'https://en.onepiece-cardgame.com' + data_src[2:]
+    return data_src
+
+def clean_trigger_text(text):
+    """Strip the "Trigger" label and any leading [...] marker from trigger text"""
+    trigger_text = text.replace('Trigger', '').strip()
+    # Remove leading symbols like [] from trigger text
+    if trigger_text.startswith('[]'):
+        trigger_text = trigger_text[2:].strip()
+    elif trigger_text.startswith('['):
+        # Find the closing bracket and remove everything up to it
+        end_bracket = trigger_text.find(']')
+        if end_bracket != -1:
+            trigger_text = trigger_text[end_bracket + 1:].strip()
+    return trigger_text
+
+def text_of(value):
+    return value if value is not None else ''
+
+def leader_life(value, raw, card):
+    # For leaders, the life value is in the .cost div with "Life" as the h3 text
+    label = raw.get('costLabel')
+    return text_of(value) if card['cardType'] == 'LEADER' and label is not None and label.strip() == 'Life' else ''
+
+def power_from_effect(value, raw, card):
+    if value is not None:
+        return value
+    # No .power element: look for a "5000 power" pattern in the effect text
+    effect = raw.get('effect')
+    match = POWER_IN_TEXT.search(effect) if effect is not None else None
+    return match.group(1) if match else ''
+
+def id_rarity_fallback(value, raw, card):
+    return value or decode_card_id(card['cardId']).id_rarity
+
+# Post-processing steps: step(value, raw values, card so far) -> value
+FIELD_STEPS = {
+    'text': lambda value, raw, card: text_of(value),
+    'strip': lambda value, raw, card: text_of(value).strip(),
+    'upper': lambda value, raw, card: value.upper(),
+    'split_slash': lambda value, raw, card: ', '.join(part.strip() for part in text_of(value).split('/') if part.strip()),
+    'image_url': lambda value, raw, card: build_image_url(value) if value is not None else '',
+    'local_image': lambda value, raw, card: f"{card['cardId']}.jpg" if card['cardId'] else '',
+    'drop_effect_label': lambda value, raw, card: text_of(value).replace('Effect', '').strip(),
+    'clean_trigger': lambda value, raw, card: clean_trigger_text(value) if value is not None else '',
+    'unless_leader': lambda value, raw, card: '' if card['cardType'] == 'LEADER' else text_of(value),
+    'leader_life': leader_life,
+    'power_from_effect': power_from_effect,
+    'id_rarity_fallback': id_rarity_fallback,
+    'set_name': lambda value, raw, card: decode_card_id(card['cardId']).set_name,
+}
+
+def item_step(position):
+    return lambda value, raw, card: value[position] if len(value) > position else ''
+
+class Matcher(NamedTuple):
+    """One compound selector: a tag name and/or a class, None standing for any"""
+    tag: Optional[str]
+    cls: Optional[str]
+
+    def matches(self, tag, classes):
+        return (self.tag is None or self.tag == tag) and (self.cls is None or self.cls in classes)
+
+    def find_kwargs(self):
+        """BeautifulSoup find()/find_all() arguments for this selector"""
+        return {'name': self.tag or True, 'class_': self.cls} if self.cls else {'name': self.tag or True}
+
+class Source(NamedTuple):
+    key: str
+    matcher: Optional[Matcher]
+    mode: str
+    attr: Optional[str]
+
+def parse_matcher(text):
+    tag, _, cls = text.partition('.')
+    if not re.fullmatch(r'[a-z0-9]*', tag) or not re.fullmatch(r'[\w-]*', cls) or not (tag or cls):
+        raise ValueError(f"Unsupported selector '{text}' (expected tag, .class or tag.class)")
+    return Matcher(tag or None, cls or None)
+
+class ExtractionPlan:
+    """
+    Compiled CARD_SOURCES/CARD_FIELD_SPEC: parsed matchers grouped by scope and the
+    post-processing steps of every field resolved to functions
+    """
+
+    def __init__(self, sources, field_spec):
+        self.card = parse_matcher(CARD_SELECTOR)
+        self.root = []
+        self.top = []
+        # scope Matcher -> sources inside it, in spec order
+        self.scoped = {}
+        for key, (selector, mode) in sources.items():
+            attr = mode[1:] if mode.startswith('@') else None
+            if attr is None and mode not in SOURCE_MODES:
+                raise ValueError(f"Source '{key}' has an unknown mode '{mode}'")
+            parts = selector.split()
+            if not parts:
+                if attr is None:
+                    raise ValueError(f"Source '{key}' on the card element must read an attribute")
+                self.root.append(Source(key, None, mode, attr))
+            elif len(parts) == 1:
+                self.top.append(Source(key, parse_matcher(parts[0]), mode, attr))
+            elif len(parts) == 2:
+                self.scoped.setdefault(parse_matcher(parts[0]), []).append(Source(key, parse_matcher(parts[1]), mode, attr))
+            else:
+                raise ValueError(f"Source '{key}' selector '{selector}' nests deeper than one scope")
+        self.keys = list(sources)
+        # Top-level sources by class (or by tag for class-less selectors), so a streaming
+        # extractor only tests the sources an element could match
+        self.top_by_class = {}
+        self.top_by_tag = {}
+        for source in self.top:
+            if source.matcher.cls:
+                self.top_by_class.setdefault(source.matcher.cls, []).append(source)
+            else:
+                self.top_by_tag.setdefault(source.matcher.tag, []).append(source)
+        self.scope_classes = frozenset(scope.cls for scope in self.scoped if scope.cls)
+        self.scope_tags = frozenset(scope.tag for scope in self.scoped if not scope.cls)
+        self.modes = {key: mode for key, (_, mode) in sources.items()}
+
+        self.fields = []
+        for field, key, steps in field_spec:
+            if key not in sources:
+                raise ValueError(f"Field '{field}' reads unknown source '{key}'")
+            functions = []
+            for step in steps:
+                name, _, argument = step.partition(':')
+                if name == 'item':
+                    functions.append(item_step(int(argument)))
+                elif name in FIELD_STEPS:
+                    functions.append(FIELD_STEPS[name])
+                else:
+                    raise ValueError(f"Field '{field}' uses unknown step '{step}'")
+            self.fields.append((field, key, tuple(functions)))
+        self.fieldnames = [field for field, _, _ in self.fields]
+
+    def build(self, raw):
+        """Output card dict from the raw values of one card"""
+        if profiling.ACTIVE is not None:
+            return self.build_timed(raw, profiling.ACTIVE.fields)
+        card = {}
+        for field, key, steps in self.fields:
+            value = raw.get(key)
+            for step in steps:
+                value = step(value, raw, card)
+            card[field] = value
+        return card
+
+    def build_timed(self, raw, stats):
+        """build(), adding each field's calls and seconds to stats ({field: {'calls', 'seconds'}})"""
+        card = {}
+        for field, key, steps in self.fields:
+            start = time.perf_counter()
+            value = raw.get(key)
+            for step in steps:
+                value = step(value, raw, card)
+            card[field] = value
+            field_stats = stats.get(field)
+            if field_stats is None:
+                field_stats = stats[field] = {'calls': 0, 'seconds': 0.0}
+            field_stats['calls'] += 1
+            field_stats['seconds'] += time.perf_counter() - start
+        return card
+
+    def read_soup(self, element):
+        """Raw values of one BeautifulSoup card element; each scope is looked up once"""
+        raw = {}
+        for source in self.root:
+            value = element.get(source.attr)
+            raw[source.key] = (value[0] if isinstance(value, list) else value) if value is not None else None
+        for source in self.top:
+            raw[source.key] = soup_value(element, source)
+        for scope, sources in self.scoped.items():
+            scope_element = element.find(**scope.find_kwargs())
+            for source in sources:
+                raw[source.key] = soup_value(scope_element, source) if scope_element is not None else ([] if source.mode == 'each' else None)
+        return raw
+
+    def extract_soup(self, soup):
+        return [self.build(self.read_soup(element)) for element in soup.find_all(**self.card.find_kwargs())]
+
+def get_direct_text(tag):
+    if tag:
+        # Get all direct text nodes (not from children)
+        texts = [t for t in tag.find_all(string=True, recursive=False) if t.strip()]
+        return texts[0].strip() if texts else ''
+    return ''
+
+def soup_value(element, source):
+    if source.mode == 'each':
+        return [match.text for match in element.find_all(**source.matcher.find_kwargs())]
+    match = element.find(**source.matcher.find_kwargs())
+    if match is None:
+        return None
+    if source.attr is not None:
+        return match.get(source.attr) if match.has_attr(source.attr) else None
+    if source.mode == 'direct':
+        return get_direct_text(match)
+    return match.text
+
+def compile_plan(sources=CARD_SOURCES, field_spec=CARD_FIELD_SPEC):
+    return ExtractionPlan(sources, field_spec)
+
+# The plan for the official card list layout
+CARD_PLAN = compile_plan()
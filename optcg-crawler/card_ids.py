@@ -0,0 +1,128 @@
+"""
+Card ID decoding shared by the parsing and conversion scripts. An ID such as
+"OP01-001_p2" is parsed once into a CardIdInfo record holding everything the
+scripts derive from it (base ID, set, variant, fallback rarity).
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Set code to full name mapping
+SET_CODE_MAPPING = {
+    'OP01': 'OP01 - Romance Dawn',
+    'OP02': 'OP02 - Paramount War',
+    'OP03': 'OP03 - Pillars of Strength',
+    'OP04': 'OP04 - Kingdoms of Intrigue',
+    'OP05': 'OP05 - Awakening of the New Era',
+    'OP06': 'OP06 - Wings of the Captain',
+    'OP07': 'OP07 - 500 Years in the Future',
+    'OP08': 'OP08 - Two Legends',
+    'OP09': 'OP09 - Emperors in the New World',
+    'OP10': 'OP10 - Royal Blood',
+    'OP11': 'OP11 - A Fist of Divine Speed',
+    'EB01': 'EB01 - Memorial Collection',
+    'EB02': 'EB02 - Anime 25th Collection',
+    'PRB01': 'PRB01 - One Piece The Best',
+    'ST01': 'ST01 - Straw Hat Crew',
+    'ST02': 'ST02 - Worst Generation',
+    'ST03': 'ST03 - The Seven Warlords of the Sea',
+    'ST04': 'ST04 - Animal Kingdom Pirates',
+    'ST05': 'ST05 - One Piece Film Edition',
+    'ST06': 'ST06 - Absolute Justice',
+    'ST07': 'ST07 - Big Mom Pirates',
+    'ST08': 'ST08 - Monkey D. Luffy',
+    'ST09': 'ST09 - Yamato',
+    'ST10': 'ST10 - The Three Captains',
+    'ST11': 'ST11 - Uta',
+    'ST12': 'ST12 - Zoro & Sanji',
+    'ST13': 'ST13 - The Three Brothers',
+    'ST14': 'ST14 - 3D2Y',
+    'ST15': 'ST15 - Edward.Newgate',
+    'ST16': 'ST16 - Uta',
+    'ST17': 'ST17 - Donquixote Doflamingo',
+    'ST18': 'ST18 - Monkey.D.Luffy',
+    'ST19': 'ST19 - Smoker',
+    'ST20': 'ST20 - Charlotte Katakuri',
+    'ST21': 'ST21 - EX - Gear 5',
+    'ST22': 'ST22 - Ace & Newgate',
+    'ST23': 'ST23 - Shanks',
+    'ST24': 'ST24 - Jewelry Bonney',
+    'ST25': 'ST25 - Buggy',
+    'ST26': 'ST26 - Monkey.D.Luffy',
+    'ST27': 'ST27 - Marshall.D.Teach',
+    'ST28': 'ST28 - Yamato',
+    'P': 'Promotional Cards'
+}
+
+# "P-001", "OP01-001", "PRB01-001_p2": optional promo/set prefix, number, optional _pN variant
+CARD_ID_PATTERN = re.compile(r'(?:(?P<promo>P)-|(?P<set>[A-Z]{2,3}\d{2}))?(?P<rest>.*?)(?:_p(?P<variant>\d+))?', re.DOTALL)
+
+# Rarity guessed from the ID when the page has none, checked in this order
+ID_RARITY_MARKERS = (('_p', 'P'), ('_r', 'R'), ('_sr', 'SR'), ('_sec', 'SEC'), ('_l', 'L'), ('don', 'DON'))
+
+class CardIdInfo(NamedTuple):
+    card_id: str
+    base_id: str
+    set_code: str
+    number: str
+    variant: Optional[int]
+    variant_label: str
+    is_promo: bool
+    set_name: str
+    id_rarity: str
+
+@lru_cache(maxsize=65536)
+def decode_card_id(card_id):
+    """Decode a card ID into a CardIdInfo record"""
+    if not card_id:
+        return CardIdInfo(card_id, card_id, '', '', None, 'default', False, '', '')
+
+    match = CARD_ID_PATTERN.fullmatch(card_id)
+    is_promo = match.group('promo') is not None
+    set_code = 'P' if is_promo else (match.group('set') or '')
+    rest = match.group('rest')
+    number = rest[1:] if rest.startswith('-') else rest
+
+    variant_digits = match.group('variant')
+    if variant_digits is None:
+        base_id, variant, variant_label = card_id, None, 'default'
+    else:
+        base_id = card_id[:-(len(variant_digits) + 2)]
+        variant, variant_label = int(variant_digits), f"p{variant_digits}"
+
+    if is_promo:
+        set_name = SET_CODE_MAPPING.get('P', 'Promotional Cards')
+    else:
+        set_name = SET_CODE_MAPPING.get(set_code, '')
+
+    card_id_lower = card_id.lower()
+    id_rarity = next((rarity for marker, rarity in ID_RARITY_MARKERS if marker in card_id_lower), 'C')
+
+    return CardIdInfo(card_id, base_id, set_code, number, variant, variant_label, is_promo, set_name, id_rarity)
+
+def decode_card_ids(card_ids):
+    """Decode a whole column of card IDs, decoding each distinct ID only once"""
+    decoded = {}
+    records = []
+    for card_id in card_ids:
+        info = decoded.get(card_id)
+        if info is None:
+            info = decoded[card_id] = decode_card_id(card_id)
+        records.append(info)
+    return records
+
+def get_base_card_id(card_id):
+    """Strip _pX or similar suffixes to get the base cardId."""
+    return decode_card_id(card_id).base_id
+
+def get_variant_label(card_id):
+    return decode_card_id(card_id).variant_label
+
+def determine_rarity_from_card_id(card_id):
+    """Determine rarity from card ID patterns"""
+    return decode_card_id(card_id).id_rarity
+
+def extract_set_from_card_id(card_id):
+    """Extract set code from card ID and map to full set name"""
+    return decode_card_id(card_id).set_name
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Bitset index over card facets (traits, colors, attributes, card type, set,
+rarity, cost, power, counter) for fast deck-building queries.
+
+Each facet value maps to a bitset (a Python int) with one bit per card, so a
+compound filter like "Red Straw Hat Crew characters with cost <= 3" is a handful
+of integer ANDs/ORs instead of a scan over the catalog.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from card_table import CardTable
+
+INDEX_VERSION = 1
+
+# Facet name -> (column in the raw parser CSV, separator) / column in the component CSV
+RAW_FACET_COLUMNS = {
+    'trait': ('types', ', '),
+    'color': ('color', '/'),
+    'attribute': ('attribute', '/'),
+}
+COMPONENT_FACET_COLUMNS = {
+    'trait': 'traits',
+    'color': 'colors',
+    'attribute': 'attributes',
+}
+SINGLE_VALUE_FACETS = {
+    'type': 'cardType',
+    'set': 'set',
+    'rarity': 'rarity',
+    'cost': 'cost',
+    'power': 'power',
+    'counter': 'counter',
+}
+NUMERIC_FACETS = {'cost', 'power', 'counter'}
+
+CONDITION_PATTERN = re.compile(r'^\s*([A-Za-z]+)\s*(<=|>=|!=|=|<|>)\s*(.*?)\s*$')
+
+def split_values(text, separator):
+    return [value.strip() for value in text.split(separator) if value.strip()] if text else []
+
+def parse_component_array(text):
+    """
+    Values of a component array cell such as '[{"name": "Red", "value": "Red"}]'.
+    Raises ValueError for a cell that is not a JSON array, e.g. one written by older
+    converters with str(list).replace("'", '"'), which turns "Weevil's Mother" into
+    "Weevil"s Mother".
+    """
+    if not text:
+        return []
+    try:
+        components = json.loads(text)
+    except ValueError as e:
+        raise ValueError(f"unparseable component array: {e}") from None
+    if not isinstance(components, list):
+        raise ValueError('unparseable component array: not a JSON array')
+    return [component['value'] for component in components if isinstance(component, dict) and component.get('value')]
+
+def component_array_or_none(text):
+    try:
+        return parse_component_array(text)
+    except ValueError:
+        return None
+
+def facet_value_lists(table, malformed=None):
+    """
+    Per-row value lists for every facet, parsed once per distinct cell value. Component
+    cells that cannot be parsed count as empty and are appended to malformed as
+    {'row', 'cardId', 'error'} (row is 1-based).
+    """
+    facets = {}
+    for facet, (column, separator) in RAW_FACET_COLUMNS.items():
+        if column in table.columns:
+            facets[facet] = table.map_column(column, lambda text, separator=separator: split_values(text, separator))
+        elif COMPONENT_FACET_COLUMNS[facet] in table.columns:
+            column = COMPONENT_FACET_COLUMNS[facet]
+            value_lists = facets[facet] = table.map_column(column, component_array_or_none)
+            for row, values in enumerate(value_lists):
+                if values is None:
+                    value_lists[row] = []
+                    if malformed is not None:
+                        malformed.append({'row': row + 1, 'cardId': table.get('cardId', row),
+                                          'error': f"unparseable '{column}' cell"})
+    for facet, column in SINGLE_VALUE_FACETS.items():
+        if column in table.columns:
+            facets[facet] = table.map_column(column, lambda text: [text.strip()] if text.strip() else [])
+    return facets
+
+class CardIndex:
+    """Card IDs plus a {facet: {value: bitset}} map; bit i stands for card_ids[i]"""
+
+    def __init__(self, card_ids, facets, malformed=None):
+        self.card_ids = card_ids
+        self.facets = facets
+        self.all_cards = (1 << len(card_ids)) - 1
+        # Rows whose component cells could not be parsed when the index was built
+        self.malformed = malformed or []
+
+    @classmethod
+    def from_table(cls, table):
+        facets = {}
+        malformed = []
+        for facet, value_lists in facet_value_lists(table, malformed).items():
+            bitsets = facets[facet] = {}
+            for row, values in enumerate(value_lists):
+                bit = 1 << row
+                for value in values:
+                    bitsets[value] = bitsets.get(value, 0) | bit
+        return cls(table.column('cardId'), facets, malformed)
+
+    @classmethod
+    def load(cls, index_file):
+        with open(index_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported card index version {data.get('version')} in '{index_file}'")
+        facets = {
+            facet: {value: int(bits, 16) for value, bits in bitsets.items()}
+            for facet, bitsets in data['facets'].items()
+        }
+        return cls(data['cards'], facets)
+
+    def save(self, index_file):
+        data = {
+            'version': INDEX_VERSION,
+            'cards': self.card_ids,
+            'facets': {
+                facet: {value: format(bits, 'x') for value, bits in sorted(bitsets.items())}
+                for facet, bitsets in self.facets.items()
+            },
+        }
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+    def values(self, facet):
+        """{value: card count} for a facet"""
+        return {value: bin(bits).count('1') for value, bits in self.facets.get(facet, {}).items()}
+
+    def match(self, facet, op, value):
+        """Bitset of cards whose facet compares to value; '|' in value means any of several values"""
+        if facet not in self.facets:
+            raise ValueError(f"Unknown facet '{facet}' (available: {', '.join(sorted(self.facets))})")
+        bitsets = self.facets[facet]
+        if op in ('=', '!='):
+            bits = 0
+            for option in value.split('|'):
+                bits |= bitsets.get(option.strip(), 0)
+            return bits if op == '=' else self.all_cards & ~bits
+
+        if facet not in NUMERIC_FACETS:
+            raise ValueError(f"Facet '{facet}' does not support '{op}'")
+        limit = int(value)
+        compare = {
+            '<': lambda number: number < limit,
+            '<=': lambda number: number <= limit,
+            '>': lambda number: number > limit,
+            '>=': lambda number: number >= limit,
+        }[op]
+        bits = 0
+        for key, key_bits in bitsets.items():
+            if key.isdigit() and compare(int(key)):
+                bits |= key_bits
+        return bits
+
+    def query(self, conditions):
+        """AND together (facet, op, value) conditions and return the matching card IDs"""
+        bits = self.all_cards
+        for facet, op, value in conditions:
+            bits &= self.match(facet, op, value)
+            if not bits:
+                break
+        return self.ids(bits)
+
+    def ids(self, bits):
+        card_ids = []
+        while bits:
+            low_bit = bits & -bits
+            card_ids.append(self.card_ids[low_bit.bit_length() - 1])
+            bits ^= low_bit
+        return card_ids
+
+def parse_condition(text):
+    """'cost<=3' -> ('cost', '<=', '3')"""
+    match = CONDITION_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid condition '{text}', expected e.g. 'color=Red' or 'cost<=3'")
+    return match.group(1).lower(), match.group(2), match.group(3)
+
+def build_index_file(input_csv, index_file=None):
+    """Build the bitset index for a card CSV (raw or component layout) and save it"""
+    if index_file is None:
+        base_name = os.path.splitext(input_csv)[0]
+        index_file = f"{base_name}_index.json"
+    index = CardIndex.from_table(CardTable.from_csv(input_csv))
+    index.save(index_file)
+    print(f"Indexed {len(index.card_ids)} cards across {len(index.facets)} facets: {index_file}")
+    for row in index.malformed:
+        print(f"Warning: row {row['row']} ({row['cardId'] or 'no cardId'}): {row['error']}, indexed without those values", file=sys.stderr)
+    return index_file
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and query the card facet bitset index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build an index from a card CSV')
+    build_parser.add_argument('input_csv', help='Card CSV (all_cards.csv or a component CSV)')
+    build_parser.add_argument('-o', '--output', help='Index file path (default: input_index.json)')
+
+    query_parser = subparsers.add_parser('query', help='List cards matching every condition')
+    query_parser.add_argument('index', help='Index file path')
+    query_parser.add_argument('conditions', nargs='+', help="Conditions such as 'color=Red' 'trait=Straw Hat Crew' 'type=CHARACTER' 'cost<=3'; use | for alternatives")
+
+    values_parser = subparsers.add_parser('values', help='List the values of a facet with card counts')
+    values_parser.add_argument('index', help='Index file path')
+    values_parser.add_argument('facet', help='Facet name, e.g. trait')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if not os.path.exists(args.input_csv):
+            print(f"Error: Input file '{args.input_csv}' not found.")
+            return
+        build_index_file(args.input_csv, args.output)
+        return
+
+    index = CardIndex.load(args.index)
+    if args.command == 'values':
+        for value, count in sorted(index.values(args.facet).items()):
+            print(f"{value}\t{count}")
+        return
+
+    try:
+        conditions = [parse_condition(text) for text in args.conditions]
+        start = time.perf_counter()
+        card_ids = index.query(conditions)
+        elapsed = time.perf_counter() - start
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for card_id in card_ids:
+        print(card_id)
+    print(f"{len(card_ids)} card(s) matched in {elapsed * 1e6:.0f} µs", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Read-only local HTTP service for card lookups over db.json.
+
+The catalog is parsed once into an in-memory snapshot: cards keyed by cardId,
+a lowercase name index and a CardIndex bitset index over traits, colors,
+attributes, type, set, rarity, cost, power and counter. Every card is also
+pre-encoded, so a batch response is a join of ready-made JSON.
+
+    GET  /cards/OP01-001                      one card (variant IDs resolve to the base card)
+    GET  /cards?ids=OP01-001,OP01-016         batch lookup: {"cards": [...], "missing": [...]}
+    POST /cards  {"ids": [...]}               same, for batches too long for a URL
+    GET  /search?color=Red&trait=Straw Hat Crew&where=cost<=3&name=luffy&limit=20
+    GET  /status                              catalog version, card count and cache stats
+
+GET responses carry an ETag derived from the catalog content; a matching
+If-None-Match gets 304 Not Modified. Responses to repeated GETs come from an LRU
+cache that belongs to the snapshot. A watcher thread polls the catalog file and,
+when a new build is written (build_catalog.py replaces db.json atomically),
+loads a fresh snapshot and swaps it in; requests in flight finish against the
+snapshot they started with.
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from card_ids import decode_card_id
+from card_index import CardIndex, parse_condition
+from ndjson_io import decode_json, encode_json
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_JSON = os.path.join(REPO_ROOT, 'db.json')
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_LIMIT = 100
+MAX_BATCH = 5000
+# Largest POST body read; MAX_BATCH IDs fit well within it
+MAX_BODY = 1 << 20
+
+# Facet -> values of a db.json card; the names match card_index.py
+CARD_FACETS = {
+    'trait': lambda card: [entry['trait'] for entry in card.get('traits') or []],
+    'color': lambda card: [entry['color'] for entry in card.get('colors') or []],
+    'attribute': lambda card: [entry['attribute'] for entry in card.get('attributes') or []],
+    'type': lambda card: [card['cardType']] if card.get('cardType') else [],
+    'set': lambda card: [entry['set'] for entry in card.get('set') or []],
+    'rarity': lambda card: [card['rarity']] if card.get('rarity') else [],
+    'cost': lambda card: [str(card['cost'])] if card.get('cost') is not None else [],
+    'power': lambda card: [str(card['power'])] if card.get('power') is not None else [],
+    'counter': lambda card: [str(card['counter'])] if card.get('counter') is not None else [],
+}
+SEARCH_PARAMETERS = {'where', 'name', 'limit', 'offset'}
+
+class RequestError(ValueError):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class LruCache:
+    """Thread-safe bounded {key: value} map evicting the least recently used entry"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            return {'size': len(self.entries), 'maxSize': self.max_size, 'hits': self.hits, 'misses': self.misses}
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+class CatalogSnapshot:
+    """One immutable load of the catalog with its indexes and response cache"""
+
+    def __init__(self, path, cache_size=DEFAULT_CACHE_SIZE):
+        self.path = path
+        self.signature = file_signature(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.version = hashlib.sha1(data).hexdigest()[:16]
+        self.etag = f'"{self.version}"'
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        parsed = decode_json(data)
+        cards = parsed['cards'] if isinstance(parsed, dict) else parsed
+
+        self.card_ids = []
+        self.encoded = {}
+        self.names = {}
+        facets = {facet: {} for facet in CARD_FACETS}
+        for card in cards:
+            card_id = card['cardId']
+            if card_id in self.encoded:
+                continue
+            bit = 1 << len(self.card_ids)
+            self.card_ids.append(card_id)
+            self.encoded[card_id] = encode_json(card)
+            self.names.setdefault((card.get('name') or '').lower(), []).append(card_id)
+            for facet, values_of in CARD_FACETS.items():
+                bitsets = facets[facet]
+                for value in values_of(card):
+                    bitsets[value] = bitsets.get(value, 0) | bit
+        self.index = CardIndex(self.card_ids, facets)
+        self.cache = LruCache(cache_size)
+
+    def resolve(self, card_id):
+        """The catalog cardId for a requested ID (exact, else its base card), or None"""
+        card_id = card_id.strip()
+        if card_id in self.encoded:
+            return card_id
+        base_id = decode_card_id(card_id).base_id
+        return base_id if base_id in self.encoded else None
+
+    def card(self, card_id):
+        resolved = self.resolve(card_id)
+        if resolved is None:
+            raise RequestError(404, f"Card '{card_id}' not found")
+        return self.encoded[resolved]
+
+    def batch(self, card_ids):
+        if len(card_ids) > MAX_BATCH:
+            raise RequestError(400, f"At most {MAX_BATCH} IDs per batch")
+        found = []
+        missing = []
+        for card_id in card_ids:
+            resolved = self.resolve(card_id)
+            if resolved is None:
+                missing.append(card_id)
+            else:
+                found.append(self.encoded[resolved])
+        return b'{"cards":[' + b','.join(found) + b'],"missing":' + encode_json(missing) + b'}'
+
+    def search(self, parameters):
+        """Cards matching facet=value (| for alternatives), where=<condition> and name=<substring> filters"""
+        conditions = []
+        name = None
+        limit = DEFAULT_LIMIT
+        offset = 0
+        try:
+            for key, value in parameters:
+                if key == 'where':
+                    conditions.append(parse_condition(value))
+                elif key == 'name':
+                    name = value.strip().lower()
+                elif key == 'limit':
+                    limit = max(int(value), 0)
+                elif key == 'offset':
+                    offset = max(int(value), 0)
+                elif key in CARD_FACETS:
+                    conditions.append((key, '=', value))
+                else:
+                    raise ValueError(f"Unknown search parameter '{key}' (available: {', '.join(sorted(set(CARD_FACETS) | SEARCH_PARAMETERS))})")
+            card_ids = self.index.query(conditions)
+        except ValueError as e:
+            raise RequestError(400, str(e))
+        if name:
+            # Scan the distinct names rather than every card
+            named = {card_id for card_name, name_ids in self.names.items() if name in card_name for card_id in name_ids}
+            card_ids = [card_id for card_id in card_ids if card_id in named]
+        page = card_ids[offset:offset + limit]
+        return (b'{"total":' + str(len(card_ids)).encode('ascii') + b',"cards":['
+                + b','.join(self.encoded[card_id] for card_id in page) + b']}')
+
+    def status(self):
+        return {
+            'source': self.path,
+            'version': self.version,
+            'loadedAt': self.loaded_at,
+            'cards': len(self.card_ids),
+            'facets': sorted(CARD_FACETS),
+            'cache': self.cache.stats(),
+        }
+
+class CatalogServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, catalog_path, cache_size=DEFAULT_CACHE_SIZE, quiet=False):
+        self.catalog_path = catalog_path
+        self.cache_size = cache_size
+        self.quiet = quiet
+        self.snapshot = CatalogSnapshot(catalog_path, cache_size)
+        # Signature of the last catalog file that failed to load, so it is reported once
+        self.failed_signature = None
+        self.stopping = threading.Event()
+        super().__init__(address, CatalogRequestHandler)
+
+    def reload_if_changed(self):
+        """Swap in a new snapshot when the catalog file changed; returns True if it did"""
+        signature = 'missing'
+        try:
+            signature = file_signature(self.catalog_path)
+            if signature in (self.snapshot.signature, self.failed_signature):
+                return False
+            snapshot = CatalogSnapshot(self.catalog_path, self.cache_size)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Keep serving the previous snapshot until a readable build lands
+            if signature != self.failed_signature:
+                print(f"Warning: Could not reload '{self.catalog_path}': {e}")
+                self.failed_signature = signature
+            return False
+        self.failed_signature = None
+        self.snapshot = snapshot
+        print(f"Reloaded {len(snapshot.card_ids)} cards from '{self.catalog_path}' (version {snapshot.version})")
+        return True
+
+    def watch(self, interval):
+        while not self.stopping.wait(interval):
+            self.reload_if_changed()
+
+    def server_close(self):
+        self.stopping.set()
+        super().server_close()
+
+class CatalogRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'OPCGCardServer/1'
+
+    def do_GET(self):
+        snapshot = self.server.snapshot
+        url = urlsplit(self.path)
+        parameters = parse_qsl(url.query, keep_blank_values=False)
+        if url.path == '/status':
+            self.send_json(200, encode_json(snapshot.status()))
+            return
+        if self.etag_matches(snapshot.etag):
+            self.send_json(304, b'', snapshot.etag)
+            return
+
+        key = (url.path, tuple(sorted(parameters)))
+        body = snapshot.cache.get(key)
+        if body is None:
+            try:
+                body = self.route(snapshot, url.path, parameters)
+            except RequestError as e:
+                self.send_error_json(e.status, str(e))
+                return
+            snapshot.cache.put(key, body)
+        self.send_json(200, body, snapshot.etag)
+
+    def do_POST(self):
+        snapshot = self.server.snapshot
+        if urlsplit(self.path).path != '/cards':
+            self.send_error_json(404, f"Unknown endpoint '{self.path}'")
+            return
+        try:
+            length = self.content_length()
+            request = decode_json(self.rfile.read(length)) if length else {}
+            card_ids = request.get('ids') if isinstance(request, dict) else None
+            if not isinstance(card_ids, list) or not all(isinstance(card_id, str) for card_id in card_ids):
+                raise RequestError(400, 'Expected a JSON body like {"ids": ["OP01-001", ...]}')
+            body = snapshot.batch(card_ids)
+        except RequestError as e:
+            self.send_error_json(e.status, str(e))
+            return
+        except ValueError as e:
+            self.send_error_json(400, f"Invalid JSON body: {e}")
+            return
+        self.send_json(200, body, snapshot.etag)
+
+    def content_length(self):
+        header = self.headers.get('Content-Length') or '0'
+        try:
+            length = int(header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise RequestError(400, f"Invalid Content-Length '{header}'")
+        if length > MAX_BODY:
+            raise RequestError(413, f"Request body over {MAX_BODY} bytes")
+        return length
+
+    def route(self, snapshot, path, parameters):
+        if path.startswith('/cards/'):
+            return snapshot.card(unquote(path[len('/cards/'):]))
+        if path == '/cards':
+            card_ids = [card_id for key, value in parameters if key == 'ids' for card_id in value.split(',') if card_id.strip()]
+            if not card_ids:
+                raise RequestError(400, "Pass card IDs as ?ids=OP01-001,OP01-016")
+            return snapshot.batch(card_ids)
+        if path == '/search':
+            return snapshot.search(parameters)
+        raise RequestError(404, f"Unknown endpoint '{path}'")
+
+    def etag_matches(self, etag):
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        tags = [tag.strip() for tag in header.split(',')]
+        return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+    def send_json(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        self.send_json(status, encode_json({'error': message}))
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve read-only card lookups and searches over db.json on local HTTP')
+    parser.add_argument('catalog', nargs='?', default=DB_JSON, help=f'db.json or a data/cards/<set>.json file (default: {DB_JSON})')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, help=f'Cached responses per catalog version (default: {DEFAULT_CACHE_SIZE}, 0 disables)')
+    parser.add_argument('--poll', type=float, default=2.0, help='Seconds between checks for a new catalog build (default: 2, 0 disables reloading)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Do not log requests')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.catalog):
+        print(f"Error: Catalog '{args.catalog}' not found.")
+        return
+
+    start = time.perf_counter()
+    server = CatalogServer((args.host, args.port), args.catalog, args.cache_size, args.quiet)
+    print(f"Loaded {len(server.snapshot.card_ids)} cards from '{args.catalog}' in {time.perf_counter() - start:.2f}s "
+          f"(version {server.snapshot.version})")
+    if args.poll > 0:
+        threading.Thread(target=server.watch, args=(args.poll,), daemon=True).start()
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
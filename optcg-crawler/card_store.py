@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+SQLite card store keyed by cardId, so parsed cards can be upserted without
+re-reading and rewriting the whole CSV catalog on every run
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+
+from atomic_io import atomic_write
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+class CardStore:
+    """
+    Card rows stored in a single indexed table. Rows keep the position they were
+    first inserted at, so an export reproduces the "update in place, append new
+    cards" ordering of the CSV append mode.
+    """
+
+    def __init__(self, db_path, fieldnames=None):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(cards)')]
+        if columns:
+            self.fieldnames = columns[1:]
+            if fieldnames is not None and list(fieldnames) != self.fieldnames:
+                raise ValueError(f"Card store '{db_path}' has columns {self.fieldnames}, expected {list(fieldnames)}")
+        elif fieldnames is not None:
+            self.fieldnames = list(fieldnames)
+            if self.fieldnames[0] != 'cardId':
+                raise ValueError("The first card store column must be 'cardId'")
+            column_sql = ', '.join(f"{quote_identifier(name)} TEXT NOT NULL DEFAULT ''" for name in self.fieldnames[1:])
+            with self.conn:
+                self.conn.execute(
+                    f'CREATE TABLE cards (seq INTEGER PRIMARY KEY, "cardId" TEXT NOT NULL UNIQUE, {column_sql})'
+                )
+        else:
+            raise ValueError(f"Card store '{db_path}' does not exist and no fieldnames were given")
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+        quoted = [quote_identifier(name) for name in self.fieldnames]
+        value_columns = quoted[1:]
+        self._upsert_sql = (
+            f"INSERT INTO cards ({', '.join(quoted)}) VALUES ({', '.join('?' for _ in quoted)}) "
+            f"ON CONFLICT(\"cardId\") DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in value_columns)} "
+            f"WHERE {' OR '.join(f'{c} IS NOT excluded.{c}' for c in value_columns)}"
+        )
+        self._select_sql = f"SELECT {', '.join(quoted)} FROM cards ORDER BY seq"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM cards').fetchone()[0]
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute('DELETE FROM cards')
+
+    def card_ids(self):
+        return [row[0] for row in self.conn.execute('SELECT "cardId" FROM cards ORDER BY seq')]
+
+    def delete(self, card_ids):
+        """Delete cards by cardId; returns the number of rows removed"""
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany('DELETE FROM cards WHERE "cardId" = ?', ((card_id,) for card_id in card_ids))
+        return self.conn.total_changes - before
+
+    def get_meta(self, key):
+        """A value saved with set_meta, or None"""
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def upsert(self, cards):
+        """Insert new cards and update changed ones; returns the number of rows touched"""
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(
+                self._upsert_sql,
+                ([card.get(name) or '' for name in self.fieldnames] for card in cards),
+            )
+        return self.conn.total_changes - before
+
+    def iter_rows(self, columns=None, order_by=None):
+        """
+        Yield stored cards as lists of values in fieldnames order (or in columns order),
+        by insertion position unless order_by names columns to sort on first
+        """
+        if columns is None and order_by is None:
+            yield from self.conn.execute(self._select_sql)
+            return
+        selected = ', '.join(quote_identifier(name) for name in (columns or self.fieldnames))
+        order = ''.join(f"{quote_identifier(name)}, " for name in (order_by or ()))
+        yield from self.conn.execute(f"SELECT {selected} FROM cards ORDER BY {order}seq")
+
+    def export_csv(self, csv_file, columns=None):
+        """Atomically write every stored card (optionally only some columns) to csv_file in the parser's CSV layout"""
+        with atomic_write(csv_file, newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(columns or self.fieldnames)
+            writer.writerows(self.iter_rows(columns))
+
+def main():
+    parser = argparse.ArgumentParser(description='Export a card store to the parsed card CSV layout')
+    parser.add_argument('store', help='Card store SQLite file')
+    parser.add_argument('-o', '--output', default='all_cards.csv', help='Output CSV file path (default: all_cards.csv)')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.store):
+        print(f"Error: Card store '{args.store}' not found.")
+        return
+
+    with CardStore(args.store) as store:
+        store.export_csv(args.output)
+        print(f"Exported {store.count()} cards from '{args.store}' to '{args.output}'")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Column-oriented in-memory card table used by the parser and both converters.
+
+Repeated strings (names, traits, colors, attributes, rarity, set, effect text)
+are dictionary-encoded: each column keeps one copy of every distinct value and
+an array of integer codes. Card stats are stored in int arrays. Every value
+round-trips to exactly the text it was added with, so CSV output is unchanged.
+"""
+
+import csv
+from array import array
+
+# Card stat columns, stored as ints
+NUMERIC_COLUMNS = frozenset(['life', 'cost', 'power', 'counter'])
+
+# Columns that are unique per row; dictionary-encoding them would only add overhead
+UNIQUE_COLUMNS = frozenset(['cardId', 'imageUrl', 'localImage', 'images'])
+
+# Sentinels for stat cells that are not plain integers
+EMPTY = -2 ** 31          # ''
+DASH = EMPTY + 1          # '-', e.g. the counter of a leader
+OTHER = EMPTY + 2         # anything else; the original text is kept on the side
+
+class TextColumn:
+    __slots__ = ('values',)
+
+    def __init__(self):
+        self.values = []
+
+    def append(self, text):
+        self.values.append(text)
+
+    def set(self, row, text):
+        self.values[row] = text
+
+    def get(self, row):
+        return self.values[row]
+
+class CategoryColumn:
+    __slots__ = ('codes', 'categories', 'lookup')
+
+    def __init__(self):
+        self.codes = array('I')
+        self.categories = []
+        self.lookup = {}
+
+    def encode(self, text):
+        code = self.lookup.get(text)
+        if code is None:
+            code = self.lookup[text] = len(self.categories)
+            self.categories.append(text)
+        return code
+
+    def append(self, text):
+        code = self.lookup.get(text)
+        if code is None:
+            code = self.encode(text)
+        self.codes.append(code)
+
+    def set(self, row, text):
+        self.codes[row] = self.encode(text)
+
+    def get(self, row):
+        return self.categories[self.codes[row]]
+
+class IntColumn:
+    __slots__ = ('ints', 'other')
+
+    def __init__(self):
+        self.ints = array('i')
+        self.other = {}
+
+    def encode(self, row, text):
+        self.other.pop(row, None)
+        if text == '':
+            return EMPTY
+        if text == '-':
+            return DASH
+        if text.isascii() and text.isdigit() and len(text) < 10 and (text == '0' or text[0] != '0'):
+            return int(text)
+        self.other[row] = text
+        return OTHER
+
+    def append(self, text):
+        self.ints.append(self.encode(len(self.ints), text))
+
+    def set(self, row, text):
+        self.ints[row] = self.encode(row, text)
+
+    def get(self, row):
+        value = self.ints[row]
+        if value == EMPTY:
+            return ''
+        if value == DASH:
+            return '-'
+        if value == OTHER:
+            return self.other[row]
+        return str(value)
+
+    def get_int(self, row):
+        value = self.ints[row]
+        return None if value in (EMPTY, DASH, OTHER) else value
+
+def make_column(name):
+    if name in NUMERIC_COLUMNS:
+        return IntColumn()
+    if name in UNIQUE_COLUMNS:
+        return TextColumn()
+    return CategoryColumn()
+
+class CardTable:
+    """
+    Card rows keyed by cardId. Adding a card whose cardId is already present
+    replaces that row in place, so "last occurrence wins" while keeping the
+    position of the first occurrence, exactly like merging into a dict.
+    """
+
+    def __init__(self, fieldnames):
+        self.fieldnames = list(fieldnames)
+        self.columns = {name: make_column(name) for name in self.fieldnames}
+        self.appenders = [column.append for column in self.columns.values()]
+        self.setters = [column.set for column in self.columns.values()]
+        self.id_position = self.fieldnames.index('cardId') if 'cardId' in self.fieldnames else None
+        self.row_by_id = {}
+        self.size = 0
+
+    @classmethod
+    def from_cards(cls, cards, fieldnames):
+        table = cls(fieldnames)
+        table.extend(cards)
+        return table
+
+    @classmethod
+    def from_rows(cls, rows, fieldnames):
+        """Table from value lists in fieldnames order, e.g. CardStore.iter_rows()"""
+        table = cls(fieldnames)
+        for values in rows:
+            table.add_values(list(values))
+        return table
+
+    @classmethod
+    def from_csv(cls, csv_file):
+        with open(csv_file, 'r', newline='', encoding='utf-8') as csvfile:
+            reader = csv.reader(csvfile)
+            fieldnames = next(reader, [])
+            table = cls(fieldnames)
+            width = len(fieldnames)
+            for values in reader:
+                if not values:
+                    continue
+                if len(values) != width:
+                    values = (values + [''] * width)[:width]
+                table.add_values(values)
+        return table
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for row in range(self.size):
+            yield self.row(row)
+
+    def add(self, card):
+        """Add a card dict, replacing any row with the same cardId"""
+        self.add_values([card.get(name) or '' for name in self.fieldnames])
+
+    def add_values(self, values):
+        """Add a card given as a list of text values in fieldnames order"""
+        card_id = values[self.id_position] if self.id_position is not None else ''
+        row = self.row_by_id.get(card_id)
+        if row is None:
+            self.row_by_id[card_id] = self.size
+            for append, value in zip(self.appenders, values):
+                append(value)
+            self.size += 1
+        else:
+            for set_value, value in zip(self.setters, values):
+                set_value(row, value)
+
+    def extend(self, cards):
+        for card in cards:
+            self.add(card)
+
+    def find(self, card_id):
+        """Row index of a cardId, or None"""
+        return self.row_by_id.get(card_id)
+
+    def row(self, row):
+        return {name: column.get(row) for name, column in self.columns.items()}
+
+    def get(self, name, row, default=''):
+        """Text of one cell; default when the table has no such column"""
+        column = self.columns.get(name)
+        return column.get(row) if column is not None else default
+
+    def column(self, name):
+        """All values of a column as text"""
+        column = self.columns[name]
+        if isinstance(column, TextColumn):
+            return list(column.values)
+        if isinstance(column, CategoryColumn):
+            return [column.categories[code] for code in column.codes]
+        return [column.get(row) for row in range(self.size)]
+
+    def categories(self, name):
+        """Distinct values of a dictionary-encoded column, indexed by code"""
+        return self.columns[name].categories
+
+    def codes(self, name):
+        """Per-row category codes of a dictionary-encoded column"""
+        return self.columns[name].codes
+
+    def ints(self, name):
+        """Per-row int array of a stat column; non-numeric cells hold EMPTY/DASH/OTHER"""
+        return self.columns[name].ints
+
+    def int_value(self, name, row):
+        """A stat as an int, or None when the cell is blank, '-' or not a number"""
+        return self.columns[name].get_int(row)
+
+    def map_column(self, name, fn, default=''):
+        """
+        fn(value) for every row of a column. Dictionary-encoded columns call fn once per
+        distinct value, so converting shared traits or effect text is not repeated per card.
+        """
+        column = self.columns.get(name)
+        if column is None:
+            result = fn(default)
+            return [result] * self.size
+        if isinstance(column, CategoryColumn):
+            mapped = [fn(value) for value in column.categories]
+            return [mapped[code] for code in column.codes]
+        return [fn(value) for value in self.column(name)]
+
+    def write_csv(self, csv_file):
+        with open(csv_file, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(self.fieldnames)
+            for row in range(self.size):
+                writer.writerow([column.get(row) for column in self.columns.values()])
+        return self.size
@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 """
 Convert existing CSV files to component array format for Strapi import
+
+With --stream, variants are grouped through an external merge sort by base cardId
+(external_sort.py), so memory stays proportional to the sort buffer and the largest
+variant group instead of the whole CSV.
 """
 
 import csv
@@ -8,59 +12,17 @@ import json
 import argparse
 import os
 import re
+import sys
+from functools import lru_cache
+from itertools import groupby
 
-# Set code to full name mapping
-SET_CODE_MAPPING = {
-    'OP01': 'OP01 - Romance Dawn',
-    'OP02': 'OP02 - Paramount War', 
-    'OP03': 'OP03 - Pillars of Strength',
-    'OP04': 'OP04 - Kingdoms of Intrigue',
-    'OP05': 'OP05 - Awakening of the New Era',
-    'OP06': 'OP06 - Wings of the Captain',
-    'OP07': 'OP07 - 500 Years in the Future',
-    'OP08': 'OP08 - Two Legends',
-    'OP09': 'OP09 - Emperors in the New World',
-    'OP10': 'OP10 - Royal Blood',
-    'OP11': 'OP11 - A Fist of Divine Speed',
-    'EB01': 'EB01 - Memorial Collection',
-    'EB02': 'EB02 - Anime 25th Collection',
-    'PRB01': 'PRB01 - One Piece The Best',
-    'ST01': 'ST01 - Straw Hat Crew',
-    'ST02': 'ST02 - Worst Generation',
-    'ST03': 'ST03 - The Seven Warlords of the Sea',
-    'ST04': 'ST04 - Animal Kingdom Pirates',
-    'ST05': 'ST05 - One Piece Film Edition',
-    'ST06': 'ST06 - Absolute Justice',
-    'ST07': 'ST07 - Big Mom Pirates',
-    'ST08': 'ST08 - Monkey D. Luffy',
-    'ST09': 'ST09 - Yamato',
-    'ST10': 'ST10 - The Three Captains',
-    'ST11': 'ST11 - Uta',
-    'ST12': 'ST12 - Zoro & Sanji',
-    'ST13': 'ST13 - The Three Brothers',
-    'ST14': 'ST14 - 3D2Y',
-    'ST15': 'ST15 - Edward Newgate',
-    'ST16': 'ST16 - Uta',
-    'ST17': 'ST17 - Donquixote Doflamingo',
-    'ST18': 'ST18 - Monkey D. Luffy',
-    'ST19': 'ST19 - Smoker',
-    'ST20': 'ST20 - Charlotte Katakuri',
-    'ST21': 'ST21 - Gear 5',
-    'ST22': 'ST22 - Ace & Newgate'
-}
-
-def extract_set_from_card_id(card_id):
-    """Extract set code from card ID and map to full set name"""
-    if not card_id:
-        return ''
-    
-    # Extract set code (e.g., "EB01-001" -> "EB01")
-    set_match = re.match(r'^([A-Z]{2,3}\d{2})', card_id)
-    if set_match:
-        set_code = set_match.group(1)
-        return SET_CODE_MAPPING.get(set_code, '')
-    
-    return ''
+from card_delta import export_card_delta
+from card_ids import decode_card_id, decode_card_ids, get_base_card_id
+from card_index import build_index_file
+from card_table import CardTable
+from effect_ast import compile_effect, effect_plain_text
+from external_sort import ExternalSorter
+import profiling
 
 def extract_power_from_effect(effect_text):
     """Extract power value from effect text using regex patterns"""
@@ -81,138 +43,166 @@ def extract_power_from_effect(effect_text):
     
     return ''
 
-def determine_rarity_from_card_id(card_id):
-    """Determine rarity from card ID patterns"""
-    if not card_id:
-        return ''
-    
-    # Common patterns for rarity
-    if '_p' in card_id.lower():
-        return 'P'  # Promotional
-    elif '_r' in card_id.lower():
-        return 'R'  # Rare
-    elif '_sr' in card_id.lower():
-        return 'SR'  # Super Rare
-    elif '_sec' in card_id.lower():
-        return 'SEC'  # Secret
-    elif '_l' in card_id.lower():
-        return 'L'  # Leader
-    elif 'don' in card_id.lower():
-        return 'DON'  # Don card
-    
-    # Default to Common if no pattern matches
-    return 'C'
+# Grouped component CSV columns
+COMPONENT_FIELDNAMES = [
+    'cardId', 'name', 'cardType', 'life', 'cost', 'power', 
+    'attributes', 'traits', 'counter', 'colors', 'images', 
+    'effect_description', 'trigger_description', 'has_trigger', 
+    'trigger_effect', 'rarity', 'set'
+]
+
+def group_component_card(base_card_id, variants, power_of, ast_of=None):
+    """
+    One grouped component row from [(id_info, row dict)] of every variant of a card;
+    power_of(effect text) supplies the power column and ast_of(text), if given, the AST columns
+    """
+    # Use the main row (no _pX suffix) for all non-image fields
+    main_info, main = next(((id_info, row) for id_info, row in variants if id_info.variant is None), variants[0])
+    # Merge images from all variants
+    images = []
+    for id_info, row in variants:
+        label = id_info.variant_label
+        is_default = (label == 'default')
+        # Parse images field (may be a JSON array string or a single image dict)
+        images_field = row.get('images') or row.get('imageUrl', '')
+        if images_field:
+            try:
+                img_list = json.loads(images_field)
+                if isinstance(img_list, dict):
+                    img_list = [img_list]
+            except Exception:
+                # Fallback: treat as single image URL
+                img_list = [{"url": images_field, "alt": row.get('name', ''), "localPath": row.get('localImage', '')}]
+            for img in img_list:
+                images.append({
+                    "label": label,
+                    "image_url": img.get('url', ''),
+                    "artist": "",  # No artist info available
+                    "is_default": is_default
+                })
+    # Sort images so default comes first
+    images.sort(key=lambda x: not x['is_default'])
+    # Prepare output row
+    trigger_text = main.get('triggerText', '')
+    card = {
+        'cardId': base_card_id,
+        'name': main.get('name', ''),
+        'cardType': main.get('cardType', ''),
+        'life': main.get('life', ''),
+        'cost': main.get('cost', ''),
+        'power': power_of(main.get('effectText', '')),
+        'attributes': main.get('attributes', ''),
+        'traits': main.get('traits', ''),
+        'counter': main.get('counter', ''),
+        'colors': main.get('colors', ''),
+        'images': json.dumps(images, ensure_ascii=False),
+        'effect_description': main.get('effect_description', ''),
+        'trigger_description': trigger_text,
+        'has_trigger': bool(trigger_text.strip()),
+        'trigger_effect': main.get('trigger_effect', ''),
+        'rarity': main_info.id_rarity,
+        'set': main_info.set_name,
+    }
+    if ast_of is not None:
+        card['effect_ast'] = ast_of(main.get('effectText', ''))
+        card['trigger_ast'] = ast_of(trigger_text)
+    return card
+
+def load_variant_groups(input_csv):
+    """(base cardId, [(id_info, row)]) per card, in order of first appearance, with the whole CSV in memory"""
+    with profiling.stage('read', input_csv):
+        table = CardTable.from_csv(input_csv)
+    with profiling.stage('decode'):
+        # Decode the whole cardId column at once; each row keeps its decoded ID record
+        id_infos = decode_card_ids(table.column('cardId'))
+
+    # Group row indexes by base cardId
+    with profiling.stage('group'):
+        card_groups = {}
+        for row, id_info in enumerate(id_infos):
+            card_groups.setdefault(id_info.base_id, []).append(row)
 
-def get_base_card_id(card_id):
-    """Strip _pX or similar suffixes to get the base cardId."""
-    return re.sub(r'_p\d+$', '', card_id)
+    return ((base_card_id, [(id_infos[row], table.row(row)) for row in rows]) for base_card_id, rows in card_groups.items())
 
-def get_variant_label(card_id):
-    match = re.search(r'_p(\d+)$', card_id)
-    if match:
-        return f"p{match.group(1)}"
-    return "default"
+def iter_variant_groups_sorted(input_csv, memory_budget, work_dir=None):
+    """
+    (base cardId, [(id_info, row)]) per card in base cardId order, using an external
+    merge sort so only the sort buffer and one variant group are held in memory
+    """
+    with open(input_csv, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        fieldnames = next(reader, [])
+        width = len(fieldnames)
+        id_position = fieldnames.index('cardId')
+
+        def records():
+            for sequence, values in enumerate(reader):
+                if not values:
+                    continue
+                if len(values) != width:
+                    values = (values + [''] * width)[:width]
+                yield [get_base_card_id(values[id_position]), sequence, values]
 
-def convert_to_component_arrays(input_csv, output_csv=None):
+        with ExternalSorter(key=lambda record: (record[0], record[1]), memory_budget=memory_budget,
+                            work_dir=work_dir) as sorter:
+            for base_card_id, records in groupby(sorter.sort(records()), key=lambda record: record[0]):
+                # A repeated cardId replaces the earlier row but keeps its position, as in CardTable
+                rows = {}
+                for _, _, values in records:
+                    rows[values[id_position]] = values
+                yield base_card_id, [(decode_card_id(card_id), dict(zip(fieldnames, values))) for card_id, values in rows.items()]
+            if sorter.runs:
+                print(f"External sort spilled {len(sorter.runs)} run(s) to disk")
+
+def convert_to_component_arrays(input_csv, output_csv=None, effect_ast=False, sort_memory=None):
     """
     Convert CSV columns to component array format for Strapi
+    With effect_ast, the compiled effect/trigger ASTs are added as JSON columns.
+    With sort_memory (bytes), rows are grouped by an external merge sort instead of
+    in memory and the cards are written in base cardId order.
     """
     if output_csv is None:
         base_name = os.path.splitext(input_csv)[0]
         output_csv = f"{base_name}_components.csv"
     
-    # Group rows by base cardId
-    card_groups = {}
-    main_rows = {}
-    with open(input_csv, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            card_id = row.get('cardId', '')
-            base_card_id = get_base_card_id(card_id)
-            if base_card_id not in card_groups:
-                card_groups[base_card_id] = []
-            card_groups[base_card_id].append(row)
-            # Save the main row (no _pX suffix)
-            if card_id == base_card_id:
-                main_rows[base_card_id] = row
-
-    component_cards = []
-    for base_card_id, variants in card_groups.items():
-        # Use the main row for all non-image fields
-        main_row = main_rows.get(base_card_id, variants[0])
-        # Merge images from all variants
-        images = []
-        for row in variants:
-            card_id = row.get('cardId', '')
-            label = get_variant_label(card_id)
-            is_default = (label == 'default')
-            # Parse images field (may be a JSON array string or a single image dict)
-            images_field = row.get('images') or row.get('imageUrl')
-            if images_field:
-                try:
-                    img_list = json.loads(images_field)
-                    if isinstance(img_list, dict):
-                        img_list = [img_list]
-                except Exception:
-                    # Fallback: treat as single image URL
-                    img_list = [{"url": images_field, "alt": row.get('name', ''), "localPath": row.get('localImage', '')}]
-                for img in img_list:
-                    images.append({
-                        "label": label,
-                        "image_url": img.get('url', ''),
-                        "artist": "",  # No artist info available
-                        "is_default": is_default
-                    })
-        # Sort images so default comes first
-        images.sort(key=lambda x: not x['is_default'])
-        # Prepare output row
-        power = extract_power_from_effect(main_row.get('effectText', ''))
-        rarity = determine_rarity_from_card_id(main_row.get('cardId', ''))
-        set_name = extract_set_from_card_id(main_row.get('cardId', ''))
-        attributes_json = main_row.get('attributes', '')
-        traits_json = main_row.get('traits', '')
-        colors_json = main_row.get('colors', '')
-        effect_blocks_json = main_row.get('effect_description', '')
-        trigger_blocks_json = main_row.get('trigger_effect', '')
-        component_cards.append({
-            'cardId': base_card_id,
-            'name': main_row.get('name', ''),
-            'cardType': main_row.get('cardType', ''),
-            'life': main_row.get('life', ''),
-            'cost': main_row.get('cost', ''),
-            'power': power,
-            'attributes': attributes_json,
-            'traits': traits_json,
-            'counter': main_row.get('counter', ''),
-            'colors': colors_json,
-            'images': json.dumps(images, ensure_ascii=False),
-            'effect_description': effect_blocks_json,
-            'trigger_description': main_row.get('triggerText', ''),
-            'has_trigger': bool(main_row.get('triggerText', '').strip()),
-            'trigger_effect': trigger_blocks_json,
-            'rarity': rarity,
-            'set': set_name,
-        })
-
+    # Effect text is shared by every variant of a card, so extract power once per distinct text
+    power_of = lru_cache(maxsize=None)(extract_power_from_effect)
+    ast_of = lru_cache(maxsize=None)(lambda text: json.dumps(compile_effect(effect_plain_text(text)), ensure_ascii=False))
+    
+    if sort_memory:
+        groups = iter_variant_groups_sorted(input_csv, sort_memory, os.path.dirname(os.path.abspath(output_csv)))
+    else:
+        groups = load_variant_groups(input_csv)
+    
     # Write component array CSV
-    fieldnames = [
-        'cardId', 'name', 'cardType', 'life', 'cost', 'power', 
-        'attributes', 'traits', 'counter', 'colors', 'images', 
-        'effect_description', 'trigger_description', 'has_trigger', 
-        'trigger_effect', 'rarity', 'set'
-    ]
-    with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
+    fieldnames = list(COMPONENT_FIELDNAMES)
+    if effect_ast:
+        fieldnames += ['effect_ast', 'trigger_ast']
+    count = 0
+    # In streaming mode the sort and merge run lazily inside this stage
+    with profiling.stage('write', output_csv), open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
-        for card in component_cards:
-            writer.writerow(card)
-    print(f"Converted {len(component_cards)} cards to grouped component array format: {output_csv}")
+        for base_card_id, variants in groups:
+            writer.writerow(group_component_card(base_card_id, variants, power_of, ast_of if effect_ast else None))
+            count += 1
+    print(f"Converted {count} cards to grouped component array format: {output_csv}")
     return output_csv
 
+# Helpers whose calls and cumulative time --profile reports
+PROFILED_FUNCTIONS = ['decode_card_ids', 'extract_power_from_effect', 'compile_effect']
+
 def main():
     parser = argparse.ArgumentParser(description='Convert CSV to component array format for Strapi')
     parser.add_argument('input_csv', help='Input CSV file path')
     parser.add_argument('-o', '--output', help='Output CSV file path (default: input_components.csv)')
+    parser.add_argument('-a', '--effect-ast', action='store_true', help='Add effect_ast/trigger_ast columns with the compiled effect text (see effect_ast.py)')
+    parser.add_argument('-s', '--stream', action='store_true', help='Group variants with an external merge sort so memory stays bounded on large inputs; cards are written in cardId order')
+    parser.add_argument('--memory-mb', type=float, default=64, help='With --stream, sort buffer size in MB before spilling runs to disk (default: 64)')
+    parser.add_argument('-i', '--index', nargs='?', const='', help='Also build the facet bitset index (default path: output_index.json)')
+    parser.add_argument('--profile', nargs='?', const='', help='Record per-stage timing and memory plus helper call costs as a JSON report (default: output_profile.json)')
+    parser.add_argument('--flamegraph', help='With --profile, also sample stacks and write them in folded format to this file')
+    parser.add_argument('-D', '--delta', nargs='?', const='', help='Also write the card delta against the previous snapshot and update it (default snapshot: output_snapshot.ndjson)')
     
     args = parser.parse_args()
     
@@ -220,7 +210,22 @@ def main():
         print(f"Error: Input file '{args.input_csv}' not found.")
         return
     
-    convert_to_component_arrays(args.input_csv, args.output)
+    report_file = None
+    if args.profile is not None:
+        report_file = args.profile or f"{os.path.splitext(args.output or args.input_csv)[0]}_profile.json"
+    with profiling.profile_run('convert_to_components', report_file, args.flamegraph,
+                               [(sys.modules[__name__], PROFILED_FUNCTIONS)]):
+        output_csv = convert_to_component_arrays(args.input_csv, args.output, args.effect_ast,
+                                                 int(args.memory_mb * 1024 * 1024) if args.stream else None)
+    
+    if args.index is not None:
+        build_index_file(output_csv, args.index or None)
+    
+    if args.delta is not None:
+        base_name = os.path.splitext(output_csv)[0]
+        delta_file = f"{base_name}_delta.ndjson"
+        counts = export_card_delta(output_csv, args.delta or f"{base_name}_snapshot.ndjson", delta_file, update_snapshot=True)
+        print(f"Delta written to '{delta_file}': {counts['added']} added, {counts['changed']} changed, {counts['removed']} removed")
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Fetch the official card list page of every set into optcg-crawler/cards.
+
+The static card list page for a series already contains the dl.modalCol blocks
+the parser reads, so no browser is needed: all series pages are fetched
+concurrently through the pooled asyncio client, rate limited, retried on
+transient errors and revalidated with conditional GETs. Pages are written
+atomically into the existing sets/starter_decks/extra_booster/premium_booster/
+promotions layout and can be handed straight to the parser with --parse.
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import re
+import sys
+import time
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+from atomic_io import atomic_write
+from card_table import CardTable
+from http_pool import HttpError, HttpPool, check_retryable, load_manifest, save_manifest, with_origin, with_retries
+from parse_cardlist_to_csv import CSV_FIELDNAMES, parse_html_files_cached, write_cards_to_csv
+
+CARDLIST_URL = 'https://en.onepiece-cardgame.com/cardlist/'
+CARDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cards')
+MANIFEST_NAME = '.crawl_manifest.json'
+
+# Product code prefix in the series label ("[OP-01]") -> directory under cards/
+SERIES_DIRECTORIES = {
+    'OP': 'sets',
+    'ST': 'starter_decks',
+    'EB': 'extra_booster',
+    'PRB': 'premium_booster',
+}
+SERIES_CODE_PATTERN = re.compile(r'\[([A-Z]+)-(\d+)\]')
+
+class SeriesOptionParser(HTMLParser):
+    """Collects (value, label) of the options of the series <select> on the card list page"""
+
+    def __init__(self):
+        super().__init__()
+        self.in_series = False
+        self.option_value = None
+        self.options = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'select':
+            self.in_series = attrs.get('name') == 'series'
+        elif tag == 'option' and self.in_series:
+            self.option_value = attrs.get('value') or None
+            if self.option_value:
+                self.options.append([self.option_value, ''])
+
+    def handle_endtag(self, tag):
+        if tag == 'select':
+            self.in_series = False
+        elif tag == 'option':
+            self.option_value = None
+
+    def handle_data(self, data):
+        if self.option_value:
+            self.options[-1][1] += data
+
+def series_page_path(label):
+    """Relative output path for a series label, or None for series that are not crawled"""
+    match = SERIES_CODE_PATTERN.search(label)
+    if match:
+        prefix, number = match.groups()
+        directory = SERIES_DIRECTORIES.get(prefix)
+        return f"{directory}/{prefix.lower()}{number}_cards.html" if directory else None
+    if label.strip().lower().startswith('promotion card'):
+        return 'promotions/promotion_cards.html'
+    return None
+
+def series_pages(index_html):
+    """[(series id, relative output path)] for every crawlable series on the card list page"""
+    parser = SeriesOptionParser()
+    parser.feed(index_html)
+    parser.close()
+    pages = []
+    for value, label in parser.options:
+        path = series_page_path(label)
+        if path:
+            pages.append((value, path))
+    return pages
+
+def series_url(base_url, series_id):
+    parts = urlsplit(base_url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode({'series': series_id}), ''))
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_time = 0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = asyncio.get_running_loop().time()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class CardlistCrawler:
+    def __init__(self, pool, limiter, cards_dir, manifest, retries=3):
+        self.pool = pool
+        self.limiter = limiter
+        self.cards_dir = cards_dir
+        self.manifest = manifest
+        self.retries = retries
+        self.results = {'updated': 0, 'unchanged': 0, 'failed': 0}
+        self.updated_files = []
+
+    async def get(self, url, headers=None):
+        """GET with rate limiting and retries for timeouts, dropped connections and 429/5xx"""
+        async def attempt():
+            await self.limiter.wait()
+            return check_retryable(await self.pool.request(url, headers))
+        return await with_retries(attempt, self.retries)
+
+    async def fetch_page(self, url, relative_path):
+        path = os.path.join(self.cards_dir, relative_path)
+        entry = self.manifest.get(relative_path)
+        headers = {}
+        if entry and entry.get('url') == url and os.path.exists(path):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = await self.get(url, headers)
+        if response.status == 304:
+            return 'unchanged'
+        if response.status != 200:
+            raise HttpError(f"HTTP {response.status} {response.reason} for {url}")
+        if b'modalCol' not in response.body:
+            raise HttpError(f"no cards found in {url}; keeping the existing page")
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_write(path, 'wb') as f:
+            f.write(response.body)
+        self.manifest[relative_path] = {
+            'url': url,
+            'etag': response.headers.get('etag', ''),
+            'last_modified': response.headers.get('last-modified', ''),
+        }
+        self.updated_files.append(path)
+        return 'updated'
+
+    async def crawl(self, pages):
+        async def fetch(series_id, url, relative_path):
+            try:
+                result = await self.fetch_page(url, relative_path)
+            except Exception as e:
+                print(f"Warning: series {series_id} ({relative_path}): {e or type(e).__name__}", file=sys.stderr)
+                result = 'failed'
+            self.results[result] += 1
+            print(f"  {result:<9} {relative_path}")
+
+        await asyncio.gather(*(fetch(*page) for page in pages))
+
+async def crawl_cardlist(base_url=CARDLIST_URL, cards_dir=CARDS_DIR, concurrency=4, rate=2.0, retries=3,
+                         timeout=60, origin=None, only=None):
+    """Discover the series on the card list page and fetch every series page; returns the crawler"""
+    base_url = with_origin(base_url, origin)
+    manifest_path = os.path.join(cards_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    async with HttpPool(limit=concurrency, timeout=timeout) as pool:
+        crawler = CardlistCrawler(pool, RateLimiter(rate), cards_dir, manifest, retries)
+        index = await crawler.get(base_url)
+        if index.status != 200:
+            raise HttpError(f"HTTP {index.status} {index.reason} for {base_url}")
+        pages = series_pages(index.body.decode('utf-8', errors='replace'))
+        if only:
+            wanted = {code.lower().replace('-', '') for code in only}
+            pages = [page for page in pages if os.path.basename(page[1]).split('_', 1)[0] in wanted]
+        try:
+            await crawler.crawl([(series_id, series_url(base_url, series_id), path) for series_id, path in pages])
+        finally:
+            os.makedirs(cards_dir, exist_ok=True)
+            save_manifest(manifest_path, manifest)
+    return crawler
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch the card list page of every set into the cards directory')
+    parser.add_argument('-o', '--output', default=CARDS_DIR, help=f'Cards directory (default: {CARDS_DIR})')
+    parser.add_argument('--url', default=CARDLIST_URL, help=f'Card list page URL (default: {CARDLIST_URL})')
+    parser.add_argument('--origin', help='Fetch from another origin, e.g. http://127.0.0.1:8000 for a local fixture server')
+    parser.add_argument('-s', '--series', nargs='+', help='Only fetch these sets, e.g. OP01 ST-21 promotion')
+    parser.add_argument('-j', '--concurrency', type=int, default=4, help='Maximum number of requests in flight (default: 4)')
+    parser.add_argument('--rate', type=float, default=2.0, help='Maximum requests started per second, 0 = unlimited (default: 2)')
+    parser.add_argument('--retries', type=int, default=3, help='Retries for timeouts and 429/5xx responses (default: 3)')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds (default: 60)')
+    parser.add_argument('--parse', nargs='?', const='all_cards.csv', help='Parse the pages into a CSV afterwards (default: all_cards.csv)')
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    crawler = asyncio.run(crawl_cardlist(args.url, args.output, args.concurrency, args.rate, args.retries,
+                                         args.timeout, args.origin, args.series))
+    summary = ', '.join(f"{count} {result}" for result, count in crawler.results.items())
+    print(f"Crawled {sum(crawler.results.values())} series page(s) in {time.perf_counter() - start:.1f}s ({summary})")
+
+    if args.parse:
+        html_files = sorted(glob.glob(os.path.join(args.output, '**', '*.html'), recursive=True))
+        card_table = CardTable(CSV_FIELDNAMES)
+        for cards in parse_html_files_cached(html_files):
+            card_table.extend(cards)
+        write_cards_to_csv(card_table, args.parse)
+        print(f"Parsed {len(card_table)} cards from {len(html_files)} file(s) and wrote to '{args.parse}'")
+
+    if crawler.results['failed']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
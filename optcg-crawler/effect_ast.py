@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Compile card effect text into a small structured AST, once per distinct text.
+
+An effect such as
+
+    [DON!! x1] [When Attacking] [Once Per Turn] DON!! −1: Up to 1 of your {Straw Hat Crew}
+    type Characters with a cost of 4 or less gains +2000 power during this turn.
+
+is split into clauses at each run of bracketed header markers. Every clause holds
+the timing keywords, conditions and keyword abilities of its header, the cost
+before the first top-level colon, the remaining text, the card names and
+{trait} types it refers to and its numeric operands:
+
+    {"version": 1, "clauses": [{
+        "timing": ["when_attacking"],
+        "conditions": [{"type": "don_attached", "count": 1}, {"type": "once_per_turn"}],
+        "keywords": [],
+        "cost": "DON!! −1",
+        "text": "Up to 1 of your {Straw Hat Crew} type Characters ...",
+        "cardNames": [], "keywordRefs": [], "traits": ["Straw Hat Crew"],
+        "operands": [{"kind": "don_cost", "cmp": "=", "value": 1}, {"kind": "count", "cmp": "<=", "value": 1},
+                     {"kind": "cost", "cmp": "<=", "value": 4}, {"kind": "power_modifier", "cmp": "=", "value": 2000}]
+    }]}
+
+Many printings and reprints share identical text, so compile_effect is memoized;
+the returned AST is shared between those cards and must be treated as read-only.
+Bump EFFECT_AST_VERSION whenever the output shape or the marker tables change.
+"""
+
+import argparse
+import json
+import os
+import re
+from functools import lru_cache
+
+from card_table import CardTable
+from ndjson_io import NdjsonWriter
+
+EFFECT_AST_VERSION = 1
+
+# Bracketed markers that open a clause
+TIMING_MARKERS = {
+    'On Play': 'on_play',
+    'When Attacking': 'when_attacking',
+    'Activate: Main': 'activate_main',
+    'Main': 'main',
+    'Counter': 'counter',
+    'On K.O.': 'on_ko',
+    'On Block': 'on_block',
+    "On Your Opponent's Attack": 'on_opponent_attack',
+    'End of Your Turn': 'end_of_your_turn',
+    'Trigger': 'trigger',
+}
+CONDITION_MARKERS = {
+    'Once Per Turn': 'once_per_turn',
+    'Your Turn': 'your_turn',
+    "Opponent's Turn": 'opponent_turn',
+}
+KEYWORD_MARKERS = {
+    'Blocker': 'blocker',
+    'Rush': 'rush',
+    'Double Attack': 'double_attack',
+    'Banish': 'banish',
+}
+DON_MARKER_PATTERN = re.compile(r'DON!! x(\d+)')
+
+MARKER_PATTERN = re.compile(r'\[([^\[\]]+)\]')
+TRAIT_PATTERN = re.compile(r'\{([^{}]+)\}')
+# A header marker opens a new clause once the previous clause has text ending like a sentence
+CLAUSE_END = ('.', ')', '!', '"')
+
+COMPARISONS = {'less': '<=', 'more': '>='}
+# (operand kind, pattern, comparison); groups are the value and an optional "less"/"more"
+OPERAND_PATTERNS = [
+    ('don_cost', re.compile(r'DON!! [−-](\d+)'), '='),
+    ('count', re.compile(r'\b[Uu]p to (\d+)'), '<='),
+    ('cost', re.compile(r'\bcost of (\d+)(?: or (less|more))?'), '='),
+    ('power', re.compile(r'\b(\d+) (?:base )?power or (less|more)'), '='),
+    ('power_modifier', re.compile(r'([+−-]\d+) power'), '='),
+    ('cost_modifier', re.compile(r'([+−-]\d+) cost'), '='),
+    ('draw', re.compile(r'\b[Dd]raw (\d+) cards?'), '='),
+    ('look', re.compile(r'\b[Ll]ook at (\d+) cards?'), '='),
+    ('life', re.compile(r'\b(\d+) or (less|more) (?:cards in your )?Life'), '='),
+    ('don_count', re.compile(r'\b(\d+) or (less|more) DON!! cards'), '='),
+]
+
+def marker_kind(marker):
+    """(field, value) of a header marker, or None for a card name"""
+    if marker in TIMING_MARKERS:
+        return 'timing', TIMING_MARKERS[marker]
+    if marker in CONDITION_MARKERS:
+        return 'conditions', {'type': CONDITION_MARKERS[marker]}
+    if marker in KEYWORD_MARKERS:
+        return 'keywords', KEYWORD_MARKERS[marker]
+    match = DON_MARKER_PATTERN.fullmatch(marker)
+    if match:
+        return 'conditions', {'type': 'don_attached', 'count': int(match.group(1))}
+    return None
+
+def effect_plain_text(value):
+    """Effect text from a plain string or Strapi paragraph blocks (a list or its JSON string)"""
+    if isinstance(value, str):
+        if not (value.startswith('[{') or value == '[]'):
+            return value
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return value
+    return '\n'.join(''.join(child.get('text', '') for child in block.get('children', [])) for block in value or [])
+
+def split_cost(body):
+    """(cost, text) split at the first colon outside parentheses; cost is None without one"""
+    depth = 0
+    for position, char in enumerate(body):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth = max(depth - 1, 0)
+        elif char == ':' and depth == 0:
+            return body[:position].strip(), body[position + 1:].strip()
+    return None, body.strip()
+
+def extract_operands(text):
+    operands = []
+    for kind, pattern, comparison in OPERAND_PATTERNS:
+        for match in pattern.finditer(text):
+            value = match.group(1)
+            operands.append({
+                'kind': kind,
+                'cmp': COMPARISONS.get(match.group(match.lastindex), comparison),
+                'value': int(value.replace('−', '-')),
+                'at': match.start(),
+            })
+    operands.sort(key=lambda operand: operand.pop('at'))
+    return operands
+
+def new_clause():
+    return {'timing': [], 'conditions': [], 'keywords': [], 'body': []}
+
+def finish_clause(clause):
+    body = ''.join(clause.pop('body'))
+    cost, text = split_cost(body) if clause['timing'] or clause['conditions'] else (None, body.strip())
+    card_names = []
+    keyword_refs = []
+    for marker in MARKER_PATTERN.findall(text):
+        kind = marker_kind(marker)
+        if kind is None:
+            card_names.append(marker)
+        elif kind[0] != 'conditions':
+            keyword_refs.append(kind[1])
+    clause.update({
+        'cost': cost,
+        'text': text,
+        'cardNames': card_names,
+        'keywordRefs': keyword_refs,
+        'traits': TRAIT_PATTERN.findall(body),
+        'operands': extract_operands(body),
+    })
+    return clause
+
+@lru_cache(maxsize=None)
+def compile_effect(text):
+    """The effect AST of text (None for empty text); cached and shared, do not mutate"""
+    text = (text or '').strip()
+    if not text:
+        return None
+
+    clauses = []
+    clause = new_clause()
+    position = 0
+    for match in MARKER_PATTERN.finditer(text):
+        kind = marker_kind(match.group(1))
+        clause['body'].append(text[position:match.start()])
+        position = match.end()
+        body = ''.join(clause['body']).strip()
+        if kind is None or (body and not body.endswith(CLAUSE_END)):
+            # Card names and keywords mentioned mid-sentence stay part of the text
+            clause['body'].append(match.group(0))
+            continue
+        if body:
+            clauses.append(finish_clause(clause))
+            clause = new_clause()
+        else:
+            clause['body'] = []
+        field, value = kind
+        clause[field].append(value)
+    clause['body'].append(text[position:])
+    clauses.append(finish_clause(clause))
+    return {'version': EFFECT_AST_VERSION, 'clauses': clauses}
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile effect and trigger text into effect ASTs')
+    parser.add_argument('input_csv', nargs='?', help='Parser CSV (effectText/triggerText) or grouped component CSV')
+    parser.add_argument('-o', '--output', help='NDJSON output path (default: input_effects.ndjson)')
+    parser.add_argument('-t', '--text', help='Print the AST of this effect text instead')
+
+    args = parser.parse_args()
+
+    if args.text is not None:
+        print(json.dumps(compile_effect(args.text), ensure_ascii=False, indent=2))
+        return
+    if not args.input_csv:
+        parser.error('input_csv or --text is required')
+    if not os.path.exists(args.input_csv):
+        print(f"Error: Input file '{args.input_csv}' not found.")
+        return
+
+    table = CardTable.from_csv(args.input_csv)
+    effect_field = 'effectText' if 'effectText' in table.fieldnames else 'effect_description'
+    trigger_field = 'triggerText' if 'triggerText' in table.fieldnames else 'trigger_description'
+    output_file = args.output or f"{os.path.splitext(args.input_csv)[0]}_effects.ndjson"
+    with NdjsonWriter(output_file) as writer:
+        for row in range(len(table)):
+            writer.write({
+                'cardId': table.get('cardId', row),
+                'effectAst': compile_effect(effect_plain_text(table.get(effect_field, row))),
+                'triggerAst': compile_effect(table.get(trigger_field, row)),
+            })
+    info = compile_effect.cache_info()
+    print(f"Compiled {info.currsize} distinct text(s) for {len(table)} cards "
+          f"({info.hits} cache hit(s)) and wrote to '{output_file}'")
+
+if __name__ == '__main__':
+    main()
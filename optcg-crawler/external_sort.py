@@ -0,0 +1,81 @@
+"""
+External merge sort for record streams that may not fit in memory.
+
+Records are buffered until their estimated size passes the memory budget, then
+the buffer is sorted and spilled to a temporary NDJSON run file. The sorted
+output is a k-way heapq.merge over the runs, read back one line at a time, so
+memory stays around one buffer plus one record per run. Inputs that fit in the
+budget are sorted in memory without touching the disk.
+"""
+
+import heapq
+import os
+import shutil
+import tempfile
+
+from ndjson_io import NdjsonWriter, iter_ndjson
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+# Rough per-record bookkeeping on top of the text it holds (list, str headers, tuple key)
+RECORD_OVERHEAD = 200
+
+def record_size(record):
+    """Approximate in-memory size of a record made of strings and numbers"""
+    if isinstance(record, (list, tuple)):
+        return RECORD_OVERHEAD + sum(record_size(value) for value in record)
+    if isinstance(record, str):
+        return 50 + len(record)
+    return 32
+
+class ExternalSorter:
+    """Sorts JSON-serializable records by key; use as a context manager so run files are removed"""
+
+    def __init__(self, key, memory_budget=DEFAULT_MEMORY_BUDGET, work_dir=None, size_of=record_size):
+        self.key = key
+        self.memory_budget = memory_budget
+        self.work_dir = work_dir
+        self.size_of = size_of
+        self.run_dir = None
+        self.runs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.run_dir is not None:
+            shutil.rmtree(self.run_dir, ignore_errors=True)
+            self.run_dir = None
+
+    def spill(self, buffer):
+        if self.run_dir is None:
+            self.run_dir = tempfile.mkdtemp(prefix='sort-runs-', dir=self.work_dir)
+        buffer.sort(key=self.key)
+        path = os.path.join(self.run_dir, f"run-{len(self.runs):05d}.ndjson")
+        with NdjsonWriter(path) as writer:
+            for record in buffer:
+                writer.write(record)
+        self.runs.append(path)
+
+    def sort(self, records):
+        """Yield records in key order (stable for equal keys within the input order)"""
+        buffer = []
+        used = 0
+        for record in records:
+            buffer.append(record)
+            used += self.size_of(record)
+            if used >= self.memory_budget:
+                self.spill(buffer)
+                buffer = []
+                used = 0
+        if not self.runs:
+            buffer.sort(key=self.key)
+            yield from buffer
+            return
+        if buffer:
+            self.spill(buffer)
+            buffer = []
+        # heapq.merge keeps equal keys in run order, and runs are in input order
+        yield from heapq.merge(*(iter_ndjson(path) for path in self.runs), key=self.key)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Single-pass facet statistics over a card CSV (raw parser layout or component layout).
+
+One streaming pass counts cards per trait, color, set, rarity, type and cost, builds the
+trait x color co-occurrence matrix and collects leaders for the trait x leader matrix.
+Malformed rows are reported instead of being dropped. Results are cached next to the
+input keyed by its content hash; when the CSV has only grown by appended rows, just the
+new rows are counted and added to the cached totals.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+from collections import Counter, defaultdict
+
+from card_index import COMPONENT_FACET_COLUMNS, RAW_FACET_COLUMNS, parse_component_array, split_values
+
+STATS_VERSION = 1
+
+COUNTED_FACETS = ('trait', 'color', 'attribute', 'set', 'rarity', 'type', 'cost')
+
+def hash_prefix(path, size):
+    """SHA-256 of the first size bytes of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        remaining = size
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+class FacetStats:
+    """Additive facet counters; merging two FacetStats equals counting both inputs at once"""
+
+    def __init__(self):
+        self.cards = 0
+        self.counts = {facet: Counter() for facet in COUNTED_FACETS}
+        self.trait_color = defaultdict(Counter)
+        self.trait_non_leader = Counter()
+        self.leaders = {}
+        self.malformed = []
+
+    def to_dict(self):
+        return {
+            'cards': self.cards,
+            'counts': {facet: dict(counter) for facet, counter in self.counts.items()},
+            'trait_color': {trait: dict(colors) for trait, colors in self.trait_color.items()},
+            'trait_non_leader': dict(self.trait_non_leader),
+            'leaders': self.leaders,
+            'malformed': self.malformed,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.cards = data['cards']
+        for facet, counts in data['counts'].items():
+            stats.counts[facet] = Counter(counts)
+        for trait, colors in data['trait_color'].items():
+            stats.trait_color[trait] = Counter(colors)
+        stats.trait_non_leader = Counter(data['trait_non_leader'])
+        stats.leaders = data['leaders']
+        stats.malformed = data['malformed']
+        return stats
+
+    def merge(self, other):
+        """Add another FacetStats' counts into this one (other counted after this input); returns self"""
+        self.cards += other.cards
+        for facet, counter in other.counts.items():
+            self.counts[facet].update(counter)
+        for trait, colors in other.trait_color.items():
+            self.trait_color[trait].update(colors)
+        self.trait_non_leader.update(other.trait_non_leader)
+        self.leaders.update(other.leaders)
+        self.malformed.extend(other.malformed)
+        return self
+
+    def trait_leader(self):
+        """{leader cardId: {trait: number of non-leader cards sharing that trait}}"""
+        return {
+            leader_id: {trait: self.trait_non_leader.get(trait, 0) for trait in leader['traits']}
+            for leader_id, leader in self.leaders.items()
+        }
+
+class FacetCounter:
+    """Streams CSV rows into a FacetStats, parsing each distinct multi-value cell once"""
+
+    def __init__(self, fieldnames, stats=None):
+        self.stats = stats or FacetStats()
+        self.positions = {name: i for i, name in enumerate(fieldnames)}
+        self.width = len(fieldnames)
+        self.parsers = {}
+        for facet, (column, separator) in RAW_FACET_COLUMNS.items():
+            if column in self.positions:
+                self.parsers[facet] = (self.positions[column], lambda text, separator=separator: split_values(text, separator))
+            elif COMPONENT_FACET_COLUMNS[facet] in self.positions:
+                self.parsers[facet] = (self.positions[COMPONENT_FACET_COLUMNS[facet]], self.parse_strict_component_array)
+        self.memo = {facet: {} for facet in self.parsers}
+
+    @staticmethod
+    def parse_strict_component_array(text):
+        values = parse_component_array(text)
+        if text and not values and text.strip() != '[]':
+            raise ValueError(f"unreadable component array {text[:60]!r}")
+        return values
+
+    def field(self, values, name):
+        position = self.positions.get(name)
+        return values[position].strip() if position is not None else ''
+
+    def add_row(self, values, line_number):
+        stats = self.stats
+        id_position = self.positions.get('cardId')
+        card_id = values[id_position] if id_position is not None and id_position < len(values) else ''
+        if len(values) != self.width:
+            stats.malformed.append({'line': line_number, 'cardId': card_id, 'error': f"expected {self.width} fields, got {len(values)}"})
+            return
+
+        parsed = {}
+        try:
+            for facet, (position, parse) in self.parsers.items():
+                text = values[position]
+                memo = self.memo[facet]
+                if text not in memo:
+                    memo[text] = parse(text)
+                parsed[facet] = memo[text]
+        except ValueError as e:
+            stats.malformed.append({'line': line_number, 'cardId': card_id, 'error': str(e)})
+            return
+
+        stats.cards += 1
+        traits = parsed.get('trait', [])
+        colors = parsed.get('color', [])
+        card_type = self.field(values, 'cardType').upper()
+        single_values = {
+            'set': self.field(values, 'set'),
+            'rarity': self.field(values, 'rarity'),
+            'type': card_type,
+            'cost': self.field(values, 'cost'),
+        }
+        for facet, facet_values in parsed.items():
+            stats.counts[facet].update(facet_values)
+        for facet, value in single_values.items():
+            if value:
+                stats.counts[facet][value] += 1
+        for trait in traits:
+            stats.trait_color[trait].update(colors)
+        if card_type == 'LEADER':
+            stats.leaders[card_id] = {'name': self.field(values, 'name'), 'traits': traits, 'colors': colors}
+        else:
+            stats.trait_non_leader.update(traits)
+
+def count_rows(text_stream, fieldnames, stats=None, first_line=2):
+    """Feed CSV rows from a text stream (positioned after the header) into a FacetStats"""
+    counter = FacetCounter(fieldnames, stats)
+    reader = csv.reader(text_stream)
+    for values in reader:
+        if values:
+            counter.add_row(values, first_line + reader.line_num - 1)
+    return counter.stats
+
+def default_cache_path(input_csv):
+    return f"{os.path.splitext(input_csv)[0]}_facets.json"
+
+def compute_facet_stats(input_csv, cache_file=None, use_cache=True):
+    """Facet statistics for input_csv, reusing or extending the cached result when possible"""
+    cache_file = cache_file or default_cache_path(input_csv)
+    size = os.path.getsize(input_csv)
+    full_hash = hash_prefix(input_csv, size)
+
+    cached = None
+    if use_cache and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') != STATS_VERSION:
+                cached = None
+        except (OSError, ValueError):
+            cached = None
+
+    if cached and cached['input_hash'] == full_hash:
+        return FacetStats.from_dict(cached['stats']), 'cached'
+
+    with open(input_csv, 'rb') as f:
+        header_line = f.readline()
+    fieldnames = next(csv.reader([header_line.decode('utf-8-sig')]))
+
+    appended = (
+        cached is not None
+        and size > cached['input_size']
+        and cached['fieldnames'] == fieldnames
+        and hash_prefix(input_csv, cached['input_size']) == cached['input_hash']
+    )
+    if appended:
+        # Only rows were appended since the cached run: count the tail and merge it in
+        with open(input_csv, 'rb') as f:
+            head = f.read(cached['input_size'])
+            tail = f.read()
+        first_line = head.count(b'\n') + 1
+        tail_stats = count_rows(io.StringIO(tail.decode('utf-8'), newline=''), fieldnames, first_line=first_line)
+        stats = FacetStats.from_dict(cached['stats']).merge(tail_stats)
+        mode = 'incremental'
+    else:
+        with open(input_csv, 'r', newline='', encoding='utf-8-sig') as f:
+            next(csv.reader([f.readline()]))
+            stats = count_rows(f, fieldnames)
+        mode = 'full'
+
+    if use_cache:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': STATS_VERSION,
+                'input_hash': full_hash,
+                'input_size': size,
+                'fieldnames': fieldnames,
+                'stats': stats.to_dict(),
+            }, f, ensure_ascii=False)
+    return stats, mode
+
+def print_summary(stats, top):
+    print(f"{stats.cards} cards, {len(stats.malformed)} malformed row(s)")
+    for facet in COUNTED_FACETS:
+        counts = stats.counts[facet]
+        if not counts:
+            continue
+        print(f"\n{facet} ({len(counts)} distinct)")
+        for value, count in counts.most_common(top):
+            print(f"  {count:>6}  {value}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Facet statistics for a card CSV')
+    parser.add_argument('input_csv', help='Card CSV (all_cards.csv or a component CSV)')
+    parser.add_argument('-f', '--facet', choices=COUNTED_FACETS, help='Only print the distinct values of one facet')
+    parser.add_argument('-t', '--top', type=int, default=10, help='Values shown per facet in the summary (default: 10)')
+    parser.add_argument('-o', '--output', help='Write all statistics, including the co-occurrence matrices, as JSON')
+    parser.add_argument('--cache', help='Cache file path (default: input_facets.json)')
+    parser.add_argument('--no-cache', action='store_true', help='Always recount and do not write the cache')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_csv):
+        print(f"Error: Input file '{args.input_csv}' not found.")
+        return
+
+    stats, mode = compute_facet_stats(args.input_csv, args.cache, use_cache=not args.no_cache)
+    for row in stats.malformed:
+        print(f"Warning: line {row['line']} ({row['cardId'] or 'no cardId'}): {row['error']}", file=sys.stderr)
+
+    if args.facet:
+        for value in sorted(stats.counts[args.facet]):
+            print(value)
+    else:
+        print(f"Facet statistics ({mode}) for '{args.input_csv}'")
+        print_summary(stats, args.top)
+
+    if args.output:
+        data = stats.to_dict()
+        data['trait_leader'] = stats.trait_leader()
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"Wrote facet statistics to '{args.output}'")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Download the card images listed in a parsed card CSV (imageUrl -> images/<localImage>).
+
+Requests go through a pooled asyncio HTTP client with bounded concurrency. A
+manifest next to the images remembers each file's URL, ETag and Last-Modified,
+so re-runs revalidate with conditional requests and skip unchanged files.
+Interrupted downloads are kept as .part files and resumed with a Range request.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from card_table import CardTable
+from http_pool import (HttpError, HttpPool, IncompleteResponse, check_retryable, load_manifest, save_manifest,
+                       with_origin, with_retries)
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images')
+MANIFEST_NAME = '.image_manifest.json'
+
+def image_jobs(csv_file):
+    """(url, local file name) for every card with an image, once per file name"""
+    table = CardTable.from_csv(csv_file)
+    jobs = {}
+    for url, local_image in zip(table.column('imageUrl'), table.column('localImage')):
+        if url and local_image and local_image not in jobs:
+            jobs[local_image] = url
+    return [(url, local_image) for local_image, url in jobs.items()]
+
+class ImageSync:
+    def __init__(self, pool, images_dir, manifest, revalidate=True, retries=3):
+        self.pool = pool
+        self.images_dir = images_dir
+        self.manifest = manifest
+        self.revalidate = revalidate
+        self.retries = retries
+        self.results = {'downloaded': 0, 'resumed': 0, 'unchanged': 0, 'skipped': 0, 'failed': 0}
+        self.bytes_downloaded = 0
+
+    async def run(self, jobs, concurrency):
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+        workers = [asyncio.create_task(self.worker(queue)) for _ in range(max(1, concurrency))]
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def worker(self, queue):
+        while True:
+            url, local_image = await queue.get()
+            try:
+                result = await self.sync_image(url, local_image)
+            except Exception as e:
+                print(f"Warning: {local_image}: {e or type(e).__name__}", file=sys.stderr)
+                result = 'failed'
+            finally:
+                queue.task_done()
+            self.results[result] += 1
+
+    async def sync_image(self, url, local_image):
+        path = os.path.join(self.images_dir, local_image)
+        if os.path.exists(path) and not self.revalidate:
+            return 'skipped'
+        return await with_retries(lambda: self.download(url, local_image, path), self.retries)
+
+    async def download(self, url, local_image, path):
+        """One attempt at revalidating, resuming or downloading an image"""
+        part_path = path + '.part'
+        entry = self.manifest.get(local_image)
+        headers = {}
+        resume_from = 0
+        if entry and entry.get('url') == url:
+            validator = entry.get('etag') or entry.get('last_modified')
+            if os.path.exists(path) and entry.get('complete'):
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+            elif not entry.get('complete') and validator and os.path.exists(part_path):
+                resume_from = os.path.getsize(part_path)
+                if resume_from:
+                    headers['Range'] = f"bytes={resume_from}-"
+                    headers['If-Range'] = validator
+
+        download = PartialDownload(part_path, resume_from)
+        try:
+            response = await self.pool.request(url, headers, sink=download.open)
+        except (OSError, asyncio.TimeoutError, IncompleteResponse):
+            if download.headers is not None:
+                # Keep what arrived and its validators so the download can be resumed
+                self.manifest[local_image] = self.entry(url, download.headers, complete=False)
+            raise
+        finally:
+            download.close()
+
+        if response.status == 304:
+            return 'unchanged'
+        check_retryable(response)
+        if response.status not in (200, 206):
+            raise HttpError(f"HTTP {response.status} {response.reason} for {url}")
+
+        expected = download.expected_size
+        if expected is not None and download.size != expected:
+            self.manifest[local_image] = self.entry(url, response.headers, complete=False)
+            raise IncompleteResponse(f"incomplete download ({download.size} of {expected} bytes)")
+
+        os.chmod(part_path, 0o644)
+        os.replace(part_path, path)
+        self.manifest[local_image] = self.entry(url, response.headers, complete=True)
+        self.bytes_downloaded += download.written
+        return 'resumed' if download.resumed else 'downloaded'
+
+    @staticmethod
+    def entry(url, headers, complete):
+        return {
+            'url': url,
+            'etag': headers.get('etag', ''),
+            'last_modified': headers.get('last-modified', ''),
+            'complete': complete,
+        }
+
+class PartialDownload:
+    """Sink for HttpPool.request that appends a 206 body to the .part file or rewrites it on 200"""
+
+    def __init__(self, part_path, resume_from):
+        self.part_path = part_path
+        self.resume_from = resume_from
+        self.file = None
+        self.headers = None
+        self.resumed = False
+        self.size = 0
+        self.written = 0
+        self.expected_size = None
+
+    def open(self, status, headers):
+        if status in (200, 206):
+            self.headers = headers
+        if status == 206:
+            content_range = headers.get('content-range', '')
+            start = content_range.split(' ', 1)[-1].split('-', 1)[0]
+            if start != str(self.resume_from):
+                raise HttpError(f"unexpected Content-Range '{content_range}'")
+            if self.resume_from:
+                self.file = open(self.part_path, 'ab')
+                self.resumed = True
+                self.size = self.resume_from
+            else:
+                # A 206 nobody asked for that starts at byte 0 is written like a 200
+                self.file = open(self.part_path, 'wb')
+            total = content_range.rsplit('/', 1)[-1]
+            self.expected_size = int(total) if total.isdigit() else None
+        elif status == 200:
+            self.file = open(self.part_path, 'wb')
+            length = headers.get('content-length', '')
+            self.expected_size = int(length) if length.isdigit() else None
+        else:
+            return None
+        return self.write
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        self.size += len(chunk)
+        self.written += len(chunk)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+async def sync_images(jobs, images_dir=IMAGES_DIR, concurrency=8, revalidate=True, retries=3, timeout=60, origin=None):
+    """Bring images_dir up to date with jobs; returns the ImageSync with per-result counts"""
+    os.makedirs(images_dir, exist_ok=True)
+    manifest_path = os.path.join(images_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    jobs = [(with_origin(url, origin), local_image) for url, local_image in jobs]
+    async with HttpPool(limit=concurrency, timeout=timeout) as pool:
+        sync = ImageSync(pool, images_dir, manifest, revalidate=revalidate, retries=retries)
+        try:
+            await sync.run(jobs, concurrency)
+        finally:
+            save_manifest(manifest_path, manifest)
+        sync.connections_opened = pool.connections_opened
+    return sync
+
+def main():
+    parser = argparse.ArgumentParser(description='Download and revalidate card images listed in a parsed card CSV')
+    parser.add_argument('input_csv', nargs='?', default='all_cards.csv', help='Parsed card CSV with imageUrl and localImage columns (default: all_cards.csv)')
+    parser.add_argument('-o', '--output', default=IMAGES_DIR, help=f'Image directory (default: {IMAGES_DIR})')
+    parser.add_argument('-j', '--concurrency', type=int, default=8, help='Maximum number of requests in flight (default: 8)')
+    parser.add_argument('--retries', type=int, default=3, help='Retries for timeouts and 429/5xx responses (default: 3)')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds (default: 60)')
+    parser.add_argument('--no-revalidate', action='store_true', help='Skip images that already exist instead of revalidating them')
+    parser.add_argument('--origin', help='Fetch from another origin, e.g. http://127.0.0.1:8000 for a local stand-in server')
+    parser.add_argument('--limit', type=int, help='Only sync the first N images')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_csv):
+        print(f"Error: Input file '{args.input_csv}' not found.")
+        return
+
+    jobs = image_jobs(args.input_csv)
+    if args.limit is not None:
+        jobs = jobs[:args.limit]
+
+    start = time.perf_counter()
+    sync = asyncio.run(sync_images(jobs, args.output, args.concurrency, not args.no_revalidate,
+                                   args.retries, args.timeout, args.origin))
+    elapsed = time.perf_counter() - start
+
+    summary = ', '.join(f"{count} {result}" for result, count in sync.results.items())
+    print(f"Synced {len(jobs)} images in {elapsed:.1f}s ({summary}; "
+          f"{sync.bytes_downloaded / 1024 / 1024:.1f} MB over {sync.connections_opened} connection(s))")
+    if sync.results['failed']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
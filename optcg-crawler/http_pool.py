@@ -0,0 +1,243 @@
+"""
+Minimal asyncio HTTP/1.1 client with per-host keep-alive connection pooling, used by
+the image fetcher and the set page crawler, plus the retry loop and the validator
+manifest both of them share. Standard library only.
+"""
+
+import asyncio
+import json
+import ssl
+from typing import NamedTuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from atomic_io import atomic_write
+
+USER_AGENT = 'optcg-crawler/1.0'
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+READ_CHUNK_SIZE = 64 * 1024
+
+class HttpError(Exception):
+    pass
+
+class IncompleteResponse(HttpError):
+    """The connection was closed before the whole body arrived"""
+
+class RetryableStatus(HttpError):
+    """A 408/429/5xx response, worth asking again for"""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status} {response.reason} for {response.url}")
+        self.response = response
+
+class EmptyStatusLine(Exception):
+    """The server closed the connection before answering"""
+
+class HttpResponse(NamedTuple):
+    url: str
+    status: int
+    reason: str
+    headers: dict  # lower-cased header names
+    body: bytes    # empty when the body was streamed to a sink
+
+class HttpPool:
+    """
+    Reuses idle connections per (scheme, host, port) and allows at most limit
+    requests in flight at once across all hosts.
+    """
+
+    def __init__(self, limit=8, timeout=30, user_agent=USER_AGENT):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.idle = {}
+        self.ssl_context = ssl.create_default_context()
+        self.connections_opened = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        for connections in self.idle.values():
+            for _, writer in connections:
+                writer.close()
+        self.idle = {}
+
+    async def request(self, url, headers=None, method='GET', sink=None, max_redirects=5):
+        """
+        Send a request and read the whole response. sink(status, headers) is called
+        once the headers are in; when it returns a callable, the body is streamed to
+        it in chunks instead of being collected. Redirects are followed up to
+        max_redirects times.
+        """
+        for _ in range(max_redirects + 1):
+            async with self.semaphore:
+                response = await asyncio.wait_for(self._request_once(url, headers or {}, method, sink), self.timeout)
+            location = response.headers.get('location')
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response
+            url = urljoin(url, location)
+        raise HttpError(f"Too many redirects for {url}")
+
+    async def _request_once(self, url, headers, method, sink):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise HttpError(f"Unsupported URL scheme in {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"User-Agent: {self.user_agent}", 'Accept-Encoding: identity']
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        request_bytes = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        # An idle connection may have been closed by the server; if so, retry on the next idle or a new connection
+        while True:
+            reused = bool(self.idle.get(key))
+            reader, writer = self.idle[key].pop() if reused else await self._connect(key)
+            try:
+                try:
+                    writer.write(request_bytes)
+                    await writer.drain()
+                except ConnectionError:
+                    if not reused:
+                        raise
+                    writer.close()
+                    continue
+                try:
+                    response, keep_alive = await self._read_response(reader, url, method, sink)
+                except EmptyStatusLine:
+                    if not reused:
+                        raise HttpError(f"Connection closed without a response for {url}")
+                    writer.close()
+                    continue
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                self.idle.setdefault(key, []).append((reader, writer))
+            else:
+                writer.close()
+            return response
+
+    async def _connect(self, key):
+        scheme, hostname, port = key
+        self.connections_opened += 1
+        return await asyncio.open_connection(hostname, port, ssl=self.ssl_context if scheme == 'https' else None)
+
+    async def _read_response(self, reader, url, method, sink):
+        try:
+            status_line = await reader.readline()
+        except ConnectionError:
+            status_line = b''
+        if not status_line:
+            raise EmptyStatusLine()
+        try:
+            version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+            status = int(status)
+        except ValueError:
+            raise HttpError(f"Malformed status line from {url}: {status_line[:80]!r}")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        chunks = []
+        write = sink(status, headers) if sink is not None and status not in REDIRECT_STATUSES else None
+        write = write or chunks.append
+
+        try:
+            if not await self._read_body(reader, headers, method, status, write):
+                keep_alive = False
+        except asyncio.IncompleteReadError:
+            raise IncompleteResponse(f"Connection closed before the response body for {url} was complete")
+
+        return HttpResponse(url, status, reason, headers, b''.join(chunks)), keep_alive
+
+    async def _read_body(self, reader, headers, method, status, write):
+        """Pass the body to write; returns False when it was delimited by the server closing the connection"""
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return True
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                write(await reader.readexactly(size))
+                await reader.readline()
+        elif 'content-length' in headers:
+            remaining = int(headers['content-length'])
+            while remaining > 0:
+                # read() rather than readexactly() so bytes received before a dropped connection reach the sink
+                chunk = await reader.read(min(remaining, READ_CHUNK_SIZE))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b'', remaining)
+                write(chunk)
+                remaining -= len(chunk)
+        else:
+            while True:
+                chunk = await reader.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    return False
+                write(chunk)
+        return True
+
+def check_retryable(response):
+    """Raise RetryableStatus for a response with one of RETRY_STATUSES, else return it"""
+    if response.status in RETRY_STATUSES:
+        raise RetryableStatus(response)
+    return response
+
+def retry_delay(attempt, error):
+    """Seconds to wait after a failed attempt: Retry-After when given in seconds, else 1, 2, 4, ..."""
+    if isinstance(error, RetryableStatus):
+        retry_after = error.response.headers.get('retry-after', '')
+        if retry_after.isdigit():
+            return int(retry_after)
+    return 2 ** attempt
+
+async def with_retries(attempt, retries=3):
+    """
+    Await attempt() until it returns, retrying up to retries times with backoff on
+    timeouts, dropped connections, incomplete bodies and RetryableStatus; the last
+    error is raised when every attempt failed.
+    """
+    for attempt_number in range(retries + 1):
+        try:
+            return await attempt()
+        except (OSError, asyncio.TimeoutError, IncompleteResponse, RetryableStatus) as e:
+            if attempt_number == retries:
+                raise
+            await asyncio.sleep(retry_delay(attempt_number, e))
+
+def with_origin(url, origin):
+    """Point url at another scheme://host[:port], e.g. a local stand-in server"""
+    if not origin:
+        return url
+    parts = urlsplit(url)
+    origin_parts = urlsplit(origin)
+    return urlunsplit((origin_parts.scheme, origin_parts.netloc, parts.path, parts.query, ''))
+
+def load_manifest(path):
+    """{name: {'url', 'etag', 'last_modified', ...}} of a fetched directory, {} when missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(path, manifest):
+    with atomic_write(path) as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
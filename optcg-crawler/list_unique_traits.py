@@ -1,18 +1,13 @@
-import csv
-import json
+import sys
 
-traits = set()
+from facet_stats import compute_facet_stats
 
-with open('optcg-crawler/all_cards_components.csv', newline='', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        try:
-            # Some rows may have empty or malformed traits
-            trait_list = json.loads(row['traits'].replace("'", '"'))
-            for trait in trait_list:
-                traits.add(trait['value'])
-        except Exception:
-            pass
+def collect_unique_traits(csv_file):
+    stats, _ = compute_facet_stats(csv_file, use_cache=False)
+    for row in stats.malformed:
+        print(f"Warning: line {row['line']} ({row['cardId'] or 'no cardId'}): {row['error']}", file=sys.stderr)
+    return set(stats.counts['trait'])
 
-for trait in sorted(traits):
-    print(trait) 
\ No newline at end of file
+if __name__ == '__main__':
+    for trait in sorted(collect_unique_traits('optcg-crawler/all_cards_components.csv')):
+        print(trait)
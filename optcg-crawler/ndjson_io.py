@@ -0,0 +1,57 @@
+"""
+NDJSON helpers: one JSON card object per line, written and read incrementally.
+orjson is used when it is installed, the standard json module otherwise.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def encode_json(obj):
+    """Compact UTF-8 JSON for obj as bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def decode_json(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class NdjsonWriter:
+    """Writes one object per line as it is produced"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, obj):
+        self.file.write(encode_json(obj) + b'\n')
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+def write_ndjson(objs, path):
+    """Stream objs to path; returns the number of lines written"""
+    with NdjsonWriter(path) as writer:
+        for obj in objs:
+            writer.write(obj)
+        return writer.count
+
+def iter_ndjson(path):
+    """Yield the objects of an NDJSON file one line at a time"""
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield decode_json(line)
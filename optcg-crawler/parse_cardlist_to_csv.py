@@ -1,248 +1,325 @@
 import csv
 import argparse
 import os
-import re
 from bs4 import BeautifulSoup
 import glob
+import hashlib
 import json
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from atomic_io import atomic_write
+import card_fields
+from card_fields import CARD_PLAN
+from card_store import CardStore
+from card_table import CardTable
+from ndjson_io import write_ndjson
+import profiling
 
 # File paths
 HTML_FILE = 'cardlist.html'
 CSV_FILE = 'onepiece_cards_modal.csv'
 
-# Set code to full name mapping
-SET_CODE_MAPPING = {
-    'OP01': 'OP01 - Romance Dawn',
-    'OP02': 'OP02 - Paramount War', 
-    'OP03': 'OP03 - Pillars of Strength',
-    'OP04': 'OP04 - Kingdoms of Intrigue',
-    'OP05': 'OP05 - Awakening of the New Era',
-    'OP06': 'OP06 - Wings of the Captain',
-    'OP07': 'OP07 - 500 Years in the Future',
-    'OP08': 'OP08 - Two Legends',
-    'OP09': 'OP09 - Emperors in the New World',
-    'OP10': 'OP10 - Royal Blood',
-    'OP11': 'OP11 - A Fist of Divine Speed',
-    'EB01': 'EB01 - Memorial Collection',
-    'EB02': 'EB02 - Anime 25th Collection',
-    'PRB01': 'PRB01 - One Piece The Best',
-    'ST01': 'ST01 - Straw Hat Crew',
-    'ST02': 'ST02 - Worst Generation',
-    'ST03': 'ST03 - The Seven Warlords of the Sea',
-    'ST04': 'ST04 - Animal Kingdom Pirates',
-    'ST05': 'ST05 - One Piece Film Edition',
-    'ST06': 'ST06 - Absolute Justice',
-    'ST07': 'ST07 - Big Mom Pirates',
-    'ST08': 'ST08 - Monkey D. Luffy',
-    'ST09': 'ST09 - Yamato',
-    'ST10': 'ST10 - The Three Captains',
-    'ST11': 'ST11 - Uta',
-    'ST12': 'ST12 - Zoro & Sanji',
-    'ST13': 'ST13 - The Three Brothers',
-    'ST14': 'ST14 - 3D2Y',
-    'ST15': 'ST15 - Edward.Newgate',
-    'ST16': 'ST16 - Uta',
-    'ST17': 'ST17 - Donquixote Doflamingo',
-    'ST18': 'ST18 - Monkey.D.Luffy',
-    'ST19': 'ST19 - Smoker',
-    'ST20': 'ST20 - Charlotte Katakuri',
-    'ST21': 'ST21 - EX - Gear 5',
-    'ST22': 'ST22 - Ace & Newgate',
-    'ST23': 'ST23 - Shanks',
-    'ST24': 'ST24 - Jewelry Bonney',
-    'ST25': 'ST25 - Buggy',
-    'ST26': 'ST26 - Monkey.D.Luffy',
-    'ST27': 'ST27 - Marshall.D.Teach',
-    'ST28': 'ST28 - Yamato',
-    'P': 'Promotional Cards'
-}
+# Output columns of the parsed card CSV, in the order of card_fields.CARD_FIELD_SPEC
+CSV_FIELDNAMES = CARD_PLAN.fieldnames
 
-# Helper to build full image URL if needed
-def build_image_url(data_src):
-    if data_src.startswith('..'):
-        return 'https://en.onepiece-cardgame.com' + data_src[2:]
-    return data_src
-
-def get_direct_text(tag):
-    if tag:
-        # Get all direct text nodes (not from children)
-        texts = [t for t in tag.find_all(string=True, recursive=False) if t.strip()]
-        return texts[0].strip() if texts else ''
-    return ''
-
-def get_card_type(card):
-    info_col = card.select_one('.infoCol')
-    if info_col:
-        spans = info_col.find_all('span')
-        if len(spans) >= 3:
-            return spans[2].text.strip().upper()
-    return ''
-
-def get_life(card):
-    # For leaders, the life value is in the .cost div with "Life" as the h3 text
-    cost_tag = card.select_one('.cost')
-    if cost_tag:
-        h3_text = cost_tag.find('h3')
-        if h3_text and h3_text.text.strip() == 'Life':
-            return get_direct_text(cost_tag)
-    return ''
-
-def get_counter(card):
-    counter_tag = card.select_one('.counter')
-    if counter_tag:
-        return get_direct_text(counter_tag)
-    return ''
-
-def get_color(card):
-    color_tag = card.select_one('.color')
-    if color_tag:
-        return get_direct_text(color_tag)
-    return ''
-
-def get_card_types(card):
-    feature_tag = card.select_one('.feature')
-    if feature_tag:
-        # Get the text after the "Type" label
-        type_text = get_direct_text(feature_tag)
-        if type_text:
-            # Split by "/" and join with commas
-            types = [t.strip() for t in type_text.split('/') if t.strip()]
-            return ', '.join(types)
-    return ''
-
-def get_power(card):
-    """Extract power value from card - this might need to be enhanced based on HTML structure"""
-    # Look for power in various locations
-    power_tag = card.select_one('.power')
-    if power_tag:
-        return get_direct_text(power_tag)
-    
-    # Alternative: look for power in the effect text or other attributes
-    effect_tag = card.select_one('.text')
-    if effect_tag:
-        effect_text = effect_tag.text
-        # Look for power patterns like "+1000", "5000 power", etc.
-        power_match = re.search(r'(\d+)\s*power', effect_text, re.IGNORECASE)
-        if power_match:
-            return power_match.group(1)
-    
-    return ''
-
-def determine_rarity_from_card_id(card_id):
-    """Determine rarity from card ID patterns"""
-    if not card_id:
-        return ''
-    # Common patterns for rarity
-    card_id_lower = card_id.lower()
-    if '_p' in card_id_lower:
-        return 'P'  # Promotional
-    elif '_r' in card_id_lower:
-        return 'R'  # Rare
-    elif '_sr' in card_id_lower:
-        return 'SR'  # Super Rare
-    elif '_sec' in card_id_lower:
-        return 'SEC'  # Secret
-    elif '_l' in card_id_lower:
-        return 'L'  # Leader
-    elif 'don' in card_id_lower:
-        return 'DON'  # Don card
-    # Default to Common if no pattern matches
-    return 'C'
-
-def get_rarity(card, card_id=None):
-    """Extract rarity from card, fallback to card_id pattern if not found in HTML"""
-    # Try to extract rarity as the second <span> in .infoCol
-    info_col = card.select_one('.infoCol')
-    if info_col:
-        spans = info_col.find_all('span')
-        if len(spans) >= 2:
-            rarity_text = spans[1].text.strip()
-            if rarity_text:
-                return rarity_text
-    # Fallback: use card_id pattern
-    if card_id:
-        return determine_rarity_from_card_id(card_id)
-    return ''
-
-def extract_set_from_card_id(card_id):
-    """Extract set code from card ID and map to full set name"""
-    if not card_id:
-        return ''
-    
-    # Handle P- cards (promotional cards)
-    if card_id.startswith('P-'):
-        return SET_CODE_MAPPING.get('P', 'Promotional Cards')
-    
-    # Extract set code (e.g., "EB01-001" -> "EB01")
-    set_match = re.match(r'^([A-Z]{2,3}\d{2})', card_id)
-    if set_match:
-        set_code = set_match.group(1)
-        return SET_CODE_MAPPING.get(set_code, '')
-    
-    return ''
+# Parse cache settings; bump PARSER_VERSION whenever extraction output changes
+PARSER_VERSION = 1
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.parse_cache')
+CACHE_MAX_ENTRIES = 128
+# Cache entry file names; temp files are only swept once older than CACHE_TMP_MAX_AGE seconds
+CACHE_ENTRY_NAME = re.compile(r'v\d+-[0-9a-f]{64}\.json')
+CACHE_TMP_MAX_AGE = 3600
 
 def parse_cards_from_html(html_file):
-    with open(html_file, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f, 'html.parser')
-
-    cards = []
-    for card in soup.select('dl.modalCol'):
-        card_id_raw = card.get('id', '')
-        card_id = card_id_raw[0].strip() if isinstance(card_id_raw, list) else str(card_id_raw).strip()
-        name_tag = card.select_one('.cardName')
-        name = name_tag.text.strip() if name_tag else ''
-        card_type = get_card_type(card)
-        if card_type == 'LEADER':
-            cost = ''
-            life = get_life(card)
+    with profiling.stage('read', html_file):
+        with open(html_file, 'r', encoding='utf-8') as f:
+            html = f.read()
+    with profiling.stage('tree build', html_file):
+        soup = BeautifulSoup(html, 'html.parser')
+    with profiling.stage('extract', html_file):
+        return extract_cards_from_soup(soup)
+
+def extract_cards_from_soup(soup, plan=CARD_PLAN):
+    return plan.extract_soup(soup)
+
+# Tags html.parser treats as self-closing; they never stay on the open-element stack
+EMPTY_ELEMENT_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+    'image', 'isindex', 'nextid', 'spacer',
+}
+
+class CardStreamParser(HTMLParser):
+    """
+    Event-driven card extractor driven by an ExtractionPlan (see card_fields.py).
+    Collects the raw values every card field needs in a single pass over the markup
+    and keeps no tree: only the open elements of the current card are tracked, and
+    they are dropped as soon as the card closes.
+    """
+
+    def __init__(self, plan=CARD_PLAN):
+        super().__init__(convert_charrefs=True)
+        self.plan = plan
+        self.cards = []
+        self._raw = None
+        self._scopes_seen = set()
+        self._open_scopes = set()
+        self._stack = []
+        self._active = []
+        self._pending = []
+
+    def handle_starttag(self, tag, attrs):
+        plan = self.plan
+        if self._raw is None and plan.card.tag not in (None, tag):
+            return
+        self._flush_text()
+        attr_map = dict(attrs)
+        classes = set((attr_map.get('class') or '').split())
+
+        if self._raw is None:
+            if plan.card.matches(tag, classes):
+                self._raw = {source.key: attr_map.get(source.attr) for source in plan.root}
+                self._scopes_seen = set()
+                self._open_scopes = set()
+                self._stack.append((tag, (), (), ()))
+            return
+
+        raw = self._raw
+        captures = []
+        direct_keys = []
+        for cls in classes.intersection(plan.top_by_class):
+            for source in plan.top_by_class[cls]:
+                if source.key not in raw and source.matcher.tag in (None, tag):
+                    self._capture(source, attr_map, captures, direct_keys)
+        for source in plan.top_by_tag.get(tag, ()):
+            if source.key not in raw:
+                self._capture(source, attr_map, captures, direct_keys)
+        for scope in self._open_scopes:
+            for source in plan.scoped[scope]:
+                if (source.mode == 'each' or source.key not in raw) and source.matcher.matches(tag, classes):
+                    self._capture(source, attr_map, captures, direct_keys)
+        # Each scope is the first element matching it
+        scopes = ()
+        if tag in plan.scope_tags or not classes.isdisjoint(plan.scope_classes):
+            scopes = [scope for scope in plan.scoped if scope not in self._scopes_seen and scope.matches(tag, classes)]
+            self._scopes_seen.update(scopes)
+            self._open_scopes.update(scopes)
+
+        self._stack.append((tag, captures, direct_keys, scopes))
+        if tag in EMPTY_ELEMENT_TAGS:
+            self._pop_to(len(self._stack) - 1)
+
+    def _capture(self, source, attr_map, captures, direct_keys):
+        raw = self._raw
+        if source.attr is not None:
+            raw[source.key] = attr_map.get(source.attr)
+        elif source.mode == 'direct':
+            raw[source.key] = ''
+            direct_keys.append(source.key)
         else:
-            cost_tag = card.select_one('.cost')
-            cost = get_direct_text(cost_tag)
-            life = ''
-        attribute_tag = card.select_one('.attribute i')
-        attribute = attribute_tag.text.strip() if attribute_tag else ''
-        img_tag = card.select_one('img.lazy')
-        image_url = build_image_url(img_tag['data-src']) if img_tag and img_tag.has_attr('data-src') else ''
-        local_image = f"{card_id}.jpg" if card_id else ''
-        effect_tag = card.select_one('.text')
-        effect_text = effect_tag.text.replace('Effect', '').strip() if effect_tag else ''
-        trigger_tag = card.select_one('.trigger')
-        trigger_text = trigger_tag.text.replace('Trigger', '').strip() if trigger_tag else ''
-        # Remove leading symbols like [] from trigger text
-        if trigger_text.startswith('[]'):
-            trigger_text = trigger_text[2:].strip()
-        elif trigger_text.startswith('['):
-            # Find the closing bracket and remove everything up to it
-            end_bracket = trigger_text.find(']')
-            if end_bracket != -1:
-                trigger_text = trigger_text[end_bracket + 1:].strip()
-        
-        counter = get_counter(card)
-        color = get_color(card)
-        types = get_card_types(card)
-        power = get_power(card)
-        rarity = get_rarity(card, card_id)
-        set_name = extract_set_from_card_id(card_id)
-
-        cards.append({
-            'cardId': card_id,
-            'name': name,
-            'cardType': card_type,
-            'life': life,
-            'cost': cost,
-            'power': power,
-            'attribute': attribute,
-            'types': types,
-            'counter': counter,
-            'color': color,
-            'imageUrl': image_url,
-            'localImage': local_image,
-            'effectText': effect_text,
-            'triggerText': trigger_text,
-            'rarity': rarity,
-            'set': set_name,
-        })
-    return cards
+            parts = []
+            captures.append(parts)
+            self._active.append(parts)
+            if source.mode == 'each':
+                raw.setdefault(source.key, []).append(parts)
+            else:
+                raw[source.key] = parts
+
+    def handle_endtag(self, tag):
+        if self._raw is None:
+            return
+        self._flush_text()
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                self._pop_to(index)
+                break
+
+    def handle_data(self, data):
+        if self._raw is not None:
+            self._pending.append(data)
+
+    def handle_comment(self, data):
+        # Comments are left out of an element's full text but, like in BeautifulSoup,
+        # still count as one of its direct strings
+        if self._raw is not None:
+            self._flush_text()
+            self._set_direct_text(data)
+
+    def _flush_text(self):
+        if not self._pending:
+            return
+        text = ''.join(self._pending)
+        self._pending = []
+        for parts in self._active:
+            parts.append(text)
+        self._set_direct_text(text)
+
+    def _set_direct_text(self, text):
+        stripped = text.strip()
+        if stripped and self._stack:
+            for key in self._stack[-1][2]:
+                if not self._raw[key]:
+                    self._raw[key] = stripped
+
+    def _pop_to(self, index):
+        while len(self._stack) > index:
+            tag, captures, direct_keys, scopes = self._stack.pop()
+            if captures:
+                # Captures are opened and closed in stack order, so they sit at the end
+                del self._active[-len(captures):]
+            self._open_scopes.difference_update(scopes)
+        if not self._stack:
+            self.cards.append(self.plan.build(raw_values(self.plan, self._raw)))
+            self._raw = None
+
+def raw_values(plan, raw):
+    """Join the text captured by CardStreamParser into the raw values the plan builds cards from"""
+    values = dict.fromkeys(plan.keys)
+    for key, value in raw.items():
+        mode = plan.modes[key]
+        if mode == 'full':
+            value = ''.join(value)
+        elif mode == 'each':
+            value = [''.join(parts) for parts in value]
+        values[key] = value
+    for key in plan.keys:
+        if values[key] is None and plan.modes[key] == 'each':
+            values[key] = []
+    return values
+
+def iter_cards_from_html_stream(html_file, chunk_size=64 * 1024):
+    """Yield cards from an HTML file as soon as each dl.modalCol closes"""
+    parser = CardStreamParser()
+    with open(html_file, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            if parser.cards:
+                yield from parser.cards
+                parser.cards = []
+    parser.close()
+    yield from parser.cards
+
+def parse_cards_from_html_stream(html_file):
+    """Streaming counterpart of parse_cards_from_html with identical output"""
+    with profiling.stage('stream parse', html_file):
+        return list(iter_cards_from_html_stream(html_file))
+
+# Interchangeable card extractors; every backend returns identical card rows
+CARD_EXTRACTORS = {
+    'soup': parse_cards_from_html,
+    'stream': parse_cards_from_html_stream,
+}
+
+def parse_html_files(html_files, jobs=1, extractor='stream'):
+    """Parse several HTML files, returning one card list per file in input order"""
+    parse_file = CARD_EXTRACTORS[extractor]
+    if jobs is None or jobs < 1:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(html_files))
+    if jobs <= 1:
+        return [parse_file(html_file) for html_file in html_files]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Submit the largest pages first so a big set doesn't end up running last,
+        # then collect results by index so the merge order matches a serial run
+        order = sorted(range(len(html_files)), key=lambda i: os.path.getsize(html_files[i]), reverse=True)
+        futures = {i: executor.submit(parse_file, html_files[i]) for i in order}
+        return [futures[i].result() for i in range(len(html_files))]
+
+def file_content_hash(path):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def parse_cache_key(html_file):
+    """Cache key for a page: parser version stamp plus the page's content hash"""
+    return f"v{PARSER_VERSION}-{file_content_hash(html_file)}"
+
+def load_cached_cards(cache_dir, key):
+    """Return the cached cards for a key, or None on a miss"""
+    cache_path = os.path.join(cache_dir, f"{key}.json")
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+        # Refresh the mtime so pruning evicts the least recently used entries first
+        os.utime(cache_path)
+    except (OSError, ValueError):
+        return None
+    return [dict(zip(CSV_FIELDNAMES, row)) for row in rows]
+
+def store_cached_cards(cache_dir, key, cards):
+    """Atomically write a page's cards to the cache as compact row lists"""
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, f"{key}.json")
+    rows = [[card[field] for field in CSV_FIELDNAMES] for card in cards]
+    with atomic_write(cache_path) as f:
+        json.dump(rows, f, ensure_ascii=False, separators=(',', ':'))
+
+def prune_parse_cache(cache_dir, max_entries=CACHE_MAX_ENTRIES):
+    """
+    Drop cache entries from other parser versions, then the oldest entries beyond
+    max_entries. Only regular files named like a cache entry (or a temp file older
+    than CACHE_TMP_MAX_AGE) are removed; anything else in cache_dir is left alone.
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    current_prefix = f"v{PARSER_VERSION}-"
+    stale_before = time.time() - CACHE_TMP_MAX_AGE
+    entries = []
+    removed = 0
+    with os.scandir(cache_dir) as scan:
+        for entry in scan:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                mtime = entry.stat(follow_symlinks=False).st_mtime
+            except FileNotFoundError:
+                continue
+            if CACHE_ENTRY_NAME.fullmatch(entry.name):
+                if entry.name.startswith(current_prefix):
+                    entries.append((mtime, entry.path))
+                    continue
+            elif not (entry.name.endswith('.tmp') and mtime < stale_before):
+                continue
+            removed += remove_cache_file(entry.path)
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        removed += remove_cache_file(path)
+    return removed
+
+def remove_cache_file(path):
+    """Remove one cache file; another run may have removed it first"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return 0
+    return 1
+
+def parse_html_files_cached(html_files, jobs=1, extractor='stream', cache_dir=CACHE_DIR, max_entries=CACHE_MAX_ENTRIES):
+    """Like parse_html_files, but only pages missing from the parse cache are parsed"""
+    with profiling.stage('cache lookup'):
+        keys = [parse_cache_key(html_file) for html_file in html_files]
+        results = [load_cached_cards(cache_dir, key) for key in keys]
+    misses = [i for i, cards in enumerate(results) if cards is None]
+
+    parsed = parse_html_files([html_files[i] for i in misses], jobs=jobs, extractor=extractor)
+    with profiling.stage('cache store'):
+        for i, cards in zip(misses, parsed):
+            store_cached_cards(cache_dir, keys[i], cards)
+            results[i] = cards
+        prune_parse_cache(cache_dir, max_entries)
+
+    print(f"Parse cache: {len(html_files) - len(misses)} hit(s), {len(misses)} file(s) parsed")
+    return results
 
 def read_existing_cards(csv_file):
     """Read existing cards from CSV to avoid duplicates"""
@@ -254,25 +331,57 @@ def read_existing_cards(csv_file):
                 existing_cards[row['cardId']] = row
     return existing_cards
 
-def write_cards_to_csv(cards, csv_file, append_mode=False):
-    fieldnames = ['cardId', 'name', 'cardType', 'life', 'cost', 'power', 'attribute', 'types', 'counter', 'color', 'imageUrl', 'localImage', 'effectText', 'triggerText', 'rarity', 'set']
+def csv_file_state(csv_file):
+    """Size and mtime of a CSV, to tell whether it was rewritten since the store exported it"""
+    stat = os.stat(csv_file)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def write_cards_to_store(cards, csv_file, store_path, append_mode=False):
+    """
+    Upsert cards into the SQLite card store, then export it to csv_file if anything
+    changed. The store remembers the CSV it exports; in append mode it refuses a
+    different CSV, and first takes in the CSV's rows (dropping stored cards the CSV
+    no longer has) when the CSV was written without the store since the last export.
+    """
+    csv_path = os.path.abspath(csv_file)
+    with CardStore(store_path, CSV_FIELDNAMES) as store:
+        if not append_mode:
+            store.clear()
+        else:
+            owner = store.get_meta('csv_file')
+            if owner is not None and owner != csv_path:
+                raise ValueError(f"Card store '{store_path}' belongs to '{owner}', not '{csv_path}'; "
+                                 "use a separate --store per CSV or run without -a to rebuild it")
+            if os.path.exists(csv_file) and store.get_meta('csv_state') != csv_file_state(csv_file):
+                existing_cards = read_existing_cards(csv_file)
+                store.delete([card_id for card_id in store.card_ids() if card_id not in existing_cards])
+                store.upsert(existing_cards.values())
+        changed = store.upsert(cards)
+        if changed or not append_mode or not os.path.exists(csv_file):
+            store.export_csv(csv_file)
+        store.set_meta('csv_file', csv_path)
+        store.set_meta('csv_state', csv_file_state(csv_file))
+        return store.count()
+
+def write_cards_to_csv(cards, csv_file, append_mode=False, store_path=None):
+    fieldnames = CSV_FIELDNAMES
+    
+    if store_path:
+        return write_cards_to_store(cards, csv_file, store_path, append_mode=append_mode)
     
     if append_mode and os.path.exists(csv_file):
         # Read existing cards
-        existing_cards = read_existing_cards(csv_file)
+        existing_cards = CardTable(fieldnames)
+        with open(csv_file, 'r', newline='', encoding='utf-8') as csvfile:
+            existing_cards.extend(csv.DictReader(csvfile))
         
         # Merge new cards, overwriting existing ones with same cardId
-        for card in cards:
-            existing_cards[card['cardId']] = card
+        existing_cards.extend(cards)
         
         # Write all cards back
-        with open(csv_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for card in existing_cards.values():
-                writer.writerow(card)
-        
-        return len(existing_cards)
+        return existing_cards.write_csv(csv_file)
+    elif isinstance(cards, CardTable):
+        return cards.write_csv(csv_file)
     else:
         # Write new file
         with open(csv_file, 'w', newline='', encoding='utf-8') as csvfile:
@@ -283,114 +392,133 @@ def write_cards_to_csv(cards, csv_file, append_mode=False):
         
         return len(cards)
 
-def convert_to_component_arrays(csv_file, output_file=None):
+def component_array(text, separator, skip_empty=False):
+    """Turn a separated string such as "Red/Green" into a [{name, value}] component array"""
+    components = []
+    if text:
+        for item in text.split(separator):
+            item = item.strip()
+            if item or not skip_empty:
+                components.append({
+                    'name': item,
+                    'value': item
+                })
+    return components
+
+def component_array_json(components):
+    # Create component array strings (JSON format for CSV)
+    return json.dumps(components, ensure_ascii=False)
+
+def effect_blocks(effect_text):
+    """Convert effectText to Strapi rich text blocks format"""
+    if effect_text:
+        return [{
+            "type": "paragraph",
+            "children": [{"text": effect_text}]
+        }]
+    return []
+
+def normalize_rarity(rarity):
+    # Fix rarity value if needed
+    rarity = rarity.strip()
+    if rarity == 'SP CARD':
+        rarity = 'SP'
+    return rarity
+
+# Normalize cardType to allowed Strapi values
+CARD_TYPE_ALLOWED = {"LEADER", "CHARACTER", "EVENT", "STAGE"}
+
+def normalize_card_type(card_type):
+    card_type = card_type.strip().upper()
+    return card_type if card_type in CARD_TYPE_ALLOWED else ''
+
+def iter_component_cards(table, encode_array=None, encode_blocks=None):
     """
-    Convert CSV columns to component array format for Strapi
-    This creates a new CSV with component array columns
+    Yield one component card per table row. Component arrays and effect blocks are lists
+    unless encode_array/encode_blocks turn them into strings, e.g. for CSV cells.
     """
-    if output_file is None:
-        base_name = os.path.splitext(csv_file)[0]
-        output_file = f"{base_name}_components.csv"
+    encode_array = encode_array or (lambda value: value)
+    encode_blocks = encode_blocks or (lambda value: value)
     
-    component_cards = []
+    # Shared values (traits, colors, effect text...) are converted once per distinct value
+    attributes = table.map_column('attribute', lambda text: encode_array(component_array(text, '/', skip_empty=True)))
+    traits = table.map_column('types', lambda text: encode_array(component_array(text, ', ')))
+    colors = table.map_column('color', lambda text: encode_array(component_array(text, '/')))
+    effects = table.map_column('effectText', lambda text: encode_blocks(effect_blocks(text)))
+    rarities = table.map_column('rarity', normalize_rarity)
+    card_types = table.map_column('cardType', normalize_card_type)
     
-    with open(csv_file, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            # Convert attributes to component array
-            attributes = []
-            if row['attribute']:
-                for attr in row['attribute'].split('/'):
-                    attr = attr.strip()
-                    if attr:
-                        attributes.append({
-                            'name': attr,
-                            'value': attr
-                        })
-            
-            # Convert types/traits to component array
-            traits = []
-            if row['types']:
-                for trait in row['types'].split(', '):
-                    traits.append({
-                        'name': trait.strip(),
-                        'value': trait.strip()
-                    })
-            
-            # Convert colors to component array
-            colors = []
-            if row['color']:
-                for color in row['color'].split('/'):
-                    colors.append({
-                        'name': color.strip(),
-                        'value': color.strip()
-                    })
-            
-            # Convert images to component array
-            images = []
-            if row['imageUrl']:
-                images.append({
-                    'url': row['imageUrl'],
-                    'alt': row['name'],
-                    'localPath': row['localImage']
-                })
-            
-            # Create component array strings (JSON-like format for CSV)
-            attributes_json = str(attributes).replace("'", '"')
-            traits_json = str(traits).replace("'", '"')
-            colors_json = str(colors).replace("'", '"')
-            images_json = str(images).replace("'", '"')
-            
-            # Fix rarity value if needed
-            rarity = row['rarity'].strip()
-            if rarity == 'SP CARD':
-                rarity = 'SP'
-            
-            # Convert effectText to Strapi rich text blocks format
-            if row['effectText']:
-                effectText_json = json.dumps([{
-                    "type": "paragraph",
-                    "children": [{"text": row['effectText']}]
-                }])
-            else:
-                effectText_json = json.dumps([])
-            
-            # Normalize cardType to allowed Strapi values
-            CARD_TYPE_ALLOWED = {"LEADER", "CHARACTER", "EVENT", "STAGE"}
-            card_type = row['cardType'].strip().upper()
-            if card_type not in CARD_TYPE_ALLOWED:
-                card_type = ''
-            
-            component_cards.append({
-                'cardId': row['cardId'],
-                'name': row['name'],
-                'cardType': card_type,
-                'life': row['life'],
-                'cost': row['cost'],
-                'power': row['power'],
-                'attributes': attributes_json,
-                'traits': traits_json,
-                'counter': row['counter'],
-                'colors': colors_json,
-                'images': images_json,
-                'effectText': effectText_json,
-                'triggerText': row['triggerText'],
-                'rarity': rarity,
-                'set': row['set'],
+    for row in range(len(table)):
+        # Convert images to component array
+        images = []
+        image_url = table.get('imageUrl', row)
+        if image_url:
+            images.append({
+                'url': image_url,
+                'alt': table.get('name', row),
+                'localPath': table.get('localImage', row)
             })
+        
+        yield {
+            'cardId': table.get('cardId', row),
+            'name': table.get('name', row),
+            'cardType': card_types[row],
+            'life': table.get('life', row),
+            'cost': table.get('cost', row),
+            'power': table.get('power', row),
+            'attributes': attributes[row],
+            'traits': traits[row],
+            'counter': table.get('counter', row),
+            'colors': colors[row],
+            'images': encode_array(images),
+            'effectText': effects[row],
+            'triggerText': table.get('triggerText', row),
+            'rarity': rarities[row],
+            'set': table.get('set', row),
+        }
+
+def convert_to_component_arrays(csv_file, output_file=None, output_format='csv'):
+    """
+    Convert CSV columns to component array format for Strapi
+    This creates a new CSV with component array columns, or with output_format='ndjson'
+    an NDJSON file holding one card object per line
+    """
+    extension = 'ndjson' if output_format == 'ndjson' else 'csv'
+    if output_file is None:
+        base_name = os.path.splitext(csv_file)[0]
+        output_file = f"{base_name}_components.{extension}"
     
-    # Write component array CSV
-    fieldnames = ['cardId', 'name', 'cardType', 'life', 'cost', 'power', 'attributes', 'traits', 'counter', 'colors', 'images', 'effectText', 'triggerText', 'rarity', 'set']
+    with profiling.stage('component read', csv_file):
+        table = CardTable.from_csv(csv_file)
     
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for card in component_cards:
-            writer.writerow(card)
+    if output_format == 'ndjson':
+        count = write_ndjson(iter_component_cards(table), output_file)
+    else:
+        # Write component array CSV
+        fieldnames = ['cardId', 'name', 'cardType', 'life', 'cost', 'power', 'attributes', 'traits', 'counter', 'colors', 'images', 'effectText', 'triggerText', 'rarity', 'set']
+        
+        count = 0
+        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            for card in iter_component_cards(table, encode_array=component_array_json, encode_blocks=json.dumps):
+                writer.writerow(card)
+                count += 1
     
-    print(f"Converted {len(component_cards)} cards to component array format: {output_file}")
+    print(f"Converted {count} cards to component array format: {output_file}")
     return output_file
 
+# Field extractors and helpers whose calls and cumulative time --profile reports
+PROFILED_FUNCTIONS = [
+    'raw_values', 'component_array', 'component_array_json', 'effect_blocks',
+    'normalize_rarity', 'normalize_card_type',
+]
+# Raw value readers of the soup backend (card_fields.py); the report's fields section
+# times every output field of the plan under either backend
+PROFILED_FIELD_FUNCTIONS = [
+    'soup_value', 'get_direct_text',
+]
+
 def main():
     parser = argparse.ArgumentParser(description='Parse One Piece card HTML files to CSV')
     parser.add_argument('input_html', nargs='?', help='Input HTML file path (optional if using --directory)')
@@ -398,6 +526,15 @@ def main():
     parser.add_argument('-a', '--append', action='store_true', help='Append to existing CSV file instead of overwriting')
     parser.add_argument('-d', '--directory', help='Directory containing HTML files to process')
     parser.add_argument('-c', '--components', action='store_true', help='Convert to component array format after parsing')
+    parser.add_argument('--ndjson', action='store_true', help='Write the component conversion as NDJSON (one card object per line) instead of CSV; implies -c')
+    parser.add_argument('-e', '--extractor', choices=sorted(CARD_EXTRACTORS), default='stream', help='Card extractor backend: single-pass streaming parser or BeautifulSoup (default: stream)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes used to parse HTML files (default: 1, 0 = one per CPU)')
+    parser.add_argument('-s', '--store', help='SQLite card store to upsert into; the CSV is exported from it')
+    parser.add_argument('--no-cache', action='store_true', help='Re-parse every HTML file instead of reusing the parse cache')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help=f'Parse cache directory (default: {CACHE_DIR})')
+    parser.add_argument('--cache-size', type=int, default=CACHE_MAX_ENTRIES, help=f'Maximum number of cached pages to keep (default: {CACHE_MAX_ENTRIES})')
+    parser.add_argument('--profile', nargs='?', const='', help='Record per-file/per-stage timing, memory, extractor call costs and per-field costs as a JSON report (default: output_profile.json)')
+    parser.add_argument('--flamegraph', help='With --profile, also sample stacks and write them in folded format to this file')
     
     args = parser.parse_args()
     
@@ -419,24 +556,47 @@ def main():
             base_name = os.path.splitext(html_files[0])[0]
             args.output = f"{base_name}.csv"
     
-    all_cards = []
+    existing_files = []
     for html_file in html_files:
         if not os.path.exists(html_file):
             print(f"Warning: Input file '{html_file}' not found. Skipping.")
             continue
-        all_cards.extend(parse_cards_from_html(html_file))
+        existing_files.append(html_file)
     
-    # Remove duplicates by cardId (last occurrence wins)
-    unique_cards = {}
-    for card in all_cards:
-        unique_cards[card['cardId']] = card
-    total_cards = write_cards_to_csv(list(unique_cards.values()), args.output, append_mode=args.append)
+    report_file = None
+    if args.profile is not None:
+        report_file = args.profile or f"{os.path.splitext(args.output)[0]}_profile.json"
+        if args.jobs != 1:
+            print('Note: --profile parses in a single process so per-file stages are recorded')
+            args.jobs = 1
     
-    print(f"Parsed {len(unique_cards)} cards from {len(html_files)} file(s) and wrote to '{args.output}' (total: {total_cards} cards)")
-    
-    # Convert to component arrays if requested
-    if args.components:
-        convert_to_component_arrays(args.output)
+    with profiling.profile_run('parse_cardlist_to_csv', report_file, args.flamegraph,
+                               [(sys.modules[__name__], PROFILED_FUNCTIONS), (card_fields, PROFILED_FIELD_FUNCTIONS)]):
+        with profiling.stage('parse'):
+            if args.no_cache:
+                parsed_files = parse_html_files(existing_files, jobs=args.jobs, extractor=args.extractor)
+            else:
+                parsed_files = parse_html_files_cached(existing_files, jobs=args.jobs, extractor=args.extractor,
+                                                       cache_dir=args.cache_dir, max_entries=args.cache_size)
+        
+        # Collect into one card table; duplicates by cardId are replaced (last occurrence wins)
+        with profiling.stage('dedup'):
+            card_table = CardTable(CSV_FIELDNAMES)
+            for cards in parsed_files:
+                card_table.extend(cards)
+        with profiling.stage('write', args.output):
+            try:
+                total_cards = write_cards_to_csv(card_table, args.output, append_mode=args.append, store_path=args.store)
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+        
+        print(f"Parsed {len(card_table)} cards from {len(html_files)} file(s) and wrote to '{args.output}' (total: {total_cards} cards)")
+        
+        # Convert to component arrays if requested
+        if args.components or args.ndjson:
+            with profiling.stage('component conversion'):
+                convert_to_component_arrays(args.output, output_format='ndjson' if args.ndjson else 'csv')
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Opt-in profiling for the parsing and conversion scripts (--profile).
+
+Stages are timed with profiling.stage(name, file) blocks that cost nothing unless
+a Profiler is active. Field extractors and other hot helpers are wrapped in place
+to count calls and cumulative time, and the card extraction plan adds the same
+per output field (fields). The report is JSON; a sampling profiler can
+also write folded stacks ("a;b;c count" lines) for flamegraph.pl or speedscope.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+ACTIVE = None
+
+def stage(name, file=None):
+    """Time a block as a pipeline stage when profiling is active"""
+    if ACTIVE is None:
+        return contextlib.nullcontext()
+    return ACTIVE.stage(name, file)
+
+def current_rss_kb():
+    """Resident set size in KB (Linux /proc; falls back to the peak elsewhere)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss_kb()
+
+def peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+class Profiler:
+    def __init__(self, command):
+        self.command = command
+        self.started = datetime.now(timezone.utc)
+        self.start_time = time.perf_counter()
+        self.stages = []
+        self.functions = {}
+        # Output field -> {'calls', 'seconds'}, filled in by ExtractionPlan.build
+        self.fields = {}
+        self.wrapped = []
+        self.depth = 0
+
+    def __enter__(self):
+        global ACTIVE
+        ACTIVE = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global ACTIVE
+        ACTIVE = None
+        self.restore()
+
+    @contextlib.contextmanager
+    def stage(self, name, file=None):
+        rss_before = current_rss_kb()
+        start = time.perf_counter()
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            self.stages.append({
+                'stage': name,
+                'file': file,
+                'depth': self.depth,
+                'seconds': time.perf_counter() - start,
+                'rss_before_kb': rss_before,
+                'rss_after_kb': current_rss_kb(),
+                'peak_rss_kb': peak_rss_kb(),
+            })
+
+    def instrument(self, module, names):
+        """Replace module.<name> with a wrapper counting calls and cumulative time"""
+        for name in names:
+            original = getattr(module, name)
+            stats = self.functions.setdefault(name, {'calls': 0, 'seconds': 0.0})
+
+            @functools.wraps(original)
+            def wrapper(*args, _original=original, _stats=stats, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    _stats['calls'] += 1
+                    _stats['seconds'] += time.perf_counter() - start
+
+            setattr(module, name, wrapper)
+            self.wrapped.append((module, name, original))
+
+    def restore(self):
+        for module, name, original in reversed(self.wrapped):
+            setattr(module, name, original)
+        self.wrapped = []
+
+    def report(self):
+        totals = {}
+        for entry in self.stages:
+            total = totals.setdefault(entry['stage'], {'calls': 0, 'seconds': 0.0})
+            total['calls'] += 1
+            total['seconds'] += entry['seconds']
+        return {
+            'command': self.command,
+            'argv': sys.argv,
+            'started': self.started.isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'total_seconds': time.perf_counter() - self.start_time,
+            'peak_rss_kb': peak_rss_kb(),
+            'stage_totals': totals,
+            'stages': self.stages,
+            'functions': dict(sorted(self.functions.items(), key=lambda item: -item[1]['seconds'])),
+            'fields': dict(self.fields),
+        }
+
+    def write_report(self, report_file):
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def print_summary(self):
+        report = self.report()
+        print(f"Profile: {report['total_seconds']:.3f}s total, peak RSS {report['peak_rss_kb'] / 1024:.1f} MB")
+        for name, total in report['stage_totals'].items():
+            print(f"  {name:<30} {total['seconds']:>8.3f}s  ({total['calls']} call(s))")
+        for name, stats in list(report['functions'].items())[:10]:
+            if stats['calls']:
+                print(f"  {name + '()':<30} {stats['seconds']:>8.3f}s  ({stats['calls']} call(s))")
+        for name, stats in sorted(report['fields'].items(), key=lambda item: -item[1]['seconds'])[:5]:
+            print(f"  {'field ' + name:<30} {stats['seconds']:>8.3f}s  ({stats['calls']} call(s))")
+
+class StackSampler:
+    """Samples the main thread's stack every interval seconds and counts folded stacks"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self.main_thread_id = threading.main_thread().ident
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop_event.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.main_thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def write_folded(self, folded_file):
+        with open(folded_file, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+@contextlib.contextmanager
+def profile_run(command, report_file, folded_file=None, modules=()):
+    """
+    Profile the enclosed block when report_file is set: modules is a list of
+    (module, [function names]) to instrument. Writes the JSON report (and the folded
+    stacks) on exit and prints a short summary.
+    """
+    if not report_file:
+        yield None
+        return
+    sampler = StackSampler() if folded_file else contextlib.nullcontext()
+    with Profiler(command) as profiler, sampler:
+        for module, names in modules:
+            profiler.instrument(module, names)
+        yield profiler
+    profiler.write_report(report_file)
+    profiler.print_summary()
+    print(f"Wrote profile report to '{report_file}'")
+    if folded_file:
+        sampler.write_folded(folded_file)
+        print(f"Wrote {sum(sampler.samples.values())} stack samples to '{folded_file}' (render with flamegraph.pl or speedscope)")
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo opening-hand and draw simulator for saved decks (data/decks/*.json).
+
+Shuffles are generated as whole batches of permutations with NumPy and hands are
+evaluated with array operations over the batch, so a million games is a few
+hundred batched operations instead of a million Python loops. Trials are split
+into fixed-size chunks, each with its own random stream spawned from the seed, and
+worker processes run whole chunks, so a seeded run gives the same result for any
+number of jobs.
+
+Hand predicates are expressions over the cards in hand (one row per game, one
+column per card) and may be boolean (reported as a probability with a Wilson
+confidence interval) or numeric (reported as a mean with a normal interval):
+
+    any(is_type('CHARACTER') & (cost <= 2) & trait('Straw Hat Crew'))
+    sum(counter)
+    count(has('[Blocker]')) >= 2
+
+Names available in expressions: cost, counter, power (per card in hand; -1/0
+when the card has none), trait(name), color(name), is_type(type), card(cardId),
+has(text in the effect) and the per-hand reductions any, all, count, sum, min,
+max and mean. Combine masks with &, | and ~. Since a card without a cost has
+cost -1, an upper bound such as cost <= 2 also matches it; the first example is
+safe because characters always have a cost, otherwise add (cost >= 0).
+Requires NumPy.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from card_ids import decode_card_id
+from validate_decks import entry_card_id
+
+OPENING_HAND = 5
+DEFAULT_LIFE = 5
+BATCH_SIZE = 20000
+# Trials per random stream; independent of the number of jobs so --seed results are too
+CHUNK_SIZE = 100_000
+
+def card_number(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+def load_deck(deck_file):
+    """(deck name, leader life, one card dict per copy in the main deck)"""
+    with open(deck_file, 'r', encoding='utf-8') as f:
+        deck = json.load(f)
+    if not isinstance(deck, dict):
+        raise ValueError(f"Deck file '{deck_file}' is not a deck: expected a JSON object")
+    leader = deck.get('leader') if isinstance(deck.get('leader'), dict) else {}
+    slots = []
+    for entry in deck.get('mainDeck') or []:
+        if not isinstance(entry, dict):
+            raise ValueError(f"Deck file '{deck_file}' has a main deck entry without card data: {entry!r}")
+        card = entry.get('card') if isinstance(entry.get('card'), dict) else entry
+        slots.extend([card] * card_number(entry.get('quantity', 1), 1))
+    return deck.get('name') or os.path.basename(deck_file), card_number(leader.get('life'), DEFAULT_LIFE), slots
+
+class DeckArrays:
+    """Per-slot card attributes of a deck as NumPy arrays; slot i is one physical card"""
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.size = len(slots)
+        self.cost = np.array([card_number(card.get('cost'), -1) for card in slots], dtype=np.int16)
+        self.counter = np.array([card_number(card.get('counter'), 0) for card in slots], dtype=np.int16)
+        self.power = np.array([card_number(card.get('power'), 0) for card in slots], dtype=np.int32)
+
+    def mask(self, test):
+        return np.array([bool(test(card)) for card in self.slots], dtype=bool)
+
+    def trait(self, name):
+        return self.mask(lambda card: any(entry.get('trait') == name for entry in card.get('traits') or []))
+
+    def color(self, name):
+        return self.mask(lambda card: any(entry.get('color') == name for entry in card.get('colors') or []))
+
+    def is_type(self, card_type):
+        return self.mask(lambda card: (card.get('cardType') or '').upper() == card_type.upper())
+
+    def card(self, card_id):
+        base_id = decode_card_id(card_id).base_id
+        return self.mask(lambda card: decode_card_id(entry_card_id(card) or '').base_id == base_id)
+
+    def has(self, text):
+        return self.mask(lambda card: text in (card.get('effect_description') or card.get('effectText') or ''))
+
+class HandNamespace(dict):
+    """Expression names for a batch of hands (games x cards), computed on first use"""
+
+    def __init__(self, deck, hands):
+        super().__init__()
+        self.deck = deck
+        self.hands = hands
+        self.masks = {}
+
+    def slot_mask(self, kind, value):
+        key = (kind, value)
+        if key not in self.masks:
+            self.masks[key] = getattr(self.deck, kind)(value)
+        return self.masks[key][self.hands]
+
+    def __missing__(self, name):
+        if name in ('cost', 'counter', 'power'):
+            value = getattr(self.deck, name)[self.hands]
+        elif name in ('trait', 'color', 'is_type', 'card', 'has'):
+            value = lambda argument, kind=name: self.slot_mask(kind, argument)
+        else:
+            # Falls through to the reductions, then to a NameError
+            raise KeyError(name)
+        self[name] = value
+        return value
+
+REDUCTIONS = {
+    'any': lambda values: np.any(values, axis=1),
+    'all': lambda values: np.all(values, axis=1),
+    'count': lambda values: np.count_nonzero(values, axis=1),
+    'sum': lambda values: np.sum(values, axis=1),
+    'min': lambda values: np.min(values, axis=1),
+    'max': lambda values: np.max(values, axis=1),
+    'mean': lambda values: np.mean(values, axis=1),
+}
+
+def evaluate(predicate, deck, hands):
+    """Per-game values of a predicate (an expression string or a callable taking the namespace)"""
+    namespace = HandNamespace(deck, hands)
+    if callable(predicate):
+        result = predicate(namespace)
+    else:
+        result = eval(predicate, {'__builtins__': {}, **REDUCTIONS}, namespace)
+    result = np.asarray(result)
+    if result.shape != (len(hands),):
+        raise ValueError(f"Predicate {predicate!r} must give one value per hand, e.g. wrap it in any() or sum()")
+    return result
+
+def hand_slots(order, life, turn, going_second):
+    """Slot indexes held on the given turn: the opening hand plus draws, skipping the life cards"""
+    draws = max(turn - (0 if going_second else 1), 0) if turn else 0
+    start = OPENING_HAND + life
+    if start + draws > order.shape[1]:
+        raise ValueError(f"The deck has only {order.shape[1]} cards; cannot draw {draws} after {life} life cards")
+    return np.concatenate([order[:, :OPENING_HAND], order[:, start:start + draws]], axis=1)
+
+def run_trials(slots, life, predicates, trials, seed, turn=0, going_second=False, mulligan=None, batch_size=BATCH_SIZE):
+    """Totals for trials games: {'games', 'mulligans', 'sums': [...], 'squares': [...]} per predicate"""
+    deck = DeckArrays(slots)
+    rng = np.random.default_rng(seed)
+    base = np.arange(deck.size, dtype=np.int16)
+    totals = {'games': 0, 'mulligans': 0, 'sums': [0.0] * len(predicates), 'squares': [0.0] * len(predicates)}
+    remaining = trials
+    while remaining > 0:
+        games = min(batch_size, remaining)
+        remaining -= games
+        order = rng.permuted(np.tile(base, (games, 1)), axis=1)
+        if mulligan is not None:
+            redraw = ~evaluate(mulligan, deck, order[:, :OPENING_HAND]).astype(bool)
+            count = int(np.count_nonzero(redraw))
+            if count:
+                # A mulligan shuffles the hand back and draws a fresh five
+                order[redraw] = rng.permuted(np.tile(base, (count, 1)), axis=1)
+            totals['mulligans'] += count
+        hands = hand_slots(order, life, turn, going_second)
+        for i, predicate in enumerate(predicates):
+            values = evaluate(predicate, deck, hands).astype(np.float64)
+            totals['sums'][i] += float(values.sum())
+            totals['squares'][i] += float(np.square(values).sum())
+        totals['games'] += games
+    return totals
+
+def run_worker(arguments):
+    return run_trials(*arguments)
+
+def wilson_interval(successes, games, z):
+    if not games:
+        return 0.0, 0.0
+    p = successes / games
+    denominator = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return max(center - margin, 0.0), min(center + margin, 1.0)
+
+def summarize(predicates, totals, is_boolean, confidence):
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    games = totals['games']
+    results = []
+    for predicate, total, squares, boolean in zip(predicates, totals['sums'], totals['squares'], is_boolean):
+        mean = total / games if games else 0.0
+        if boolean:
+            low, high = wilson_interval(total, games, z)
+        else:
+            variance = max(squares / games - mean * mean, 0.0) if games else 0.0
+            margin = z * math.sqrt(variance / games) if games else 0.0
+            low, high = mean - margin, mean + margin
+        results.append({
+            'predicate': predicate,
+            'kind': 'probability' if boolean else 'mean',
+            'value': mean,
+            'low': low,
+            'high': high,
+        })
+    return results
+
+def simulate_deck(deck_file, predicates, trials=1_000_000, jobs=0, seed=None, turn=0, going_second=False,
+                  mulligan=None, confidence=0.95):
+    """Run the simulation and return the report dict; predicates are expression strings"""
+    name, life, slots = load_deck(deck_file)
+    if len(slots) < OPENING_HAND:
+        raise ValueError(f"Deck '{name}' has only {len(slots)} cards")
+
+    # Check the expressions (and find out which are boolean) on a couple of hands before starting workers
+    deck = DeckArrays(slots)
+    probe_hands = hand_slots(np.tile(np.arange(deck.size), (2, 1)), life, turn, going_second)
+    if mulligan is not None:
+        evaluate(mulligan, deck, probe_hands[:, :OPENING_HAND])
+    is_boolean = [evaluate(predicate, deck, probe_hands).dtype == bool for predicate in predicates]
+
+    if trials < 1:
+        raise ValueError('The number of trials must be at least 1')
+    chunks = [min(CHUNK_SIZE, trials - start) for start in range(0, trials, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    work = [(slots, life, predicates, chunk, child, turn, going_second, mulligan) for chunk, child in zip(chunks, seeds)]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(chunks)))
+    if jobs == 1:
+        parts = [run_worker(chunk) for chunk in work]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # Results come back in chunk order, so the totals are summed in the same order for any job count
+            parts = list(executor.map(run_worker, work))
+
+    totals = {'games': 0, 'mulligans': 0, 'sums': [0.0] * len(predicates), 'squares': [0.0] * len(predicates)}
+    for part in parts:
+        totals['games'] += part['games']
+        totals['mulligans'] += part['mulligans']
+        for i in range(len(predicates)):
+            totals['sums'][i] += part['sums'][i]
+            totals['squares'][i] += part['squares'][i]
+
+    return {
+        'deck': name,
+        'deckSize': len(slots),
+        'games': totals['games'],
+        'turn': turn,
+        'goingSecond': going_second,
+        'mulligan': mulligan,
+        'mulliganRate': totals['mulligans'] / totals['games'] if mulligan else 0.0,
+        'confidence': confidence,
+        'results': summarize(predicates, totals, is_boolean, confidence),
+    }
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+def non_negative_int(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, got {value}")
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo opening-hand and draw odds for a saved deck')
+    parser.add_argument('deck', help='Deck JSON file (data/decks/*.json)')
+    parser.add_argument('-p', '--predicate', action='append', required=True,
+                        help="Hand expression, e.g. \"any(is_type('CHARACTER') & (cost <= 2) & trait('Straw Hat Crew'))\" or 'sum(counter)'; repeatable")
+    parser.add_argument('-n', '--trials', type=positive_int, default=1_000_000, help='Number of simulated games (default: 1000000)')
+    parser.add_argument('-t', '--turn', type=non_negative_int, default=0, help='Evaluate the hand after the draws of this turn (default: 0 = opening hand)')
+    parser.add_argument('--second', action='store_true', help='Going second (draws on turn 1)')
+    parser.add_argument('-m', '--mulligan', help='Keep the opening hand only if this expression is true, otherwise mulligan once')
+    parser.add_argument('-c', '--confidence', type=float, default=0.95, help='Confidence level of the intervals (default: 0.95)')
+    parser.add_argument('-j', '--jobs', type=non_negative_int, default=0, help='Number of worker processes (default: 0 = one per CPU)')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+    parser.add_argument('-o', '--output', help='Also write the report as JSON to this file')
+
+    args = parser.parse_args()
+
+    if np is None:
+        print('Error: NumPy is required for the simulator (pip install numpy).')
+        sys.exit(1)
+    if not os.path.exists(args.deck):
+        print(f"Error: Deck file '{args.deck}' not found.")
+        return
+
+    start = time.perf_counter()
+    try:
+        report = simulate_deck(args.deck, args.predicate, args.trials, args.jobs, args.seed, args.turn, args.second,
+                               args.mulligan, args.confidence)
+    except (ValueError, NameError, SyntaxError, TypeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    when = f"turn {report['turn']} ({'second' if report['goingSecond'] else 'first'})" if report['turn'] else 'opening hand'
+    print(f"{report['deck']}: {report['games']:,} games, {when}, {elapsed:.1f}s")
+    if report['mulligan']:
+        print(f"Mulligan rate: {report['mulliganRate']:.2%}")
+    for result in report['results']:
+        if result['kind'] == 'probability':
+            print(f"  {result['value']:7.2%}  [{result['low']:.2%}, {result['high']:.2%}]  {result['predicate']}")
+        else:
+            print(f"  {result['value']:7.3f}  [{result['low']:.3f}, {result['high']:.3f}]  {result['predicate']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote report to '{args.output}'")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+CRAWLER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if CRAWLER_DIR not in sys.path:
+    sys.path.insert(0, CRAWLER_DIR)
+
+from fixture_server import FixtureServer  # noqa: E402
+
+@pytest.fixture
+def server():
+    with FixtureServer() as fixture_server:
+        yield fixture_server
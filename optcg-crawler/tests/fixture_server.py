@@ -0,0 +1,134 @@
+"""
+Local stand-in for the card site: a ThreadingHTTPServer serving in-memory
+resources with ETag/Last-Modified validators and Range/If-Range support, plus
+scripted failures and dropped connections.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class Resource:
+    def __init__(self, body, etag, last_modified):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+class FixtureServer:
+    """
+    Serves resources by request target (path plus query). fail(target, *statuses)
+    makes the next requests for target answer with those statuses first,
+    truncate(target, size) makes the next one drop the connection after size body
+    bytes and partial(target) makes the next one a 206 from byte 0 even without a
+    Range header. Every request is recorded as (target, headers) in requests.
+    """
+
+    def __init__(self):
+        self.resources = {}
+        self.failures = {}
+        self.truncations = {}
+        self.partials = set()
+        self.requests = []
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self.handler_class())
+        self.thread = None
+
+    @property
+    def origin(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def add(self, target, body, etag=None, last_modified='Mon, 01 Sep 2025 00:00:00 GMT'):
+        with self.lock:
+            version = len(self.resources) + 1
+            self.resources[target] = Resource(body, etag or f'"v{version}"', last_modified)
+
+    def fail(self, target, *statuses):
+        with self.lock:
+            self.failures.setdefault(target, []).extend(statuses)
+
+    def truncate(self, target, size):
+        with self.lock:
+            self.truncations[target] = size
+
+    def partial(self, target):
+        with self.lock:
+            self.partials.add(target)
+
+    def requests_for(self, target):
+        with self.lock:
+            return [headers for requested, headers in self.requests if requested == target]
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests.append((self.path, {name.lower(): value for name, value in self.headers.items()}))
+                    failures = server.failures.get(self.path)
+                    status = failures.pop(0) if failures else None
+                    resource = server.resources.get(self.path)
+                    truncate_at = server.truncations.pop(self.path, None) if status is None else None
+                    unrequested_partial = status is None and self.path in server.partials
+                    server.partials.discard(self.path)
+                if status is not None:
+                    self.send_body(status, b'try again', {'Retry-After': '0'})
+                elif resource is None:
+                    self.send_body(404, b'not found')
+                elif self.not_modified(resource):
+                    self.send_response(304)
+                    self.send_header('ETag', resource.etag)
+                    self.end_headers()
+                else:
+                    headers = {'ETag': resource.etag, 'Last-Modified': resource.last_modified}
+                    start = 0 if unrequested_partial else self.range_start(resource)
+                    if start is None:
+                        self.send_body(200, resource.body, headers, truncate_at)
+                    else:
+                        headers['Content-Range'] = f"bytes {start}-{len(resource.body) - 1}/{len(resource.body)}"
+                        self.send_body(206, resource.body[start:], headers, truncate_at)
+
+            def not_modified(self, resource):
+                if 'If-None-Match' in self.headers:
+                    return self.headers['If-None-Match'] == resource.etag
+                return self.headers.get('If-Modified-Since') == resource.last_modified
+
+            def range_start(self, resource):
+                """Start of a satisfiable "bytes=N-" Range whose If-Range still matches, else None"""
+                requested = self.headers.get('Range', '')
+                if not requested.startswith('bytes=') or not requested.endswith('-'):
+                    return None
+                if_range = self.headers.get('If-Range')
+                if if_range is not None and if_range not in (resource.etag, resource.last_modified):
+                    return None
+                start = int(requested[len('bytes='):-1])
+                return start if start < len(resource.body) else None
+
+            def send_body(self, status, body, headers=None, truncate_at=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if truncate_at is None:
+                    self.wfile.write(body)
+                else:
+                    self.wfile.write(body[:truncate_at])
+                    self.close_connection = True
+
+        return Handler
@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from build_image_derivatives import DERIVATIVE_SPECS, build_image_derivatives  # noqa: E402
+
+def write_source(path, color):
+    Image.new('RGB', (600, 838), color).save(path, 'JPEG', quality=90)
+
+def card(card_id, *image_ids):
+    return {
+        'cardId': card_id,
+        'images': [{'image_url': f'https://example.com/images/cardlist/card/{image_id}.png', 'label': image_id, 'is_default': i == 0}
+                   for i, image_id in enumerate(image_ids)],
+    }
+
+def store_files(store_dir):
+    return {
+        os.path.relpath(os.path.join(root, name), store_dir): os.stat(os.path.join(root, name)).st_mtime_ns
+        for root, _, names in os.walk(store_dir) for name in names if name != 'sources.json'
+    }
+
+def test_identical_sources_are_stored_once_and_not_rebuilt(tmp_path, capsys):
+    images_dir = tmp_path / 'images'
+    images_dir.mkdir()
+    write_source(images_dir / 'OP01-001.jpg', 'red')
+    # A variant that reuses the base art byte for byte
+    (images_dir / 'OP01-001_p1.jpg').write_bytes((images_dir / 'OP01-001.jpg').read_bytes())
+    write_source(images_dir / 'OP01-002.jpg', 'blue')
+    input_file = tmp_path / 'cards.json'
+    input_file.write_text(json.dumps({'cards': [card('OP01-001', 'OP01-001', 'OP01-001_p1'), card('OP01-002', 'OP01-002')]}))
+    store_dir = tmp_path / 'store'
+
+    build_image_derivatives(str(input_file), images_dir=str(images_dir), store_dir=str(store_dir), jobs=1)
+
+    cards = json.loads(input_file.read_text())['cards']
+    base, variant = cards[0]['images']
+    assert base['derivatives'] == variant['derivatives']
+    assert base['derivatives'] != cards[1]['images'][0]['derivatives']
+    files = store_files(store_dir)
+    assert len(files) == 2 * len(DERIVATIVE_SPECS)
+    assert capsys.readouterr().out.startswith('3 image(s) from 3 source file(s) (2 distinct), 3 hashed, 2 rebuilt')
+
+    build_image_derivatives(str(input_file), images_dir=str(images_dir), store_dir=str(store_dir), jobs=1)
+
+    assert '0 hashed, 0 rebuilt (0 derivative(s))' in capsys.readouterr().out
+    assert store_files(store_dir) == files
+    assert json.loads(input_file.read_text())['cards'] == cards
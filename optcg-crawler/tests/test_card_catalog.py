@@ -0,0 +1,56 @@
+import pytest
+
+from card_catalog import CardCatalog, build_binary_catalog
+
+CARD = {
+    'cardId': 'OP01-001',
+    'name': 'Roronoa Zoro',
+    'cardType': 'LEADER',
+    'life': 5,
+    'cost': None,
+    'power': 5000,
+    'counter': None,
+    'attributes': [{'attribute': 'Slash'}],
+    'traits': [{'trait': 'Supernovas'}, {'trait': 'Straw Hat Crew'}],
+    'colors': [{'color': 'Red'}],
+    'images': [
+        {'image_url': 'https://example.com/OP01-001.png', 'label': 'default', 'artist': '', 'is_default': True,
+         'derivatives': {'thumb': {'path': 'ab/abcd/thumb.webp', 'width': 200}}},
+        {'image_url': 'https://example.com/OP01-001_p1.png', 'label': 'p1', 'artist': '', 'is_default': False},
+    ],
+    'effect_description': '[DON!! x1] [Your Turn] All of your Characters gain +1000 power.',
+    'trigger_description': '',
+    'rarity': 'L',
+    'set': [{'set': 'OP01 - Romance Dawn', 'is_default': True}],
+    'effectAst': {'version': 1, 'clauses': [{'timing': ['your_turn'], 'text': 'All of your Characters gain +1000 power.'}]},
+    'triggerAst': {'version': 1, 'clauses': []},
+    'variantCount': 1,
+}
+
+def test_round_trip_keeps_keys_without_a_column(tmp_path):
+    plain = {**CARD, 'cardId': 'OP01-002', 'images': [], 'variantCount': 0}
+    for key in ('effectAst', 'triggerAst', 'variantCount'):
+        del plain[key]
+    catalog_file = str(tmp_path / 'catalog.bin')
+    assert build_binary_catalog([CARD, plain], catalog_file) == 2
+
+    with CardCatalog(catalog_file) as catalog:
+        assert catalog.get('OP01-001') == CARD
+        assert catalog.get('OP01-002') == plain
+
+def test_refuses_keys_it_cannot_store(tmp_path):
+    card = {**CARD, 'traits': [{'trait': 'Supernovas', 'source': 'errata'}]}
+    with pytest.raises(ValueError, match='source'):
+        build_binary_catalog([card], str(tmp_path / 'catalog.bin'))
+
+def test_round_trip_keeps_stats_as_written(tmp_path):
+    # db.json has most costs as strings and '-' for a missing counter
+    character = {**CARD, 'cardId': 'OP01-013', 'cardType': 'CHARACTER', 'life': None, 'cost': '5', 'power': 6000,
+                 'counter': '-'}
+    catalog_file = str(tmp_path / 'catalog.bin')
+    build_binary_catalog([character], catalog_file)
+
+    with CardCatalog(catalog_file) as catalog:
+        card = catalog.get('OP01-013')
+    assert card == character
+    assert card['cost'] == '5' and card['power'] == 6000 and card['counter'] == '-'
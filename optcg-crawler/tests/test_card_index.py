@@ -0,0 +1,22 @@
+import csv
+
+from card_index import CardIndex
+from card_table import CardTable
+
+FIELDNAMES = ['cardId', 'name', 'cardType', 'traits', 'colors']
+ROWS = [
+    ['OP01-001', 'Roronoa Zoro', 'LEADER', '[{"name": "Supernovas", "value": "Supernovas"}]', '[{"name": "Red", "value": "Red"}]'],
+    # Written by an older converter with str(list).replace("'", '"')
+    ['OP07-049', 'Buggy', 'CHARACTER', '[{"name": "Weevil"s Mother", "value": "Weevil"s Mother"}]', '[{"name": "Blue", "value": "Blue"}]'],
+]
+
+def test_unparseable_component_cells_are_reported(tmp_path):
+    input_csv = tmp_path / 'components.csv'
+    with open(input_csv, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows([FIELDNAMES] + ROWS)
+
+    index = CardIndex.from_table(CardTable.from_csv(str(input_csv)))
+
+    assert index.malformed == [{'row': 2, 'cardId': 'OP07-049', 'error': "unparseable 'traits' cell"}]
+    assert index.query([('trait', '=', 'Supernovas')]) == ['OP01-001']
+    assert index.query([('color', '=', 'Blue')]) == ['OP07-049']
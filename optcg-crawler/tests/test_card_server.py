@@ -0,0 +1,81 @@
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+from card_server import CatalogServer
+
+def card(card_id, name):
+    return {'cardId': card_id, 'name': name, 'cardType': 'CHARACTER', 'cost': '2', 'colors': [{'color': 'Red'}]}
+
+def write_catalog(path, cards):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'cards': cards}, f)
+    os.replace(tmp_path, path)
+
+@pytest.fixture
+def catalog_server(tmp_path):
+    catalog = str(tmp_path / 'db.json')
+    write_catalog(catalog, [card('OP01-013', 'Sanji'), card('OP01-016', 'Nami')])
+    server = CatalogServer(('127.0.0.1', 0), catalog, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+def request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    try:
+        connection.request(method, path, body, headers or {})
+        response = connection.getresponse()
+        return response.status, response.getheader('ETag'), response.read()
+    finally:
+        connection.close()
+
+def test_matching_etag_gets_304(catalog_server):
+    status, etag, body = request(catalog_server, 'GET', '/cards/OP01-013')
+    assert status == 200
+    assert json.loads(body)['name'] == 'Sanji'
+
+    status, _, body = request(catalog_server, 'GET', '/cards/OP01-013', headers={'If-None-Match': etag})
+    assert status == 304
+    assert body == b''
+
+def test_batch_lists_missing_ids(catalog_server):
+    status, _, body = request(catalog_server, 'GET', '/cards?ids=OP01-016,OP99-001,OP01-013_p1')
+    assert status == 200
+    result = json.loads(body)
+    assert [entry['cardId'] for entry in result['cards']] == ['OP01-016', 'OP01-013']
+    assert result['missing'] == ['OP99-001']
+
+    status, _, body = request(catalog_server, 'POST', '/cards', json.dumps({'ids': ['OP99-001']}))
+    assert status == 200
+    assert json.loads(body) == {'cards': [], 'missing': ['OP99-001']}
+
+def test_rejects_bad_content_length(catalog_server):
+    status, _, _ = request(catalog_server, 'POST', '/cards', headers={'Content-Length': '-1'})
+    assert status == 400
+    status, _, _ = request(catalog_server, 'POST', '/cards', headers={'Content-Length': str(2 << 20)})
+    assert status == 413
+
+def test_reloads_a_new_build_and_warns_once_about_a_broken_one(catalog_server, capsys):
+    _, old_etag, _ = request(catalog_server, 'GET', '/cards/OP01-013')
+    write_catalog(catalog_server.catalog_path, [card('OP01-013', 'Sanji'), card('OP01-025', 'Roronoa Zoro')])
+
+    assert catalog_server.reload_if_changed()
+    status, etag, body = request(catalog_server, 'GET', '/cards/OP01-025', headers={'If-None-Match': old_etag})
+    assert status == 200
+    assert etag != old_etag
+    assert json.loads(body)['name'] == 'Roronoa Zoro'
+
+    with open(catalog_server.catalog_path, 'w', encoding='utf-8') as f:
+        f.write('{"cards": [')
+    assert not catalog_server.reload_if_changed()
+    assert not catalog_server.reload_if_changed()
+    assert capsys.readouterr().out.count('Could not reload') == 1
+    assert request(catalog_server, 'GET', '/cards/OP01-025')[0] == 200
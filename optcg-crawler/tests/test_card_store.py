@@ -0,0 +1,48 @@
+import pytest
+
+from parse_cardlist_to_csv import CSV_FIELDNAMES, read_existing_cards, write_cards_to_csv, write_cards_to_store
+
+def card(card_id, name):
+    return {**dict.fromkeys(CSV_FIELDNAMES, ''), 'cardId': card_id, 'name': name}
+
+def test_append_keeps_rows_written_without_the_store(tmp_path):
+    csv_file = str(tmp_path / 'cards.csv')
+    store = str(tmp_path / 'cards.db')
+    write_cards_to_store([card('OP01-001', 'Zoro')], csv_file, store, append_mode=True)
+    # A run without --store appends straight to the CSV
+    write_cards_to_csv([card('OP01-002', 'Law')], csv_file, append_mode=True)
+
+    total = write_cards_to_store([card('OP01-003', 'Kid'), card('OP01-001', 'Roronoa Zoro')], csv_file, store, append_mode=True)
+
+    cards = read_existing_cards(csv_file)
+    assert total == 3
+    assert list(cards) == ['OP01-001', 'OP01-002', 'OP01-003']
+    assert cards['OP01-001']['name'] == 'Roronoa Zoro'
+
+def test_append_drops_rows_removed_from_the_csv(tmp_path):
+    csv_file = str(tmp_path / 'cards.csv')
+    store = str(tmp_path / 'cards.db')
+    write_cards_to_store([card('OP01-001', 'Zoro'), card('OP01-002', 'Law')], csv_file, store, append_mode=True)
+    # The CSV is rebuilt without the store and without OP01-001
+    write_cards_to_csv([card('OP01-002', 'Law')], csv_file)
+
+    total = write_cards_to_store([card('OP01-003', 'Kid')], csv_file, store, append_mode=True)
+
+    assert total == 2
+    assert list(read_existing_cards(csv_file)) == ['OP01-002', 'OP01-003']
+
+def test_append_refuses_another_csv(tmp_path):
+    store = str(tmp_path / 'cards.db')
+    write_cards_to_store([card('OP01-001', 'Zoro')], str(tmp_path / 'a.csv'), store, append_mode=True)
+
+    with pytest.raises(ValueError, match='belongs to'):
+        write_cards_to_store([card('OP01-002', 'Law')], str(tmp_path / 'b.csv'), store, append_mode=True)
+    assert not (tmp_path / 'b.csv').exists()
+
+def test_overwrite_moves_the_store_to_another_csv(tmp_path):
+    store = str(tmp_path / 'cards.db')
+    write_cards_to_store([card('OP01-001', 'Zoro')], str(tmp_path / 'a.csv'), store)
+    write_cards_to_store([card('OP01-002', 'Law')], str(tmp_path / 'b.csv'), store)
+    write_cards_to_store([card('OP01-003', 'Kid')], str(tmp_path / 'b.csv'), store, append_mode=True)
+
+    assert list(read_existing_cards(str(tmp_path / 'b.csv'))) == ['OP01-002', 'OP01-003']
@@ -0,0 +1,97 @@
+import asyncio
+import os
+
+from crawl_cardlist import CARDS_DIR, MANIFEST_NAME, crawl_cardlist
+from http_pool import load_manifest
+
+INDEX_TARGET = '/cardlist/'
+INDEX_HTML = b"""<html><body><form>
+<select name="series">
+<option value="">ALL</option>
+<option value="569101">BOOSTER PACK -ROMANCE DAWN- [OP-01]</option>
+<option value="569001">STARTER DECK -Straw Hat Crew- [ST-01]</option>
+</select>
+</form></body></html>"""
+# series id -> saved page under cards/
+PAGES = {
+    '569101': 'sets/op01_cards.html',
+    '569001': 'starter_decks/st01_cards.html',
+}
+
+def saved_page(relative_path):
+    with open(os.path.join(CARDS_DIR, relative_path), 'rb') as f:
+        return f.read()
+
+def serve_cardlist(server):
+    server.add(INDEX_TARGET, INDEX_HTML)
+    for series_id, relative_path in PAGES.items():
+        server.add(series_target(series_id), saved_page(relative_path))
+
+def series_target(series_id):
+    return f"{INDEX_TARGET}?series={series_id}"
+
+def crawl(server, cards_dir, **kwargs):
+    return asyncio.run(crawl_cardlist(cards_dir=str(cards_dir), rate=0, timeout=10, origin=server.origin, **kwargs))
+
+def test_crawl_writes_every_series_page(server, tmp_path):
+    serve_cardlist(server)
+    crawler = crawl(server, tmp_path)
+
+    assert crawler.results == {'updated': 2, 'unchanged': 0, 'failed': 0}
+    manifest = load_manifest(os.path.join(tmp_path, MANIFEST_NAME))
+    for series_id, relative_path in PAGES.items():
+        assert (tmp_path / relative_path).read_bytes() == saved_page(relative_path)
+        assert manifest[relative_path]['url'].endswith(series_target(series_id))
+        assert manifest[relative_path]['etag']
+        assert oct((tmp_path / relative_path).stat().st_mode & 0o777) == oct(0o644)
+
+def test_recrawl_revalidates_with_conditional_get(server, tmp_path):
+    serve_cardlist(server)
+    crawl(server, tmp_path)
+    page = tmp_path / PAGES['569101']
+    mtime = page.stat().st_mtime_ns
+
+    crawler = crawl(server, tmp_path)
+
+    assert crawler.results == {'updated': 0, 'unchanged': 2, 'failed': 0}
+    assert crawler.updated_files == []
+    headers = server.requests_for(series_target('569101'))[-1]
+    assert headers['if-none-match'] == server.resources[series_target('569101')].etag
+    assert headers['if-modified-since'] == server.resources[series_target('569101')].last_modified
+    assert page.stat().st_mtime_ns == mtime
+
+def test_retries_429_and_5xx(server, tmp_path):
+    serve_cardlist(server)
+    server.fail(INDEX_TARGET, 503)
+    server.fail(series_target('569101'), 429, 502)
+
+    crawler = crawl(server, tmp_path, retries=2)
+
+    assert crawler.results == {'updated': 2, 'unchanged': 0, 'failed': 0}
+    assert len(server.requests_for(INDEX_TARGET)) == 2
+    assert len(server.requests_for(series_target('569101'))) == 3
+    assert (tmp_path / PAGES['569101']).read_bytes() == saved_page(PAGES['569101'])
+
+def test_gives_up_after_the_last_retry(server, tmp_path):
+    serve_cardlist(server)
+    server.fail(series_target('569001'), 500, 500)
+
+    crawler = crawl(server, tmp_path, retries=1)
+
+    assert crawler.results == {'updated': 1, 'unchanged': 0, 'failed': 1}
+    assert not (tmp_path / PAGES['569001']).exists()
+
+def test_page_without_cards_keeps_the_existing_file(server, tmp_path):
+    serve_cardlist(server)
+    crawl(server, tmp_path)
+    page = tmp_path / PAGES['569101']
+    manifest_entry = load_manifest(os.path.join(tmp_path, MANIFEST_NAME))[PAGES['569101']]
+
+    # The site answers with a page that has lost its card list
+    server.add(series_target('569101'), b'<html><body>Maintenance</body></html>', etag='"maintenance"')
+    crawler = crawl(server, tmp_path)
+
+    assert crawler.results == {'updated': 0, 'unchanged': 1, 'failed': 1}
+    assert page.read_bytes() == saved_page(PAGES['569101'])
+    assert load_manifest(os.path.join(tmp_path, MANIFEST_NAME))[PAGES['569101']] == manifest_entry
+    assert not [name for name in os.listdir(page.parent) if name.endswith('.tmp')]
@@ -0,0 +1,39 @@
+import csv
+import io
+import os
+
+from facet_stats import compute_facet_stats, count_rows
+
+CRAWLER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def read_csv(name):
+    with open(os.path.join(CRAWLER_DIR, name), 'r', newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    return rows[0], rows[1:]
+
+def csv_text(rows):
+    text = io.StringIO()
+    csv.writer(text).writerows(rows)
+    return text.getvalue()
+
+def test_merge_equals_counting_both_inputs():
+    for name in ('all_cards.csv', 'all_cards_components.csv'):
+        fieldnames, rows = read_csv(name)
+        half = len(rows) // 2
+        whole = count_rows(io.StringIO(csv_text(rows), newline=''), fieldnames)
+        first = count_rows(io.StringIO(csv_text(rows[:half]), newline=''), fieldnames)
+        second = count_rows(io.StringIO(csv_text(rows[half:]), newline=''), fieldnames, first_line=half + 2)
+
+        assert first.merge(second).to_dict() == whole.to_dict()
+
+def test_appended_rows_are_counted_incrementally(tmp_path):
+    fieldnames, rows = read_csv('all_cards.csv')
+    input_csv = tmp_path / 'cards.csv'
+    input_csv.write_text(csv_text([fieldnames] + rows[:100]), encoding='utf-8')
+    compute_facet_stats(str(input_csv))
+    input_csv.write_text(csv_text([fieldnames] + rows[:300]), encoding='utf-8')
+
+    stats, mode = compute_facet_stats(str(input_csv))
+
+    assert mode == 'incremental'
+    assert stats.to_dict() == compute_facet_stats(str(input_csv), use_cache=False)[0].to_dict()
@@ -0,0 +1,116 @@
+import asyncio
+import os
+
+from fetch_images import MANIFEST_NAME, sync_images
+from http_pool import load_manifest
+
+IMAGE_URL = 'https://en.onepiece-cardgame.com/images/cardlist/card/OP01-001.png'
+IMAGE_TARGET = '/images/cardlist/card/OP01-001.png'
+LOCAL_IMAGE = 'OP01-001.jpg'
+IMAGE_BYTES = bytes(range(256)) * 400
+
+def sync(server, images_dir, **kwargs):
+    return asyncio.run(sync_images([(IMAGE_URL, LOCAL_IMAGE)], str(images_dir), timeout=10, origin=server.origin, **kwargs))
+
+def manifest_entry(images_dir):
+    return load_manifest(os.path.join(images_dir, MANIFEST_NAME))[LOCAL_IMAGE]
+
+def test_full_download(server, tmp_path):
+    server.add(IMAGE_TARGET, IMAGE_BYTES)
+    result = sync(server, tmp_path)
+
+    assert result.results['downloaded'] == 1
+    assert (tmp_path / LOCAL_IMAGE).read_bytes() == IMAGE_BYTES
+    assert not (tmp_path / (LOCAL_IMAGE + '.part')).exists()
+    entry = manifest_entry(tmp_path)
+    assert entry['complete']
+    assert entry['etag'] == server.resources[IMAGE_TARGET].etag
+    assert entry['last_modified'] == server.resources[IMAGE_TARGET].last_modified
+    assert oct((tmp_path / MANIFEST_NAME).stat().st_mode & 0o777) == oct(0o644)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+def test_unchanged_image_is_revalidated_with_304(server, tmp_path):
+    server.add(IMAGE_TARGET, IMAGE_BYTES)
+    sync(server, tmp_path)
+    result = sync(server, tmp_path)
+
+    assert result.results['unchanged'] == 1
+    assert result.bytes_downloaded == 0
+    headers = server.requests_for(IMAGE_TARGET)[-1]
+    assert headers['if-none-match'] == server.resources[IMAGE_TARGET].etag
+    assert headers['if-modified-since'] == server.resources[IMAGE_TARGET].last_modified
+
+def test_changed_image_is_downloaded_again(server, tmp_path):
+    server.add(IMAGE_TARGET, IMAGE_BYTES)
+    sync(server, tmp_path)
+    server.add(IMAGE_TARGET, IMAGE_BYTES[::-1], etag='"v2"')
+    result = sync(server, tmp_path)
+
+    assert result.results['downloaded'] == 1
+    assert (tmp_path / LOCAL_IMAGE).read_bytes() == IMAGE_BYTES[::-1]
+    assert manifest_entry(tmp_path)['etag'] == '"v2"'
+
+def test_dropped_download_resumes_from_part_file(server, tmp_path):
+    server.add(IMAGE_TARGET, IMAGE_BYTES)
+    server.truncate(IMAGE_TARGET, 40000)
+    result = sync(server, tmp_path, retries=1)
+
+    assert result.results['resumed'] == 1
+    assert (tmp_path / LOCAL_IMAGE).read_bytes() == IMAGE_BYTES
+    first, second = server.requests_for(IMAGE_TARGET)
+    assert 'range' not in first
+    assert second['range'] == 'bytes=40000-'
+    assert second['if-range'] == server.resources[IMAGE_TARGET].etag
+    assert result.bytes_downloaded == len(IMAGE_BYTES) - 40000
+    assert manifest_entry(tmp_path)['complete']
+
+def test_part_file_from_an_earlier_run_is_resumed(server, tmp_path):
+    server.add(IMAGE_TARGET, IMAGE_BYTES)
+    server.truncate(IMAGE_TARGET, 1000)
+    assert sync(server, tmp_path, retries=0).results['failed'] == 1
+    assert (tmp_path / (LOCAL_IMAGE + '.part')).stat().st_size == 1000
+    assert not manifest_entry(tmp_path)['complete']
+
+    result = sync(server, tmp_path)
+
+    assert result.results['resumed'] == 1
+    assert (tmp_path / LOCAL_IMAGE).read_bytes() == IMAGE_BYTES
+    assert server.requests_for(IMAGE_TARGET)[-1]['range'] == 'bytes=1000-'
+
+def test_part_file_of_a_changed_image_is_replaced(server, tmp_path):
+    server.add(IMAGE_TARGET, IMAGE_BYTES)
+    server.truncate(IMAGE_TARGET, 1000)
+    sync(server, tmp_path, retries=0)
+    # If-Range no longer matches, so the server sends the whole new image
+    server.add(IMAGE_TARGET, IMAGE_BYTES[::-1], etag='"v2"')
+    result = sync(server, tmp_path)
+
+    assert result.results['downloaded'] == 1
+    assert (tmp_path / LOCAL_IMAGE).read_bytes() == IMAGE_BYTES[::-1]
+
+def test_unrequested_206_is_written_as_a_full_download(server, tmp_path):
+    server.add(IMAGE_TARGET, IMAGE_BYTES)
+    server.partial(IMAGE_TARGET)
+    result = sync(server, tmp_path, retries=0)
+
+    assert result.results['downloaded'] == 1
+    assert 'range' not in server.requests_for(IMAGE_TARGET)[0]
+    assert (tmp_path / LOCAL_IMAGE).read_bytes() == IMAGE_BYTES
+    assert manifest_entry(tmp_path)['complete']
+
+def test_retries_5xx(server, tmp_path):
+    server.add(IMAGE_TARGET, IMAGE_BYTES)
+    server.fail(IMAGE_TARGET, 503, 500)
+    result = sync(server, tmp_path, retries=2)
+
+    assert result.results['downloaded'] == 1
+    assert len(server.requests_for(IMAGE_TARGET)) == 3
+    assert (tmp_path / LOCAL_IMAGE).read_bytes() == IMAGE_BYTES
+
+def test_gives_up_after_the_last_retry(server, tmp_path):
+    server.add(IMAGE_TARGET, IMAGE_BYTES)
+    server.fail(IMAGE_TARGET, 503, 503)
+    result = sync(server, tmp_path, retries=1)
+
+    assert result.results['failed'] == 1
+    assert not (tmp_path / LOCAL_IMAGE).exists()
@@ -0,0 +1,33 @@
+import os
+
+import card_fields
+import parse_cardlist_to_csv
+import profiling
+from parse_cardlist_to_csv import CSV_FIELDNAMES, PROFILED_FIELD_FUNCTIONS, PROFILED_FUNCTIONS, parse_html_files
+
+CARDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cards')
+PAGES = [os.path.join(CARDS_DIR, 'starter_decks', 'st01_cards.html'),
+         os.path.join(CARDS_DIR, 'promotions', 'promotion_cards.html')]
+
+def profile_parse(tmp_path, extractor):
+    """Parse PAGES under the same instrumentation as parse_cardlist_to_csv.py --profile"""
+    modules = [(parse_cardlist_to_csv, PROFILED_FUNCTIONS), (card_fields, PROFILED_FIELD_FUNCTIONS)]
+    with profiling.profile_run('test', str(tmp_path / 'profile.json'), modules=modules) as profiler:
+        cards = [card for page in parse_html_files(PAGES, extractor=extractor) for card in page]
+        report = profiler.report()
+    return cards, report
+
+def test_stream_backend_reports_every_field(tmp_path):
+    cards, report = profile_parse(tmp_path, 'stream')
+
+    assert cards
+    assert list(report['fields']) == CSV_FIELDNAMES
+    assert all(stats['calls'] == len(cards) for stats in report['fields'].values())
+    assert report['functions']['raw_values']['calls'] == len(cards)
+
+def test_soup_backend_reports_every_field(tmp_path):
+    cards, report = profile_parse(tmp_path, 'soup')
+
+    assert list(report['fields']) == CSV_FIELDNAMES
+    assert all(stats['calls'] == len(cards) for stats in report['fields'].values())
+    assert report['functions']['soup_value']['calls'] > 0
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Inverted full-text index over card names, effect text and trigger text.
+
+Text is tokenized into lowercase words, with bracketed markers ("[On Play]",
+"[DON!! x1]", "[Nami]") and {trait} references ("{Straw Hat Crew}") kept as
+single tokens. Every field keeps positional postings (term -> {card: positions}),
+so queries can combine words, exact phrases, markers and traits:
+
+    {Straw Hat Crew} K.O.                  both, anywhere on the card
+    "[On Play]" OR "[When Attacking]"      either timing
+    name:luffy -[Blocker]                  Luffy cards without [Blocker]
+    effect:"up to 1 of your opponent's"    phrase in the effect text only
+
+Results are ranked with BM25, weighting name matches above effect and trigger
+matches. The index is stored as one segment per set; rebuilding it reuses the
+postings of every set whose cards did not change.
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import time
+
+from atomic_io import atomic_write
+from card_catalog import load_cards
+from card_ids import decode_card_id
+from card_table import CardTable
+from effect_ast import effect_plain_text
+
+TEXT_INDEX_VERSION = 1
+
+# Field -> candidate source columns/keys, in order of preference
+FIELD_SOURCES = {
+    'name': ('name',),
+    'effect': ('effect_description', 'effectText'),
+    'trigger': ('trigger_description', 'triggerText'),
+}
+FIELD_WEIGHTS = {'name': 3.0, 'effect': 1.0, 'trigger': 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"\[[^\[\]]+\]|\{[^{}]+\}|[^\W_]+(?:['’][^\W_]+)*")
+QUERY_PATTERN = re.compile(r'''\s*(?:
+    (?P<open>\() | (?P<close>\)) | (?P<minus>-(?=\S)) |
+    (?:(?P<field>name|effect|trigger):)?
+    (?: "(?P<phrase>[^"]*)"? | (?P<marker>\[[^\]]*\]|\{[^}]*\}) | (?P<word>[^\s()"]+) )
+)''', re.VERBOSE)
+
+def tokenize(text):
+    """Lowercase tokens of text; markers and traits become one token each"""
+    return [' '.join(token.lower().split()) for token in TOKEN_PATTERN.findall(text or '')]
+
+# --- Documents and segments ---
+
+def field_text(card, keys):
+    for key in keys:
+        if key in card:
+            return effect_plain_text(card[key] or '')
+    return ''
+
+def read_documents(input_files):
+    """{set code: [(base cardId, {field: text})]} from card CSVs and db.json-style JSON files"""
+    segments = {}
+    seen = set()
+    for input_file in input_files:
+        if input_file.endswith('.json'):
+            cards = load_cards(input_file)
+        else:
+            table = CardTable.from_csv(input_file)
+            cards = ({name: table.get(name, row) for name in table.fieldnames} for row in range(len(table)))
+        for card in cards:
+            if not card.get('cardId'):
+                continue
+            # Variants share the text of their base card, so each base cardId is one document
+            id_info = decode_card_id(card['cardId'])
+            if id_info.base_id in seen:
+                continue
+            seen.add(id_info.base_id)
+            texts = {field: field_text(card, keys) for field, keys in FIELD_SOURCES.items()}
+            segments.setdefault(id_info.set_code or 'other', []).append((id_info.base_id, texts))
+    return segments
+
+def segment_fingerprint(documents):
+    # The token pattern is part of the fingerprint so tokenizer changes rebuild every segment
+    data = json.dumps([TOKEN_PATTERN.pattern, documents], ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def build_segment(documents):
+    """Postings for one set: {'cards', 'lengths': {field: [...]}, 'postings': {field: {term: [[doc, positions]]}}}"""
+    lengths = {field: [] for field in FIELD_SOURCES}
+    postings = {field: {} for field in FIELD_SOURCES}
+    for doc, (_, texts) in enumerate(documents):
+        for field in FIELD_SOURCES:
+            tokens = tokenize(texts[field])
+            lengths[field].append(len(tokens))
+            field_postings = postings[field]
+            for position, token in enumerate(tokens):
+                entries = field_postings.setdefault(token, [])
+                if entries and entries[-1][0] == doc:
+                    entries[-1][1].append(position)
+                else:
+                    entries.append([doc, [position]])
+    return {
+        'fingerprint': segment_fingerprint(documents),
+        'cards': [card_id for card_id, _ in documents],
+        'lengths': lengths,
+        'postings': postings,
+    }
+
+def update_text_index(input_files, index_file):
+    """Build or update index_file from the inputs; returns (reused, rebuilt, removed) segment counts"""
+    previous = {}
+    if os.path.exists(index_file):
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == TEXT_INDEX_VERSION:
+                previous = data['segments']
+        except (OSError, ValueError):
+            previous = {}
+
+    segments = {}
+    reused = rebuilt = 0
+    for set_code, documents in sorted(read_documents(input_files).items()):
+        old = previous.get(set_code)
+        if old is not None and old['fingerprint'] == segment_fingerprint(documents):
+            segments[set_code] = old
+            reused += 1
+        else:
+            segments[set_code] = build_segment(documents)
+            rebuilt += 1
+    removed = len(set(previous) - set(segments))
+
+    with atomic_write(index_file) as f:
+        json.dump({'version': TEXT_INDEX_VERSION, 'segments': segments}, f, ensure_ascii=False, separators=(',', ':'))
+    return reused, rebuilt, removed
+
+# --- Querying ---
+
+class QueryError(ValueError):
+    pass
+
+def parse_query(text):
+    """
+    Query syntax tree: ('or', [nodes]), ('and', [nodes]), ('not', node) or
+    ('phrase', field or None, [tokens]). Terms next to each other are ANDed.
+    """
+    items = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = QUERY_PATTERN.match(text, position)
+        if not match or match.end() == position:
+            raise QueryError(f"Cannot parse query at '{text[position:]}'")
+        position = match.end()
+        if match.group('open'):
+            items.append('(')
+        elif match.group('close'):
+            items.append(')')
+        elif match.group('minus'):
+            items.append('NOT')
+        elif match.group('word') in ('AND', 'OR', 'NOT') and not match.group('field'):
+            items.append(match.group('word'))
+        else:
+            raw = match.group('phrase') or match.group('marker') or match.group('word') or ''
+            tokens = tokenize(raw)
+            if tokens:
+                items.append(('phrase', match.group('field'), tokens))
+
+    def parse_or(index):
+        node, index = parse_and(index)
+        nodes = [node]
+        while index < len(items) and items[index] == 'OR':
+            node, index = parse_and(index + 1)
+            nodes.append(node)
+        return (nodes[0] if len(nodes) == 1 else ('or', nodes)), index
+
+    def parse_and(index):
+        nodes = []
+        while index < len(items) and items[index] not in ('OR', ')'):
+            if items[index] == 'AND':
+                index += 1
+                continue
+            node, index = parse_unary(index)
+            nodes.append(node)
+        if not nodes:
+            raise QueryError('Empty query or operand')
+        return (nodes[0] if len(nodes) == 1 else ('and', nodes)), index
+
+    def parse_unary(index):
+        if index >= len(items):
+            raise QueryError('Query ends after an operator')
+        item = items[index]
+        if item == 'NOT':
+            node, index = parse_unary(index + 1)
+            return ('not', node), index
+        if item == '(':
+            node, index = parse_or(index + 1)
+            if index >= len(items) or items[index] != ')':
+                raise QueryError("Missing ')'")
+            return node, index + 1
+        if isinstance(item, tuple):
+            return item, index + 1
+        raise QueryError(f"Unexpected '{item}'")
+
+    node, index = parse_or(0)
+    if index != len(items):
+        raise QueryError(f"Unexpected '{items[index]}'")
+    return node
+
+class TextIndex:
+    """
+    All segments merged in memory: postings[field][term] = {doc: position mask},
+    where bit i of the mask is set when the term is the field's i-th token
+    """
+
+    def __init__(self, segments):
+        self.card_ids = []
+        self.lengths = {field: [] for field in FIELD_SOURCES}
+        self.postings = {field: {} for field in FIELD_SOURCES}
+        for set_code in sorted(segments):
+            segment = segments[set_code]
+            offset = len(self.card_ids)
+            self.card_ids.extend(segment['cards'])
+            for field in FIELD_SOURCES:
+                self.lengths[field].extend(segment['lengths'][field])
+                merged = self.postings[field]
+                for term, entries in segment['postings'][field].items():
+                    term_postings = merged.setdefault(term, {})
+                    for doc, positions in entries:
+                        mask = 0
+                        for position in positions:
+                            mask |= 1 << position
+                        term_postings[offset + doc] = mask
+        self.all_docs = set(range(len(self.card_ids)))
+        # BM25 length normalization per field and doc
+        self.norms = {}
+        for field, lengths in self.lengths.items():
+            average = (sum(lengths) / len(lengths) if lengths else 0) or 1
+            self.norms[field] = [BM25_K1 * (1 - BM25_B + BM25_B * length / average) for length in lengths]
+
+    @classmethod
+    def load(cls, index_file):
+        with open(index_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != TEXT_INDEX_VERSION:
+            raise ValueError(f"Unsupported text index version {data.get('version')} in '{index_file}'")
+        return cls(data['segments'])
+
+    def phrase_docs(self, field, tokens):
+        """{doc: number of occurrences} of the token sequence in one field"""
+        lists = [self.postings[field].get(token) for token in tokens]
+        if not all(lists):
+            return {}
+        if len(tokens) == 1:
+            return {doc: mask.bit_count() for doc, mask in lists[0].items()}
+        candidates = set(min(lists, key=len))
+        for postings in lists:
+            candidates.intersection_update(postings.keys())
+        first, following = lists[0], list(enumerate(lists[1:], 1))
+        matches = {}
+        for doc in candidates:
+            # Bits left set are the start positions followed by the rest of the phrase
+            starts = first[doc]
+            for offset, postings in following:
+                starts &= postings[doc] >> offset
+            if starts:
+                matches[doc] = starts.bit_count()
+        return matches
+
+    def evaluate(self, node, terms):
+        """Set of matching docs; the {field: matches} of positive terms are collected for scoring"""
+        kind = node[0]
+        if kind == 'phrase':
+            _, field, tokens = node
+            field_matches = {name: self.phrase_docs(name, tokens) for name in ([field] if field else FIELD_SOURCES)}
+            terms.append(field_matches)
+            docs = set()
+            for matches in field_matches.values():
+                docs.update(matches)
+            return docs
+        if kind == 'not':
+            return self.all_docs - self.evaluate(node[1], [])
+        results = [self.evaluate(child, terms) for child in node[1]]
+        if kind == 'and':
+            results.sort(key=len)
+            return set.intersection(*results)
+        return set.union(*results)
+
+    def score(self, docs, terms):
+        """BM25 summed over the query terms and fields, weighted per field"""
+        scores = dict.fromkeys(docs, 0.0)
+        total = len(self.card_ids)
+        for field_matches in terms:
+            for name, matches in field_matches.items():
+                if not matches:
+                    continue
+                idf = math.log(1 + (total - len(matches) + 0.5) / (len(matches) + 0.5))
+                weight = FIELD_WEIGHTS[name] * idf * (BM25_K1 + 1)
+                norms = self.norms[name]
+                for doc in docs.intersection(matches):
+                    frequency = matches[doc]
+                    scores[doc] += weight * frequency / (frequency + norms[doc])
+        return scores
+
+    def search(self, query, limit=None):
+        """[(cardId, score)] matching query, best first"""
+        terms = []
+        docs = self.evaluate(parse_query(query), terms)
+        scores = self.score(docs, terms)
+        if limit:
+            ranked = heapq.nsmallest(limit, docs, key=lambda doc: (-scores[doc], doc))
+        else:
+            ranked = sorted(docs, key=lambda doc: (-scores[doc], doc))
+        return [(self.card_ids[doc], scores[doc]) for doc in ranked]
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and query the full-text index over card names and effect text')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build or incrementally update the index')
+    build_parser.add_argument('inputs', nargs='+', help='Card CSVs, db.json or data/cards/<set>.json files')
+    build_parser.add_argument('-o', '--output', required=True, help='Index file path, e.g. text_index.json')
+
+    query_parser = subparsers.add_parser('query', help='Search the index')
+    query_parser.add_argument('index', help='Index file path')
+    query_parser.add_argument('query', nargs='+', help="Query, e.g. '{Straw Hat Crew} K.O.' or 'name:luffy -[Blocker]'")
+    query_parser.add_argument('-n', '--limit', type=int, default=20, help='Maximum number of results (default: 20, 0 = all)')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        missing = [path for path in args.inputs if not os.path.exists(path)]
+        if missing:
+            print(f"Error: Input file '{missing[0]}' not found.")
+            return
+        start = time.perf_counter()
+        reused, rebuilt, removed = update_text_index(args.inputs, args.output)
+        print(f"Indexed into '{args.output}' in {time.perf_counter() - start:.2f}s: "
+              f"{rebuilt} set(s) rebuilt, {reused} unchanged, {removed} removed")
+        return
+
+    index = TextIndex.load(args.index)
+    try:
+        start = time.perf_counter()
+        results = index.search(' '.join(args.query), args.limit)
+        elapsed = time.perf_counter() - start
+    except QueryError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for card_id, score in results:
+        print(f"{card_id}\t{score:.3f}")
+    print(f"{len(results)} card(s) in {elapsed * 1e6:.0f} µs", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
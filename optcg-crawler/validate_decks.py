@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Validate deck files (data/decks/*.json) in bulk against the parsed card catalog.
+
+The catalog (db.json, a binary catalog or the parser CSV) is loaded once per
+worker into a lookup of CatalogCard records keyed by base card ID, so every deck
+is checked against current card data rather than the card objects embedded in
+it. Each deck gets a structured report:
+
+    {"file": "...", "name": "...", "isValid": false, "totalCards": 49,
+     "errors": [{"code": "deck_size", "message": "Main deck must have exactly 50 cards, found 49"}],
+     "warnings": [{"code": "renamed_card", "cardId": "OP01-016", "message": "..."}]}
+
+Error codes: invalid_deck, missing_leader, unknown_card, leader_type, card_type,
+invalid_quantity, deck_size, copy_limit, color_identity. Warning codes:
+renamed_card.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import FrozenSet, NamedTuple
+
+from card_catalog import CardCatalog, load_cards
+from card_ids import decode_card_id
+from card_table import CardTable
+from ndjson_io import NdjsonWriter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_JSON = os.path.join(REPO_ROOT, 'db.json')
+DECKS_DIR = os.path.join(REPO_ROOT, 'data', 'decks')
+
+DECK_SIZE = 50
+MAX_COPIES = 4
+MAIN_DECK_TYPES = {'CHARACTER', 'EVENT', 'STAGE'}
+# Cards such as OP01-075 Pacifista lift the copy limit in their own text
+UNLIMITED_COPIES_TEXT = 'any number of this card in your deck'
+
+class CatalogCard(NamedTuple):
+    card_id: str
+    name: str
+    card_type: str
+    colors: FrozenSet[str]
+    traits: FrozenSet[str]
+    unlimited: bool
+
+def catalog_card(card_id, name, card_type, colors, traits, effect_text):
+    return CatalogCard(card_id, name or '', (card_type or '').strip().upper(), frozenset(colors), frozenset(traits),
+                       UNLIMITED_COPIES_TEXT in (effect_text or ''))
+
+def load_catalog(catalog_path):
+    """{base cardId: CatalogCard} from db.json/a set file, a binary catalog or the parser CSV"""
+    if catalog_path.endswith('.csv'):
+        table = CardTable.from_csv(catalog_path)
+        if 'color' not in table.columns:
+            raise ValueError(f"'{catalog_path}' is not a parser CSV (expected a 'color' column)")
+        cards = (
+            catalog_card(table.get('cardId', row), table.get('name', row), table.get('cardType', row),
+                         [color.strip() for color in table.get('color', row).split('/') if color.strip()],
+                         [trait.strip() for trait in table.get('types', row).split(', ') if trait.strip()],
+                         table.get('effectText', row))
+            for row in range(len(table))
+        )
+    else:
+        if catalog_path.endswith('.bin'):
+            with CardCatalog(catalog_path) as catalog:
+                source = list(catalog)
+        else:
+            source = load_cards(catalog_path)
+        cards = (
+            catalog_card(card['cardId'], card.get('name'), card.get('cardType'),
+                         [entry['color'] for entry in card.get('colors') or []],
+                         [entry['trait'] for entry in card.get('traits') or []],
+                         card.get('effect_description'))
+            for card in source
+        )
+
+    catalog = {}
+    for card in cards:
+        base_id = decode_card_id(card.card_id).base_id
+        # The base printing wins over variants listed before it
+        if base_id not in catalog or card.card_id == base_id:
+            catalog[base_id] = card._replace(card_id=base_id)
+    return catalog
+
+# --- Validation ---
+
+def issue(code, message, card_id=None):
+    entry = {'code': code, 'message': message}
+    if card_id:
+        entry['cardId'] = card_id
+    return entry
+
+def entry_card_id(entry):
+    """cardId of a leader or main deck entry: a card object, {card, quantity} or a plain ID"""
+    if isinstance(entry, str):
+        return entry
+    if isinstance(entry, dict):
+        card = entry.get('card') if isinstance(entry.get('card'), dict) else entry
+        return card.get('cardId')
+    return None
+
+def entry_name(entry):
+    if isinstance(entry, dict):
+        card = entry.get('card') if isinstance(entry.get('card'), dict) else entry
+        return card.get('name')
+    return None
+
+def check_known(catalog, entry, errors, warnings):
+    """The CatalogCard of a deck entry, recording unknown and renamed cards"""
+    card_id = entry_card_id(entry)
+    if not card_id:
+        errors.append(issue('unknown_card', 'Deck entry has no cardId'))
+        return None
+    base_id = decode_card_id(card_id).base_id
+    card = catalog.get(base_id)
+    if card is None:
+        errors.append(issue('unknown_card', f"{card_id} is not in the card catalog", card_id))
+        return None
+    name = entry_name(entry)
+    if name and name != card.name:
+        warnings.append(issue('renamed_card', f"{card_id} is named '{name}' in the deck but '{card.name}' in the catalog", card_id))
+    return card
+
+def validate_deck(deck, catalog):
+    """(errors, warnings, total main deck cards) for one deck object"""
+    errors = []
+    warnings = []
+
+    leader = None
+    if not deck.get('leader'):
+        errors.append(issue('missing_leader', 'Deck must have exactly one leader card'))
+    else:
+        leader = check_known(catalog, deck['leader'], errors, warnings)
+        if leader is not None and leader.card_type != 'LEADER':
+            errors.append(issue('leader_type', f"{leader.card_id} is a {leader.card_type or 'card'}, not a LEADER", leader.card_id))
+
+    copies = {}
+    total = 0
+    off_color = []
+    for entry in deck.get('mainDeck') or []:
+        quantity = entry.get('quantity', 1) if isinstance(entry, dict) else 1
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity < 1:
+            errors.append(issue('invalid_quantity', f"Invalid quantity {quantity!r}", entry_card_id(entry)))
+            continue
+        total += quantity
+        card = check_known(catalog, entry, errors, warnings)
+        if card is None:
+            continue
+        copies[card] = copies.get(card, 0) + quantity
+        if card.card_type not in MAIN_DECK_TYPES:
+            errors.append(issue('card_type', f"{card.card_id} is a {card.card_type or 'card'}; the main deck can only contain CHARACTER, EVENT or STAGE cards", card.card_id))
+        if leader is not None and not card.colors & leader.colors and card not in off_color:
+            off_color.append(card)
+
+    if total != DECK_SIZE:
+        errors.append(issue('deck_size', f"Main deck must have exactly {DECK_SIZE} cards, found {total}"))
+    for card, count in copies.items():
+        if count > MAX_COPIES and not card.unlimited:
+            errors.append(issue('copy_limit', f"{card.name} has {count} copies (maximum {MAX_COPIES} allowed)", card.card_id))
+    for card in off_color:
+        errors.append(issue('color_identity', f"{card.name} ({'/'.join(sorted(card.colors)) or 'no color'}) does not match the leader's colors ({'/'.join(sorted(leader.colors))})", card.card_id))
+    return errors, warnings, total
+
+def validate_deck_file(path, catalog):
+    report = {'file': path, 'name': None, 'isValid': False, 'totalCards': 0, 'errors': [], 'warnings': []}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            deck = json.load(f)
+        if not isinstance(deck, dict):
+            raise ValueError('expected a JSON object')
+    except (OSError, ValueError) as e:
+        report['errors'].append(issue('invalid_deck', f"Cannot read deck: {e}"))
+        return report
+    errors, warnings, total = validate_deck(deck, catalog)
+    report.update({'name': deck.get('name'), 'isValid': not errors, 'totalCards': total, 'errors': errors, 'warnings': warnings})
+    return report
+
+# Per-process catalog, loaded once by the pool initializer
+CATALOG = None
+
+def init_worker(catalog_path):
+    global CATALOG
+    CATALOG = load_catalog(catalog_path)
+
+def validate_chunk(paths):
+    return [validate_deck_file(path, CATALOG) for path in paths]
+
+def validate_deck_files(deck_files, catalog_path, jobs=0, chunk_size=64):
+    """Yield one report per deck file, in input order"""
+    jobs = jobs or os.cpu_count() or 1
+    chunks = [deck_files[i:i + chunk_size] for i in range(0, len(deck_files), chunk_size)]
+    if jobs == 1 or len(chunks) <= 1:
+        catalog = load_catalog(catalog_path)
+        for path in deck_files:
+            yield validate_deck_file(path, catalog)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(catalog_path,)) as executor:
+        for reports in executor.map(validate_chunk, chunks):
+            yield from reports
+
+def collect_deck_files(paths):
+    deck_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            deck_files.extend(sorted(glob.glob(os.path.join(path, '*.json'))))
+        elif os.path.exists(path):
+            deck_files.append(path)
+        else:
+            print(f"Warning: Deck file '{path}' not found. Skipping.")
+    return deck_files
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate deck files against the card catalog')
+    parser.add_argument('decks', nargs='*', default=[DECKS_DIR], help=f'Deck files or directories (default: {DECKS_DIR})')
+    parser.add_argument('-c', '--catalog', default=DB_JSON, help=f'db.json, a binary catalog (.bin) or the parser CSV (default: {DB_JSON})')
+    parser.add_argument('-o', '--output', help='Write one report per deck to this NDJSON file')
+    parser.add_argument('-j', '--jobs', type=int, default=0, help='Number of worker processes (default: 0 = one per CPU)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only print the summary')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.catalog):
+        print(f"Error: Catalog '{args.catalog}' not found.")
+        return
+    deck_files = collect_deck_files(args.decks)
+    if not deck_files:
+        print('Error: No deck files found.')
+        return
+
+    start = time.perf_counter()
+    counts = {'valid': 0, 'invalid': 0}
+    writer = NdjsonWriter(args.output) if args.output else None
+    try:
+        for report in validate_deck_files(deck_files, args.catalog, args.jobs):
+            counts['valid' if report['isValid'] else 'invalid'] += 1
+            if writer is not None:
+                writer.write(report)
+            if not args.quiet and (report['errors'] or report['warnings']):
+                print(f"{'INVALID' if report['errors'] else 'WARN'}  {report['file']}")
+                for entry in report['errors'] + report['warnings']:
+                    print(f"    {entry['code']}: {entry['message']}")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    print(f"Validated {len(deck_files)} deck(s) in {time.perf_counter() - start:.2f}s: "
+          f"{counts['valid']} valid, {counts['invalid']} invalid")
+    if args.output:
+        print(f"Reports written to '{args.output}'")
+    if counts['invalid']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()